@@ -5,6 +5,7 @@ from typing import Optional
 from datetime import date
 import pandas as pd
 
+from civicspend.db.anomaly_store import load_anomalies
 from civicspend.db.connection import get_connection
 
 app = FastAPI(
@@ -106,27 +107,13 @@ def vendor_history(vendor_id: str, run_id: Optional[str] = None, limit: int = Qu
 
 
 @app.get("/anomalies")
-def list_anomalies(run_id: Optional[str] = None, limit: int = Query(100, le=1000)):
-    query = """
-        SELECT ve.vendor_id, ve.canonical_name as vendor_name,
-               mvs.month, mvs.obligation_sum, mvs.award_count,
-               CASE 
-                   WHEN mvs.obligation_sum > mvs.rolling_3m_avg * 3 THEN 'critical'
-                   WHEN mvs.obligation_sum > mvs.rolling_3m_avg * 2 THEN 'high'
-                   ELSE 'medium'
-               END as severity
-        FROM monthly_vendor_spend mvs
-        JOIN vendor_entities ve ON mvs.vendor_id = ve.vendor_id
-        WHERE mvs.rolling_3m_avg IS NOT NULL
-    """
-    params = []
-    if run_id:
-        query += " AND mvs.run_id = ?"
-        params.append(run_id)
-    query += " ORDER BY mvs.obligation_sum DESC LIMIT ?"
-    params.append(limit)
-    
-    df = pd.read_sql_query(query, conn, params=params)
+def list_anomalies(
+    run_id: Optional[str] = None,
+    detector: Optional[str] = None,
+    severity: Optional[str] = None,
+    limit: int = Query(100, le=1000)
+):
+    df = load_anomalies(conn, run_id=run_id, detector=detector, severity=severity, limit=limit)
     return df.to_dict(orient="records")
 
 
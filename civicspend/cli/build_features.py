@@ -1,14 +1,38 @@
 """Build features command."""
 import click
 from civicspend.features.aggregator import MonthlyAggregator
+from civicspend.features.cube import SpendingCube
+from civicspend.features.store import FeatureStore
 
 @click.command()
 @click.option('--run-id', required=True, help='Run ID to process')
-def build_features(run_id):
+@click.option('--incremental', is_flag=True, help='Only recompute rows whose inputs changed')
+@click.option('--base-run-id', default=None, help='Run to start from when --incremental has no stored rows')
+@click.option('--cube/--no-cube', default=True, help='Rebuild the spending cube')
+@click.option('--partitions', type=int, default=None, help='Also store ML features, this many vendor partitions at a time')
+@click.option('--workers', type=int, default=None, help='Processes engineering feature partitions')
+def build_features(run_id, incremental, base_run_id, cube, partitions, workers):
     """Build monthly features."""
     click.echo(f"Building features for run: {run_id}")
-    
+
     aggregator = MonthlyAggregator()
-    count = aggregator.aggregate_run(run_id)
-    
-    click.echo(f"[OK] Created {count} vendor-month records")
+    if incremental:
+        stats = aggregator.refresh_run(run_id, base_run_id)
+        click.echo(f"[OK] {stats['changed']} changed vendor-months: "
+                   f"{stats['upserted']} upserted, {stats['deleted']} deleted")
+
+        base_run_id = base_run_id or aggregator.default_base_run(run_id)
+        features = FeatureStore().refresh(run_id, stats['vendors'], base_run_id)
+        click.echo(f"[OK] Refreshed features for {len(stats['vendors'])} vendors "
+                   f"({len(features)} rows stored)")
+    else:
+        count = aggregator.aggregate_run(run_id)
+        click.echo(f"[OK] Created {count} vendor-month records")
+
+        if partitions:
+            rows = FeatureStore().materialize_partitioned(run_id, partitions, workers)
+            click.echo(f"[OK] Stored {rows} feature rows from {partitions} vendor partitions")
+
+    if cube:
+        rows = SpendingCube(aggregator.conn).build(run_id)
+        click.echo(f"[OK] Built spending cube ({rows} rows)")
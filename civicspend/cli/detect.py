@@ -1,19 +1,44 @@
 """Detect anomalies command."""
 import click
+import pandas as pd
 from civicspend.detect.baseline import RobustMADDetector
-from civicspend.db.connection import get_connection
+from civicspend.detect.ml import MLDetector
+from civicspend.detect.streaming import StreamingMADDetector
 
 @click.command()
 @click.option('--run-id', required=True, help='Run ID to analyze')
 @click.option('--threshold', default=3.5, help='Z-score threshold')
-def detect(run_id, threshold):
-    """Detect spending anomalies."""
+@click.option('--streaming', is_flag=True, help='Score only months newer than the stored vendor sketches')
+@click.option('--cold-start', is_flag=True, help='Rebuild vendor sketches from history before --streaming')
+@click.option('--through-month', default=None, help='Last month (YYYY-MM) folded in by --cold-start')
+@click.option('--ml', is_flag=True, help='Score with the Isolation Forest saved by train-model')
+@click.option('--model-run-id', default=None, help='Run the --ml model was trained on (default: --run-id)')
+def detect(run_id, threshold, streaming, cold_start, through_month, ml, model_run_id):
+    """Detect spending anomalies and store them for the API and dashboard."""
     click.echo(f"Detecting anomalies for run: {run_id}")
     
-    detector = RobustMADDetector(threshold=threshold)
-    anomalies = detector.detect_run(run_id)
+    if ml:
+        detector = MLDetector(use_store=True)
+        detector.load_model(model_run_id or run_id)
+        predictions = detector.predict(run_id)
+        stored = detector.save_anomalies(run_id, predictions)
+        anomalies = pd.DataFrame(predictions, columns=['year_month', 'score', 'severity', 'value'])
+    else:
+        if streaming:
+            detector = StreamingMADDetector(threshold=threshold)
+            if cold_start:
+                vendors = detector.cold_start(run_id, through_month)
+                click.echo(f"[OK] Built sketches for {vendors} vendors")
+            anomalies = detector.score_run(run_id)
+        else:
+            detector = RobustMADDetector(threshold=threshold)
+            anomalies = detector.detect_run(run_id)
+        stored = detector.save_anomalies(run_id, anomalies)
+        anomalies = anomalies.rename(columns={'z_score': 'score'})
     
-    if not anomalies:
+    click.echo(f"[OK] Stored {stored} anomalies ({detector.DETECTOR} {detector.detector_version})")
+    
+    if anomalies.empty:
         click.echo("[OK] No anomalies detected")
         return
     
@@ -21,12 +46,9 @@ def detect(run_id, threshold):
     click.echo(f"\n[FOUND] {len(anomalies)} anomalies detected!\n")
     
     # Group by severity
-    by_severity = {}
-    for a in anomalies:
-        by_severity.setdefault(a['severity'], []).append(a)
-    
     for severity in ['critical', 'high', 'medium', 'low']:
-        if severity in by_severity:
-            click.echo(f"{severity.upper()}: {len(by_severity[severity])} anomalies")
-            for a in by_severity[severity][:3]:  # Show top 3
-                click.echo(f"  {a['year_month']}: ${a['value']:,.2f} (z={a['z_score']:.2f})")
+        group = anomalies[anomalies['severity'] == severity]
+        if not group.empty:
+            click.echo(f"{severity.upper()}: {len(group)} anomalies")
+            for a in group.head(3).itertuples():  # Show top 3
+                click.echo(f"  {a.year_month}: ${a.value:,.2f} (score={a.score:.2f})")
@@ -0,0 +1,63 @@
+"""Generate synthetic award data for load testing."""
+import click
+import uuid
+import json
+from civicspend.ingest.mock_data import SyntheticAwardGenerator
+from civicspend.db.connection import get_connection
+
+@click.command()
+@click.option('--rows', default=1_000_000, help='Number of awards to generate')
+@click.option('--vendors', default=1000, help='Number of distinct vendors')
+@click.option('--agencies', default=20, help='Number of distinct agencies')
+@click.option('--start-date', default='2022-01-01', help='First month (YYYY-MM-DD)')
+@click.option('--months', default=24, help='Number of months to span')
+@click.option('--anomaly-rate', default=0.01, help='Fraction of vendor-months with injected anomalies')
+@click.option('--seed', default=42, help='Random seed')
+@click.option('--state', default='MN', help='State code stored on the awards')
+@click.option('--parquet', 'parquet_dir', default=None, help='Write Parquet parts to this directory instead of raw_awards')
+@click.option('--labels', 'labels_path', default=None, help='Also write injected anomaly labels to this CSV')
+def generate_mock(rows, vendors, agencies, start_date, months, anomaly_rate, seed, state,
+                  parquet_dir, labels_path):
+    """Generate synthetic awards with labelled anomalies."""
+    generator = SyntheticAwardGenerator(
+        n_vendors=vendors, n_agencies=agencies, start_date=start_date,
+        months=months, anomaly_rate=anomaly_rate, seed=seed
+    )
+    conn = get_connection()
+    
+    try:
+        if parquet_dir:
+            generator.write_parquet(conn, parquet_dir, rows)
+            click.echo(f"[OK] Wrote {rows:,} awards to {parquet_dir}")
+        else:
+            run_id = str(uuid.uuid4())
+            filters = {
+                "source": "synthetic",
+                "state": state,
+                "seed": seed,
+                "vendors": vendors,
+                "agencies": agencies,
+                "months": months,
+                "anomaly_rate": anomaly_rate
+            }
+            conn.execute("""
+                INSERT INTO run_manifest (run_id, filters_json, status)
+                VALUES (?, ?, 'running')
+            """, [run_id, json.dumps(filters)])
+            
+            generator.write_raw_awards(conn, run_id, rows, state=state)
+            
+            conn.execute("""
+                UPDATE run_manifest 
+                SET status = 'completed', row_count_raw = ?
+                WHERE run_id = ?
+            """, [rows, run_id])
+            click.echo(f"[OK] Generated {rows:,} awards")
+            click.echo(f"Run ID: {run_id}")
+        
+        if labels_path:
+            generator.labels().to_csv(labels_path, index=False)
+            click.echo(f"Labels: {labels_path}")
+    
+    finally:
+        conn.close()
@@ -1,90 +1,100 @@
 """Ingest command."""
 import click
-import uuid
-import json
-from datetime import datetime
+from datetime import date
+from civicspend.config import config
+from civicspend.exceptions import ValidationError
 from civicspend.ingest.api_client import USAspendingClient
+from civicspend.ingest.cache import ResponseCache
+from civicspend.ingest.coverage import completed_coverage, missing_ranges
+from civicspend.ingest.runner import create_run, ingest_ranges, load_resume_state
+from civicspend.ingest.writer import DEFAULT_BATCH_ROWS
 from civicspend.db.connection import get_connection
 
 @click.command()
-@click.option('--state', required=True, help='State code (e.g., MN)')
-@click.option('--start-date', required=True, help='Start date (YYYY-MM-DD)')
-@click.option('--end-date', required=True, help='End date (YYYY-MM-DD)')
+@click.option('--state', help='State code (e.g., MN)')
+@click.option('--start-date', help='Start date (YYYY-MM-DD)')
+@click.option('--end-date', help='End date (YYYY-MM-DD)')
 @click.option('--limit', default=100, help='Records per page')
 @click.option('--max-pages', default=5, help='Maximum pages to fetch')
-def ingest(state, start_date, end_date, limit, max_pages):
+@click.option('--workers', default=None, type=int, help='Pages fetched concurrently (default: api.max_workers)')
+@click.option('--batch-rows', default=DEFAULT_BATCH_ROWS, help='Awards buffered per bulk insert')
+@click.option('--resume', 'resume_run_id', default=None, help='Continue an interrupted run from its last checkpoint')
+@click.option('--cache/--no-cache', 'use_cache', default=None, help='Cache API responses on disk (default: cache.enabled)')
+@click.option('--offline', is_flag=True, help='Replay responses from the cache without network access')
+@click.option('--incremental', is_flag=True, help='Only fetch date ranges not covered by completed runs')
+def ingest(state, start_date, end_date, limit, max_pages, workers, batch_rows, resume_run_id,
+           use_cache, offline, incremental):
     """Ingest awards from USAspending API."""
-    run_id = str(uuid.uuid4())
-    click.echo(f"Starting ingestion run: {run_id}")
-    click.echo(f"Fetching {state} awards from {start_date} to {end_date}")
-    
-    client = USAspendingClient()
     conn = get_connection()
-    
-    # Create run manifest
-    filters = {
-        "state": state,
-        "start_date": start_date,
-        "end_date": end_date
-    }
-    
-    conn.execute("""
-        INSERT INTO run_manifest (run_id, filters_json, status)
-        VALUES (?, ?, 'running')
-    """, [run_id, json.dumps(filters)])
-    
+    start_page = 1
     total_records = 0
-    
+
+    if resume_run_id:
+        run_id = resume_run_id
+        try:
+            resume = load_resume_state(conn, run_id)
+        except ValidationError as e:
+            conn.close()
+            raise click.ClickException(str(e))
+
+        filters = resume['filters']
+        fetch_ranges = resume['fetch_ranges']
+        start_page = resume['start_page']
+        limit = resume['limit'] or limit
+        max_pages = resume.get('max_pages', max_pages)
+        total_records = resume['rows_written']
+        click.echo(f"Resuming ingestion run: {run_id} at page {start_page}")
+
+    else:
+        if not (state and start_date and end_date):
+            conn.close()
+            raise click.UsageError("--state, --start-date and --end-date are required")
+
+        # Create run manifest
+        filters = {
+            "state": state,
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        fetch_ranges = [(start_date, end_date)]
+
+        if incremental:
+            start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+            covered, base_run_ids = completed_coverage(conn, state, start, end)
+            fetch_ranges = [(s.isoformat(), e.isoformat()) for s, e in missing_ranges(covered, start, end)]
+
+            if not fetch_ranges:
+                click.echo(f"[OK] {state} {start_date} to {end_date} is already covered by completed runs")
+                conn.close()
+                return
+
+            filters["fetch_ranges"] = fetch_ranges
+            filters["base_run_ids"] = base_run_ids
+
+        run_id = create_run(conn, filters)
+        click.echo(f"Starting ingestion run: {run_id}")
+
+    if use_cache is None:
+        use_cache = config.get('cache.enabled', False)
+    cache = ResponseCache.from_config(offline=offline) if (use_cache or offline) else None
+
+    client = USAspendingClient(max_workers=workers, cache=cache)
+
     try:
-        for page in range(1, max_pages + 1):
-            click.echo(f"Fetching page {page}...")
-            
-            result = client.fetch_awards(state, start_date, end_date, limit, page)
-            
-            if not result.get('results'):
-                break
-            
-            # Insert awards
-            for award in result['results']:
-                award_id = award.get('Award ID', f"unknown_{uuid.uuid4()}")
-                
-                conn.execute("""
-                    INSERT OR IGNORE INTO raw_awards (
-                        run_id, award_id, recipient_name, recipient_duns,
-                        awarding_agency_name, action_date, obligation_amount,
-                        place_of_performance_state
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, [
-                    run_id,
-                    award_id,
-                    award.get('Recipient Name'),
-                    award.get('recipient_duns'),
-                    award.get('Awarding Agency'),
-                    award.get('Start Date'),
-                    award.get('Award Amount', 0),
-                    state
-                ])
-                total_records += 1
-            
-            click.echo(f"  Inserted {len(result['results'])} records")
-        
-        # Update manifest
-        conn.execute("""
-            UPDATE run_manifest 
-            SET status = 'completed', row_count_raw = ?
-            WHERE run_id = ?
-        """, [total_records, run_id])
-        
+        total_records = ingest_ranges(
+            conn, client, run_id, filters, fetch_ranges,
+            limit=limit, max_pages=max_pages, batch_rows=batch_rows,
+            start_page=start_page, total_records=total_records, echo=click.echo
+        )
+
         click.echo(f"\n[OK] Ingestion complete!")
         click.echo(f"Run ID: {run_id}")
         click.echo(f"Total records: {total_records}")
-        
+
     except Exception as e:
-        conn.execute("""
-            UPDATE run_manifest SET status = 'failed' WHERE run_id = ?
-        """, [run_id])
         click.echo(f"[ERROR] Ingestion failed: {e}")
+        click.echo(f"Resume with: civicspend ingest --resume {run_id}")
         raise
-    
+
     finally:
         conn.close()
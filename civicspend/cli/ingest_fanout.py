@@ -0,0 +1,111 @@
+"""Fan-out ingest command for many states and date shards."""
+import click
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from civicspend.config import config
+from civicspend.ingest.api_client import TokenBucket, USAspendingClient
+from civicspend.ingest.cache import ResponseCache
+from civicspend.ingest.coverage import SHARD_MONTHS, split_range
+from civicspend.ingest.runner import create_run, ingest_ranges, load_resume_state
+from civicspend.ingest.writer import DEFAULT_BATCH_ROWS
+from civicspend.db.connection import get_connection
+
+@click.command()
+@click.option('--states', default=None, help='Comma-separated state codes (e.g., MN,WI,IA)')
+@click.option('--start-date', help='Start date (YYYY-MM-DD)')
+@click.option('--end-date', help='End date (YYYY-MM-DD)')
+@click.option('--shard', type=click.Choice(list(SHARD_MONTHS)), default='month', help='Shard granularity')
+@click.option('--workers', default=4, help='Shards ingested in parallel')
+@click.option('--page-workers', default=1, help='Pages in flight per shard')
+@click.option('--limit', default=100, help='Records per page')
+@click.option('--max-pages', default=None, type=int, help='Maximum pages per shard (default: all)')
+@click.option('--batch-rows', default=DEFAULT_BATCH_ROWS, help='Awards buffered per bulk insert')
+@click.option('--retry', 'retry_fanout_id', default=None, help='Re-run only the unfinished shards of a fan-out')
+@click.option('--cache/--no-cache', 'use_cache', default=None, help='Cache API responses on disk (default: cache.enabled)')
+def ingest_fanout(states, start_date, end_date, shard, workers, page_workers, limit, max_pages,
+                  batch_rows, retry_fanout_id, use_cache):
+    """Ingest many states in date shards under one global rate limit."""
+    conn = get_connection()
+
+    if retry_fanout_id:
+        fanout_id = retry_fanout_id
+        shard_runs = _unfinished_shards(conn, fanout_id)
+        click.echo(f"Retrying {len(shard_runs)} unfinished shard(s) of fan-out {fanout_id}")
+    else:
+        if not (states and start_date and end_date):
+            conn.close()
+            raise click.UsageError("--states, --start-date and --end-date are required")
+
+        fanout_id = str(uuid.uuid4())
+        shard_runs = []
+        shards = split_range(date.fromisoformat(start_date), date.fromisoformat(end_date), shard)
+        for state in [s.strip().upper() for s in states.split(',') if s.strip()]:
+            for shard_start, shard_end in shards:
+                filters = {
+                    "state": state,
+                    "start_date": shard_start.isoformat(),
+                    "end_date": shard_end.isoformat(),
+                    "fanout_id": fanout_id,
+                    "shard": shard
+                }
+                shard_runs.append(create_run(conn, filters))
+        click.echo(f"Starting fan-out {fanout_id}: {len(shard_runs)} shard(s)")
+
+    if use_cache is None:
+        use_cache = config.get('cache.enabled', False)
+    cache = ResponseCache.from_config() if use_cache else None
+
+    # Every shard draws from the same bucket, so the combined rate respects api.rate_limit
+    rate_limiter = TokenBucket(config.api_rate_limit)
+
+    def run_shard(run_id):
+        shard_conn = conn.cursor()
+        try:
+            resume = load_resume_state(shard_conn, run_id)
+            filters = resume['filters']
+            client = USAspendingClient(rate_limiter=rate_limiter, max_workers=page_workers, cache=cache)
+            return ingest_ranges(
+                shard_conn, client, run_id, filters, resume['fetch_ranges'],
+                limit=resume['limit'] or limit, max_pages=resume.get('max_pages', max_pages),
+                batch_rows=batch_rows, start_page=resume['start_page'],
+                total_records=resume['rows_written']
+            )
+        finally:
+            shard_conn.close()
+
+    failed = 0
+    total_records = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_shard, run_id): run_id for run_id in shard_runs}
+            for future in as_completed(futures):
+                run_id = futures[future]
+                try:
+                    count = future.result()
+                    total_records += count
+                    click.echo(f"[OK] Shard {run_id}: {count} records")
+                except Exception as e:
+                    failed += 1
+                    click.echo(f"[ERROR] Shard {run_id} failed: {e}")
+    finally:
+        conn.close()
+
+    click.echo(f"\nFan-out {fanout_id}: {len(shard_runs) - failed} shard(s) completed, {failed} failed")
+    click.echo(f"Total records: {total_records}")
+
+    if failed:
+        click.echo(f"Retry with: civicspend ingest-fanout --retry {fanout_id}")
+        raise click.ClickException(f"{failed} shard(s) failed")
+
+
+def _unfinished_shards(conn, fanout_id):
+    """Run IDs of shards in a fan-out that did not complete."""
+    rows = conn.execute("""
+        SELECT run_id, filters_json FROM run_manifest
+        WHERE status != 'completed' AND filters_json IS NOT NULL
+        ORDER BY run_timestamp
+    """).fetchall()
+    return [run_id for run_id, filters_json in rows
+            if json.loads(filters_json).get('fanout_id') == fanout_id]
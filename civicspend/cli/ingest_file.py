@@ -0,0 +1,51 @@
+"""Ingest-file command for USAspending bulk downloads."""
+import click
+import uuid
+import json
+from civicspend.ingest.bulk_file import load_bulk_files
+from civicspend.db.connection import get_connection
+
+@click.command()
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--state', default=None, help='Keep only awards performed in this state (e.g., MN)')
+def ingest_file(paths, state):
+    """Ingest USAspending bulk-download CSV or ZIP files."""
+    run_id = str(uuid.uuid4())
+    click.echo(f"Starting file ingestion run: {run_id}")
+    
+    conn = get_connection()
+    
+    # Create run manifest
+    filters = {
+        "source": "bulk_file",
+        "files": [str(p) for p in paths],
+        "state": state
+    }
+    
+    conn.execute("""
+        INSERT INTO run_manifest (run_id, filters_json, status)
+        VALUES (?, ?, 'running')
+    """, [run_id, json.dumps(filters)])
+    
+    try:
+        total_records = load_bulk_files(conn, run_id, list(paths), state)
+        
+        conn.execute("""
+            UPDATE run_manifest 
+            SET status = 'completed', row_count_raw = ?
+            WHERE run_id = ?
+        """, [total_records, run_id])
+        
+        click.echo(f"\n[OK] Ingestion complete!")
+        click.echo(f"Run ID: {run_id}")
+        click.echo(f"Total records: {total_records}")
+        
+    except Exception as e:
+        conn.execute("""
+            UPDATE run_manifest SET status = 'failed' WHERE run_id = ?
+        """, [run_id])
+        click.echo(f"[ERROR] Ingestion failed: {e}")
+        raise
+    
+    finally:
+        conn.close()
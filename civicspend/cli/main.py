@@ -2,11 +2,14 @@
 import click
 from civicspend.db.connection import init_database
 from civicspend.cli.ingest import ingest
+from civicspend.cli.ingest_file import ingest_file
+from civicspend.cli.ingest_fanout import ingest_fanout
 from civicspend.cli.normalize import normalize
 from civicspend.cli.build_features import build_features
 from civicspend.cli.detect import detect
 from civicspend.cli.train_model import train_model
 from civicspend.cli.export import export
+from civicspend.cli.generate_mock import generate_mock
 
 @click.group()
 @click.version_option(version="0.1.0-dev")
@@ -22,11 +25,14 @@ def init():
     click.echo("[OK] Database initialized!")
 
 cli.add_command(ingest)
+cli.add_command(ingest_file)
+cli.add_command(ingest_fanout)
 cli.add_command(normalize)
 cli.add_command(build_features)
 cli.add_command(detect)
 cli.add_command(train_model)
 cli.add_command(export)
+cli.add_command(generate_mock)
 
 if __name__ == "__main__":
     cli()
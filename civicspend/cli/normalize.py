@@ -5,11 +5,20 @@ from civicspend.normalize.vendor_matcher import VendorMatcher
 @click.command()
 @click.option('--run-id', required=True, help='Run ID to normalize')
 @click.option('--threshold', default=85.0, help='Fuzzy match threshold')
-def normalize(run_id, threshold):
+@click.option('--batch/--per-award', default=True, help='Score each distinct name once on all cores')
+@click.option('--cluster', is_flag=True, help='Also update union-find vendor clusters')
+def normalize(run_id, threshold, batch, cluster):
     """Normalize vendor identities."""
     click.echo(f"Normalizing vendors for run: {run_id}")
     
     matcher = VendorMatcher(threshold=threshold)
-    vendor_count = matcher.normalize_run(run_id)
+    if batch:
+        vendor_count = matcher.normalize_run_batch(run_id)
+    else:
+        vendor_count = matcher.normalize_run(run_id)
     
     click.echo(f"[OK] Normalized to {vendor_count} unique vendors")
+    
+    if cluster:
+        cluster_count = matcher.update_clusters(run_id)
+        click.echo(f"[OK] Run spans {cluster_count} vendor clusters")
@@ -9,7 +9,7 @@ def train_model(run_id, contamination):
     """Train ML anomaly detection model."""
     click.echo(f"Training Isolation Forest on run: {run_id}")
     
-    detector = MLDetector(contamination=contamination)
+    detector = MLDetector(contamination=contamination, use_store=True)
     sample_count = detector.train(run_id)
     model_path = detector.save_model(run_id)
     
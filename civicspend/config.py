@@ -40,7 +40,7 @@ class Config:
         """Get default configuration."""
         return {
             'database': {'path': 'data/civicspend.duckdb', 'timeout': 30},
-            'api': {'base_url': 'https://api.usaspending.gov/api/v2', 'rate_limit': 5},
+            'api': {'base_url': 'https://api.usaspending.gov/api/v2', 'rate_limit': 5, 'max_workers': 4},
             'normalization': {'fuzzy_threshold': 85},
             'ml': {'contamination': 0.05},
             'logging': {'level': 'INFO', 'file': 'data/civicspend.log'}
@@ -0,0 +1,87 @@
+"""Persisted detector output shared by the CLI, API and dashboards.
+
+Detectors write their anomalies to the ``anomalies`` table once per run,
+tagged with the detector name and a version string of its parameters.
+Front ends read them back through ``load_anomalies`` instead of deriving
+severities themselves, so every view shows the same findings.
+"""
+from typing import Optional
+
+import pandas as pd
+
+from civicspend.db.transaction import rollback
+
+ANOMALY_COLUMNS = ['vendor_id', 'year_month', 'score', 'severity']
+
+
+def store_anomalies(
+    conn,
+    run_id: str,
+    detector: str,
+    detector_version: str,
+    anomalies: pd.DataFrame,
+    replace: bool = True
+) -> int:
+    """Write a detector's anomalies for a run in one transaction.
+
+    ``anomalies`` needs the ANOMALY_COLUMNS. With ``replace`` the
+    detector's earlier rows for the run are dropped first, as for a full
+    re-detection; otherwise rows are upserted by vendor-month. Returns the
+    number of rows written.
+    """
+    frame = anomalies[ANOMALY_COLUMNS].copy()
+    frame['score'] = frame['score'].astype(float)
+
+    conn.register('anomaly_updates', frame)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if replace:
+            conn.execute("""
+                DELETE FROM anomalies WHERE run_id = ? AND detector = ?
+            """, [run_id, detector])
+        written = conn.execute("""
+            INSERT OR REPLACE INTO anomalies (
+                run_id, detector, detector_version, vendor_id, year_month, score, severity, detected_at
+            )
+            SELECT ?, ?, ?, vendor_id, year_month, score, severity, current_timestamp
+            FROM anomaly_updates
+        """, [run_id, detector, detector_version]).fetchone()[0]
+        conn.execute("COMMIT")
+    except Exception:
+        rollback(conn)
+        raise
+    finally:
+        conn.unregister('anomaly_updates')
+
+    return written
+
+
+def load_anomalies(
+    conn,
+    run_id: Optional[str] = None,
+    detector: Optional[str] = None,
+    severity: Optional[str] = None,
+    vendor_id: Optional[str] = None,
+    limit: int = 100
+) -> pd.DataFrame:
+    """Stored anomalies with vendor names and monthly spend, largest spend first."""
+    where, params = [], []
+    for column, value in [('run_id', run_id), ('detector', detector),
+                          ('severity', severity), ('vendor_id', vendor_id)]:
+        if value is not None:
+            where.append(f"a.{column} = ?")
+            params.append(value)
+
+    return conn.execute(f"""
+        SELECT
+            a.run_id, a.detector, a.detector_version, a.vendor_id,
+            ve.canonical_name AS vendor_name, a.year_month, a.score, a.severity,
+            CAST(mvs.obligation_sum AS DOUBLE) AS value, mvs.award_count
+        FROM anomalies a
+        LEFT JOIN vendor_entities ve ON ve.vendor_id = a.vendor_id
+        LEFT JOIN monthly_vendor_spend mvs
+            ON mvs.run_id = a.run_id AND mvs.vendor_id = a.vendor_id AND mvs.year_month = a.year_month
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY value DESC NULLS LAST, a.vendor_id, a.year_month
+        LIMIT ?
+    """, params + [limit]).df()
@@ -0,0 +1,99 @@
+"""Content-addressed award storage shared across runs.
+
+Each distinct version of an award is stored once in ``award_store``, keyed
+by ``(award_id, row_hash)``. Runs only record membership in ``run_awards``,
+and the ``raw_awards`` view joins the two back into the per-run layout.
+"""
+import threading
+
+from civicspend.db.transaction import rollback
+
+# Award content columns and the types they are stored with
+AWARD_COLUMNS = {
+    'award_id': 'TEXT',
+    'recipient_name': 'TEXT',
+    'recipient_duns': 'TEXT',
+    'awarding_agency_name': 'TEXT',
+    'action_date': 'DATE',
+    'obligation_amount': 'DECIMAL(18,2)',
+    'place_of_performance_state': 'TEXT',
+}
+
+CONTENT_COLUMNS = [col for col in AWARD_COLUMNS if col != 'award_id']
+
+ROW_HASH_SQL = "md5(to_json([{}]))".format(
+    ", ".join(f"CAST({col} AS VARCHAR)" for col in CONTENT_COLUMNS)
+)
+
+# Cursors of one connection (ingest-fanout shards) that insert the same new
+# award version in overlapping transactions conflict on the award_store key
+# at COMMIT. Writers hold this lock for the whole transaction around
+# store_run_awards so those transactions run one at a time.
+STORE_LOCK = threading.Lock()
+
+
+def store_run_awards(conn, run_id: str, select_sql: str, params: list = None) -> int:
+    """Add awards produced by ``select_sql`` to a run.
+
+    ``select_sql`` must return the AWARD_COLUMNS. Award versions already in
+    the store are not rewritten; the run just gains a membership row. An
+    award already in the run is left as is, matching the old
+    ``INSERT OR IGNORE`` semantics. Returns the number of awards added to
+    the run. Callers own the transaction and hold STORE_LOCK for all of it.
+    """
+    typed = ", ".join(f"CAST({col} AS {sql_type}) AS {col}" for col, sql_type in AWARD_COLUMNS.items())
+
+    conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE award_stage AS
+        SELECT *, {ROW_HASH_SQL} AS row_hash
+        FROM (SELECT {typed} FROM ({select_sql}) src) typed_src
+        QUALIFY row_number() OVER (PARTITION BY award_id ORDER BY row_hash) = 1
+    """, params or [])
+
+    try:
+        conn.execute(f"""
+            INSERT OR IGNORE INTO award_store (award_id, row_hash, {", ".join(CONTENT_COLUMNS)})
+            SELECT award_id, row_hash, {", ".join(CONTENT_COLUMNS)} FROM award_stage
+        """)
+        added = conn.execute("""
+            INSERT OR IGNORE INTO run_awards (run_id, award_id, row_hash)
+            SELECT ?, award_id, row_hash FROM award_stage
+        """, [run_id]).fetchone()[0]
+    finally:
+        conn.execute("DROP TABLE IF EXISTS award_stage")
+
+    return added
+
+
+def migrate_legacy_raw_awards(conn) -> bool:
+    """Move rows from a pre-award_store ``raw_awards`` table into the store.
+
+    Returns True if a legacy table was found and replaced.
+    """
+    table_type = conn.execute("""
+        SELECT table_type FROM information_schema.tables
+        WHERE table_name = 'raw_awards' AND table_schema = 'main'
+    """).fetchone()
+
+    if not table_type or table_type[0] != 'BASE TABLE':
+        return False
+
+    run_ids = [r[0] for r in conn.execute("SELECT DISTINCT run_id FROM raw_awards").fetchall()]
+
+    with STORE_LOCK:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            for run_id in run_ids:
+                store_run_awards(
+                    conn, run_id,
+                    f"SELECT {', '.join(AWARD_COLUMNS)} FROM raw_awards WHERE run_id = ?",
+                    [run_id]
+                )
+            conn.execute("DROP INDEX IF EXISTS idx_raw_awards_run_id")
+            conn.execute("DROP TABLE raw_awards")
+            conn.execute("COMMIT")
+        except Exception:
+            rollback(conn)
+            raise
+
+    return True
@@ -1,6 +1,7 @@
 """Database connection and initialization."""
 import duckdb
 from pathlib import Path
+from civicspend.db.award_store import migrate_legacy_raw_awards
 
 DB_PATH = Path("data/civicspend.duckdb")
 
@@ -14,6 +15,12 @@ def init_database():
     conn = get_connection()
     schema_path = Path(__file__).parent / "schema.sql"
     with open(schema_path) as f:
-        conn.execute(f.read())
+        schema = f.read()
+    conn.execute(schema)
+    
+    # Databases created before award_store have raw_awards as a table
+    if migrate_legacy_raw_awards(conn):
+        conn.execute(schema)
+    
     conn.close()
     return True
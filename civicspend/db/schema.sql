@@ -8,24 +8,81 @@ CREATE TABLE IF NOT EXISTS run_manifest (
     status TEXT
 );
 
-CREATE TABLE IF NOT EXISTS raw_awards (
-    run_id TEXT NOT NULL,
+-- Each distinct version of an award is stored once, keyed by a hash of its content
+CREATE TABLE IF NOT EXISTS award_store (
     award_id TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
     recipient_name TEXT,
     recipient_duns TEXT,
     awarding_agency_name TEXT,
     action_date DATE,
     obligation_amount DECIMAL(18,2),
     place_of_performance_state TEXT,
+    first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (award_id, row_hash)
+);
+
+-- Which award versions belong to each run
+CREATE TABLE IF NOT EXISTS run_awards (
+    run_id TEXT NOT NULL,
+    award_id TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
     PRIMARY KEY (run_id, award_id)
 );
 
+-- Per-run award rows, in the original raw_awards layout
+CREATE VIEW IF NOT EXISTS raw_awards AS
+SELECT
+    ra.run_id,
+    ra.award_id,
+    s.recipient_name,
+    s.recipient_duns,
+    s.awarding_agency_name,
+    s.action_date,
+    s.obligation_amount,
+    s.place_of_performance_state
+FROM run_awards ra
+JOIN award_store s ON ra.award_id = s.award_id AND ra.row_hash = s.row_hash;
+
+CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+    run_id TEXT PRIMARY KEY,
+    filters_hash TEXT NOT NULL,
+    page_limit INTEGER NOT NULL,
+    last_page INTEGER NOT NULL,
+    rows_written INTEGER,
+    page_cap INTEGER,  -- last page the run may fetch, NULL when uncapped
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Checkpoint tables created before page_cap was recorded
+ALTER TABLE ingest_checkpoints ADD COLUMN IF NOT EXISTS page_cap INTEGER;
+
 CREATE TABLE IF NOT EXISTS vendor_entities (
     vendor_id TEXT PRIMARY KEY,
     canonical_name TEXT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE IF NOT EXISTS vendor_aliases (
+    alias_type TEXT NOT NULL,  -- name (exact, normalized), name@<threshold> (fuzzy), duns or uei
+    alias_value TEXT NOT NULL,
+    vendor_id TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (alias_type, alias_value)
+);
+
+CREATE TABLE IF NOT EXISTS vendor_clusters (
+    node TEXT PRIMARY KEY,  -- name:<normalized>, duns:<id> or uei:<id>
+    root TEXT NOT NULL,
+    representative TEXT,  -- set on root rows only
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE VIEW IF NOT EXISTS vendor_cluster_members AS
+SELECT c.node, c.root, r.representative
+FROM vendor_clusters c
+JOIN vendor_clusters r ON r.node = c.root;
+
 CREATE TABLE IF NOT EXISTS award_vendor_map (
     run_id TEXT NOT NULL,
     award_id TEXT NOT NULL,
@@ -45,5 +102,50 @@ CREATE TABLE IF NOT EXISTS monthly_vendor_spend (
     PRIMARY KEY (run_id, vendor_id, year_month)
 );
 
-CREATE INDEX IF NOT EXISTS idx_raw_awards_run_id ON raw_awards(run_id);
+CREATE TABLE IF NOT EXISTS feature_sets (
+    run_id TEXT PRIMARY KEY,
+    feature_version TEXT NOT NULL,  -- hash of the feature definitions
+    input_hash TEXT NOT NULL,  -- fingerprint of monthly_vendor_spend rows
+    path TEXT NOT NULL,
+    row_count INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS spending_cube (
+    run_id TEXT NOT NULL,
+    grain TEXT NOT NULL,  -- week | month | quarter | all
+    period TEXT NOT NULL,  -- week start date, YYYY-MM, YYYY-Qn or 'all'
+    level TEXT NOT NULL,  -- total | vendor | agency | vendor_agency
+    vendor_id TEXT,
+    agency TEXT,
+    obligation_sum DECIMAL(18,2),
+    award_count INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS vendor_sketches (
+    vendor_id TEXT PRIMARY KEY,
+    observations INTEGER NOT NULL,  -- months folded in
+    median_heights DOUBLE[],  -- P² markers of monthly spend; raw values while < 5 months
+    median_positions DOUBLE[],
+    mad_heights DOUBLE[],  -- P² markers of |spend - running median|
+    mad_positions DOUBLE[],
+    last_month TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS anomalies (
+    run_id TEXT NOT NULL,
+    detector TEXT NOT NULL,  -- robust_mad | streaming_mad | isolation_forest
+    detector_version TEXT NOT NULL,  -- detector code and parameters
+    vendor_id TEXT NOT NULL,
+    year_month TEXT NOT NULL,
+    score DOUBLE,  -- robust z-score or isolation forest score
+    severity TEXT NOT NULL,  -- critical | high | medium | low
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, detector, vendor_id, year_month)
+);
+
 CREATE INDEX IF NOT EXISTS idx_award_vendor_map_vendor ON award_vendor_map(vendor_id);
+CREATE INDEX IF NOT EXISTS idx_spending_cube_level ON spending_cube(run_id, grain, level);
+CREATE INDEX IF NOT EXISTS idx_anomalies_run_severity ON anomalies(run_id, severity);
+CREATE INDEX IF NOT EXISTS idx_anomalies_vendor ON anomalies(vendor_id);
@@ -0,0 +1,16 @@
+"""Transaction helpers shared by the database writers."""
+import duckdb
+
+
+def rollback(conn):
+    """Roll back the open transaction, if there still is one.
+
+    A COMMIT that fails (for example on a primary key conflict) already
+    ends the transaction, and a second ROLLBACK would raise "no transaction
+    is active" over the original error. Writers call this from their
+    ``except`` blocks before re-raising.
+    """
+    try:
+        conn.execute("ROLLBACK")
+    except duckdb.TransactionException:
+        pass
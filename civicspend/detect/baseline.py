@@ -1,15 +1,23 @@
 """Baseline anomaly detection using Robust MAD."""
 import numpy as np
 import pandas as pd
+from civicspend.db.anomaly_store import store_anomalies
 from civicspend.db.connection import get_connection
 
 class RobustMADDetector:
     """Detect anomalies using Modified Z-score (Robust MAD)."""
     
+    DETECTOR = 'robust_mad'
+    VERSION = '2'
+    
     def __init__(self, threshold: float = 3.5):
         self.threshold = threshold
         self.conn = get_connection()
     
+    @property
+    def detector_version(self) -> str:
+        return f"{self.VERSION}:threshold={self.threshold}"
+    
     def compute_robust_z(self, series: np.ndarray) -> np.ndarray:
         """Compute robust z-scores using MAD."""
         median = np.median(series)
@@ -20,52 +28,54 @@ class RobustMADDetector:
         
         return 0.6745 * (series - median) / mad
     
-    def detect_run(self, run_id: str, min_months: int = 3):
-        """Detect anomalies for a run."""
-        # Get monthly spend data
-        query = """
-            SELECT vendor_id, year_month, obligation_sum
-            FROM monthly_vendor_spend
-            WHERE run_id = ?
-            ORDER BY vendor_id, year_month
-        """
-        
-        df = pd.read_sql_query(query, self.conn, params=[run_id])
+    def detect_run(self, run_id: str, min_months: int = 3) -> pd.DataFrame:
+        """Detect anomalies for a run.
         
-        if df.empty:
-            return []
-        
-        anomalies = []
-        
-        # Detect per vendor
-        for vendor_id, group in df.groupby('vendor_id'):
-            if len(group) < min_months:
-                continue
-            
-            values = group['obligation_sum'].values
-            robust_z = self.compute_robust_z(values)
-            
-            # Find anomalies
-            for idx, (z_score, row) in enumerate(zip(robust_z, group.itertuples())):
-                if abs(z_score) > self.threshold:
-                    severity = self._get_severity(abs(z_score))
-                    anomalies.append({
-                        'vendor_id': vendor_id,
-                        'year_month': row.year_month,
-                        'z_score': float(z_score),
-                        'severity': severity,
-                        'value': float(row.obligation_sum)
-                    })
+        Per-vendor median and MAD are computed for all vendors in one DuckDB
+        query, which also derives modified z-scores and keeps rows beyond
+        the threshold; vendors with fewer than ``min_months`` months or zero
+        MAD are skipped. Returns one row per anomaly with ``vendor_id``,
+        ``year_month``, ``z_score``, ``severity`` and ``value``, ordered by
+        vendor and month.
+        """
+        df = self.conn.execute("""
+            WITH series AS (
+                SELECT
+                    vendor_id,
+                    year_month,
+                    CAST(obligation_sum AS DOUBLE) AS value,
+                    MEDIAN(CAST(obligation_sum AS DOUBLE)) OVER vendor AS median,
+                    COUNT(*) OVER vendor AS months
+                FROM monthly_vendor_spend
+                WHERE run_id = ?
+                WINDOW vendor AS (PARTITION BY vendor_id)
+            ),
+            scored AS (
+                SELECT *, MEDIAN(ABS(value - median)) OVER (PARTITION BY vendor_id) AS mad
+                FROM series
+                WHERE months >= ?
+            )
+            SELECT vendor_id, year_month, 0.6745 * (value - median) / mad AS z_score, value
+            FROM scored
+            WHERE mad > 0
+            AND ABS(0.6745 * (value - median) / mad) > ?
+            ORDER BY vendor_id, year_month
+        """, [run_id, min_months, self.threshold]).df()
         
-        return anomalies
+        df.insert(3, 'severity', self._severity(df['z_score'].abs().to_numpy()))
+        return df
+    
+    def _severity(self, z_score: np.ndarray) -> np.ndarray:
+        """Map absolute z-scores to severities."""
+        return np.select(
+            [z_score > 4.0, z_score > 3.5, z_score > 3.0],
+            ['critical', 'high', 'medium'],
+            default='low'
+        )
     
-    def _get_severity(self, z_score: float) -> str:
-        """Map z-score to severity."""
-        if z_score > 4.0:
-            return 'critical'
-        elif z_score > 3.5:
-            return 'high'
-        elif z_score > 3.0:
-            return 'medium'
-        else:
-            return 'low'
+    def save_anomalies(self, run_id: str, anomalies: pd.DataFrame, replace: bool = True) -> int:
+        """Persist detected anomalies, z-scores as scores, to the anomalies table."""
+        return store_anomalies(
+            self.conn, run_id, self.DETECTOR, self.detector_version,
+            anomalies.rename(columns={'z_score': 'score'}), replace=replace
+        )
@@ -1,25 +1,38 @@
 """ML anomaly detection using Isolation Forest."""
 import joblib
 import numpy as np
+import pandas as pd
 from pathlib import Path
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
+from civicspend.db.anomaly_store import ANOMALY_COLUMNS, store_anomalies
 from civicspend.features.engineer import FeatureEngineer
+from civicspend.features.store import FeatureStore, feature_version
 
 class MLDetector:
     """ML-based anomaly detection."""
     
-    def __init__(self, contamination: float = 0.05, random_state: int = 42):
+    DETECTOR = 'isolation_forest'
+    VERSION = '1'
+    
+    def __init__(self, contamination: float = 0.05, random_state: int = 42, use_store: bool = False):
         self.contamination = contamination
         self.random_state = random_state
         self.model = None
         self.scaler = None
         self.engineer = FeatureEngineer()
+        self.store = FeatureStore(self.engineer) if use_store else None
+    
+    def load_features(self, run_id: str):
+        """Engineered features for a run, from the feature store when enabled."""
+        if self.store is not None:
+            return self.store.load(run_id)
+        return self.engineer.engineer_features(run_id)
     
     def train(self, run_id: str, min_samples: int = 10):
         """Train Isolation Forest on historical data."""
         # Engineer features
-        df = self.engineer.engineer_features(run_id)
+        df = self.load_features(run_id)
         
         if len(df) < min_samples:
             raise ValueError(f"Need at least {min_samples} samples, got {len(df)}")
@@ -50,7 +63,7 @@ class MLDetector:
             raise ValueError("Model not trained. Call train() first.")
         
         # Engineer features
-        df = self.engineer.engineer_features(run_id)
+        df = self.load_features(run_id)
         
         if df.empty:
             return []
@@ -82,6 +95,20 @@ class MLDetector:
         
         return anomalies
     
+    @property
+    def detector_version(self) -> str:
+        features = self.store.version if self.store is not None else feature_version()
+        # A loaded model scores with the contamination it was trained with
+        contamination = self.model.contamination if self.model is not None else self.contamination
+        return f"{self.VERSION}:features={features}:contamination={contamination}"
+    
+    def save_anomalies(self, run_id: str, anomalies: list) -> int:
+        """Persist predicted anomalies to the anomalies table."""
+        return store_anomalies(
+            self.engineer.conn, run_id, self.DETECTOR, self.detector_version,
+            pd.DataFrame(anomalies, columns=ANOMALY_COLUMNS)
+        )
+    
     def save_model(self, run_id: str):
         """Save trained model."""
         model_dir = Path(f"models/{run_id}")
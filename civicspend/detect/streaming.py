@@ -0,0 +1,291 @@
+"""Online robust MAD scoring with per-vendor P² quantile sketches."""
+import numpy as np
+import pandas as pd
+
+from civicspend.detect.baseline import RobustMADDetector
+from civicspend.db.transaction import rollback
+
+# P² markers track the min, lower quartile, median, upper quartile and max
+MARKERS = 5
+MIDDLE = MARKERS // 2
+INCREMENTS = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+
+
+def marker_positions(count: np.ndarray) -> np.ndarray:
+    """Marker ranks of sketches holding ``count`` observations (1..5 while filling).
+
+    Fractional ranks round half up, so rank 2.5 is 3 rather than the 2 that
+    ``np.round`` (half to even) would give.
+    """
+    count = np.asarray(count)[:, None]
+    return np.where(
+        count >= MARKERS,
+        np.floor(1 + (count - 1) * INCREMENTS[None, :] + 0.5),
+        np.arange(1, MARKERS + 1)[None, :]
+    ).astype(float)
+
+
+def p2_update(heights: np.ndarray, positions: np.ndarray, count: np.ndarray, x: np.ndarray):
+    """Add one observation to each of many median sketches, in place.
+
+    Rows are independent P² sketches (Jain & Chlamtac, 1985): ``heights``
+    and ``positions`` are ``(rows, 5)`` marker heights and ranks and
+    ``count`` the observations each holds before ``x``. Until a sketch has
+    five observations its heights are the sorted raw values, NaN-padded.
+    """
+    filling = np.flatnonzero(count < MARKERS)
+    if len(filling):
+        heights[filling, count[filling]] = x[filling]
+        heights[filling] = np.sort(heights[filling], axis=1)
+
+    rows = np.flatnonzero(count >= MARKERS)
+    if not len(rows):
+        return
+    q, n, value = heights[rows], positions[rows], x[rows]
+    idx = np.arange(len(rows))
+
+    # Stretch the extremes, then shift the ranks of markers above the new value
+    q[:, 0] = np.minimum(q[:, 0], value)
+    q[:, -1] = np.maximum(q[:, -1], value)
+    cell = (value[:, None] >= q[:, 1:-1]).sum(axis=1)
+    n += np.arange(MARKERS)[None, :] > cell[:, None]
+    desired = 1 + count[rows][:, None] * INCREMENTS[None, :]
+
+    # Move interior markers one rank toward their desired ranks
+    for i in range(1, MARKERS - 1):
+        d = desired[:, i] - n[:, i]
+        move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | ((d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+        step = np.where(move, np.sign(d), 0.0)
+        neighbour = np.where(step > 0, i + 1, i - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            parabolic = q[:, i] + step / (n[:, i + 1] - n[:, i - 1]) * (
+                (n[:, i] - n[:, i - 1] + step) * (q[:, i + 1] - q[:, i]) / (n[:, i + 1] - n[:, i])
+                + (n[:, i + 1] - n[:, i] - step) * (q[:, i] - q[:, i - 1]) / (n[:, i] - n[:, i - 1])
+            )
+            linear = q[:, i] + step * (q[idx, neighbour] - q[:, i]) / (n[idx, neighbour] - n[:, i])
+        inside = (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1])
+        q[:, i] = np.where(move, np.where(inside, parabolic, linear), q[:, i])
+        n[:, i] += step
+
+    heights[rows], positions[rows] = q, n
+
+
+def sketch_median(heights: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """Median of each sketch: exact while filling, the middle marker after."""
+    median = np.full(len(count), np.nan)
+    filling = (count > 0) & (count < MARKERS)
+    median[filling] = np.nanmedian(heights[filling], axis=1)
+    return np.where(count >= MARKERS, heights[:, MIDDLE], median)
+
+
+class StreamingMADDetector(RobustMADDetector):
+    """Score new vendor-months against stored per-vendor median/MAD sketches.
+
+    ``vendor_sketches`` keeps, per vendor, a P² sketch of monthly spend, one
+    of absolute deviations from the running median, the number of months
+    folded in and the latest month seen. ``score_run`` scores each vendor's
+    later months against that state and folds them in, O(1) per month;
+    ``cold_start`` builds the state from a run's history in one query.
+
+    Scores are the robust z of ``RobustMADDetector`` measured against the
+    months before the one scored: exact while a vendor has fewer than five
+    months, sketch estimates after.
+    """
+
+    DETECTOR = 'streaming_mad'
+    VERSION = '1'
+
+    def __init__(self, threshold: float = 3.5, min_months: int = 3):
+        super().__init__(threshold)
+        self.min_months = min_months
+
+    @property
+    def detector_version(self) -> str:
+        return f"{self.VERSION}:threshold={self.threshold}:min_months={self.min_months}"
+
+    def save_anomalies(self, run_id: str, anomalies: pd.DataFrame, replace: bool = False) -> int:
+        """Persist anomalies, keeping those stored for earlier months of the run."""
+        return super().save_anomalies(run_id, anomalies, replace=replace)
+
+    def cold_start(self, run_id: str, through_month: str = None) -> int:
+        """Replace the sketches of a run's vendors with ones built from history.
+
+        Markers start at the exact order statistics of the ranks from
+        ``marker_positions``, which are also stored as their positions.
+        Months after ``through_month`` are left for ``score_run``. Returns
+        the number of vendors written.
+        """
+        state = self.conn.execute("""
+            WITH history AS (
+                SELECT
+                    vendor_id,
+                    year_month,
+                    CAST(obligation_sum AS DOUBLE) AS value,
+                    MEDIAN(CAST(obligation_sum AS DOUBLE)) OVER (PARTITION BY vendor_id) AS median
+                FROM monthly_vendor_spend
+                WHERE run_id = ?
+                AND (CAST(? AS TEXT) IS NULL OR year_month <= ?)
+            ),
+            sorted AS (
+                SELECT
+                    vendor_id,
+                    COUNT(*) AS observations,
+                    list_sort(list(value)) AS vals,
+                    list_sort(list(ABS(value - median))) AS devs,
+                    MAX(year_month) AS last_month
+                FROM history
+                GROUP BY vendor_id
+            )
+            SELECT vendor_id, observations, last_month, vals, devs
+            FROM sorted
+            ORDER BY vendor_id
+        """, [run_id, through_month, through_month]).df()
+
+        positions = marker_positions(state['observations'].to_numpy(np.int64))
+        full = state['observations'].to_numpy() >= MARKERS
+        ranks = positions.astype(np.int64) - 1
+        # Filling sketches keep their sorted values and no MAD markers yet
+        state['median_heights'] = [
+            np.asarray(vals)[r] if f else vals for vals, r, f in zip(state['vals'], ranks, full)
+        ]
+        state['mad_heights'] = [
+            np.asarray(devs)[r] if f else [] for devs, r, f in zip(state['devs'], ranks, full)
+        ]
+        state['median_positions'] = list(positions)
+        state['mad_positions'] = list(positions)
+        self._save(state)
+        return len(state)
+
+    def score_run(self, run_id: str, update: bool = True) -> pd.DataFrame:
+        """Score vendor-months newer than each vendor's sketch, then fold them in.
+
+        Returns anomalies in the layout of ``RobustMADDetector.detect_run``.
+        Each month is folded into a vendor's state once; with
+        ``update=False`` new months are scored but the state is not saved.
+        """
+        rows = self.conn.execute("""
+            SELECT
+                m.vendor_id,
+                m.year_month,
+                CAST(m.obligation_sum AS DOUBLE) AS value,
+                ROW_NUMBER() OVER (PARTITION BY m.vendor_id ORDER BY m.year_month) - 1 AS step
+            FROM monthly_vendor_spend m
+            LEFT JOIN vendor_sketches s ON s.vendor_id = m.vendor_id
+            WHERE m.run_id = ?
+            AND m.year_month > COALESCE(s.last_month, '')
+            ORDER BY m.vendor_id, m.year_month
+        """, [run_id]).df()
+        if rows.empty:
+            return pd.DataFrame(columns=['vendor_id', 'year_month', 'z_score', 'severity', 'value'])
+
+        state = self._load(rows['vendor_id'].unique().tolist())
+        count = state['observations'].to_numpy(np.int64, copy=True)
+        median_q, mad_q = self._pad(state['median_heights']), self._pad(state['mad_heights'])
+        median_n = np.stack(state['median_positions'].to_numpy()).astype(float)
+        mad_n = np.stack(state['mad_positions'].to_numpy()).astype(float)
+
+        slot = pd.Index(state['vendor_id']).get_indexer(rows['vendor_id'])
+        values = rows['value'].to_numpy(float)
+        steps = rows['step'].to_numpy()
+        z_scores = np.full(len(rows), np.nan)
+
+        # One vectorized pass per month offset: each vendor's k-th new month
+        for step in range(int(steps.max()) + 1):
+            at = np.flatnonzero(steps == step)
+            vendors, x = slot[at], values[at]
+            n = count[vendors]
+            vq, vn, dq, dn = median_q[vendors], median_n[vendors], mad_q[vendors], mad_n[vendors]
+
+            median = sketch_median(vq, n)
+            mad = np.full(len(n), np.nan)
+            filling = (n > 0) & (n < MARKERS)
+            mad[filling] = np.nanmedian(np.abs(vq[filling] - median[filling, None]), axis=1)
+            mad = np.where(n >= MARKERS, dq[:, MIDDLE], mad)
+            scored = (n >= self.min_months) & (mad > 0)
+            z_scores[at[scored]] = 0.6745 * (x[scored] - median[scored]) / mad[scored]
+
+            p2_update(vq, vn, n, x)
+            # Deviations join the MAD sketch once the median sketch has markers;
+            # the fifth month seeds it with the exact deviations of all five
+            warm = n >= MARKERS
+            sub_q, sub_n = dq[warm], dn[warm]
+            p2_update(sub_q, sub_n, n[warm], np.abs(x[warm] - median[warm]))
+            dq[warm], dn[warm] = sub_q, sub_n
+            seeded = n == MARKERS - 1
+            dq[seeded] = np.sort(np.abs(vq[seeded] - vq[seeded, MIDDLE, None]), axis=1)
+            dn[seeded] = marker_positions(n[seeded] + 1)
+
+            median_q[vendors], median_n[vendors], mad_q[vendors], mad_n[vendors] = vq, vn, dq, dn
+            count[vendors] += 1
+
+        if update:
+            state['observations'] = count
+            # Rows are sorted by vendor then month, in state order
+            state['last_month'] = rows.drop_duplicates('vendor_id', keep='last')['year_month'].to_numpy()
+            state['median_heights'] = [q[:min(c, MARKERS)] for q, c in zip(median_q, count)]
+            state['median_positions'] = list(median_n)
+            state['mad_heights'] = [q if c >= MARKERS else [] for q, c in zip(mad_q, count)]
+            state['mad_positions'] = list(mad_n)
+            self._save(state)
+
+        hits = np.abs(np.nan_to_num(z_scores)) > self.threshold
+        anomalies = rows.loc[hits, ['vendor_id', 'year_month']].reset_index(drop=True)
+        anomalies['z_score'] = z_scores[hits]
+        anomalies['severity'] = self._severity(np.abs(z_scores[hits]))
+        anomalies['value'] = values[hits]
+        return anomalies
+
+    def _load(self, vendor_ids: list) -> pd.DataFrame:
+        """Stored sketches for vendors, empty ones for vendors without state."""
+        stored = self.conn.execute("""
+            SELECT vendor_id, observations, median_heights, median_positions,
+                   mad_heights, mad_positions, last_month
+            FROM vendor_sketches
+            WHERE vendor_id IN (SELECT UNNEST(?))
+        """, [vendor_ids]).df()
+        state = pd.DataFrame({'vendor_id': vendor_ids}).merge(stored, on='vendor_id', how='left')
+
+        known = state['observations'].notna().to_numpy()
+        state['observations'] = state['observations'].fillna(0).astype(np.int64)
+        start = list(range(1, MARKERS + 1))
+        for name in ('median', 'mad'):
+            state[f'{name}_heights'] = [h if k else [] for h, k in zip(state[f'{name}_heights'], known)]
+            state[f'{name}_positions'] = [p if k else start for p, k in zip(state[f'{name}_positions'], known)]
+        return state
+
+    @staticmethod
+    def _pad(lists) -> np.ndarray:
+        heights = np.full((len(lists), MARKERS), np.nan)
+        for row, values in enumerate(lists):
+            heights[row, :len(values)] = values
+        return heights
+
+    def _save(self, state: pd.DataFrame):
+        """Upsert vendor sketches in one transaction."""
+        frame = pd.DataFrame({
+            'vendor_id': state['vendor_id'],
+            'observations': state['observations'],
+            'median_heights': [[float(v) for v in h] for h in state['median_heights']],
+            'median_positions': [[float(v) for v in p] for p in state['median_positions']],
+            'mad_heights': [[float(v) for v in h] for h in state['mad_heights']],
+            'mad_positions': [[float(v) for v in p] for p in state['mad_positions']],
+            'last_month': state['last_month'],
+        })
+        self.conn.register('sketch_updates', frame)
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO vendor_sketches (
+                    vendor_id, observations, median_heights, median_positions,
+                    mad_heights, mad_positions, last_month, updated_at
+                )
+                SELECT vendor_id, observations, median_heights, median_positions,
+                       mad_heights, mad_positions, last_month, current_timestamp
+                FROM sketch_updates
+            """)
+            self.conn.execute("COMMIT")
+        except Exception:
+            rollback(self.conn)
+            raise
+        finally:
+            self.conn.unregister('sketch_updates')
@@ -1,60 +1,207 @@
 """Monthly aggregation and feature engineering."""
-import pandas as pd
+import json
+from typing import Dict, Optional
+
 from civicspend.db.connection import get_connection
+from civicspend.db.transaction import rollback
+
+# Vendor-month totals for one run
+MONTHLY_SQL = """
+    SELECT
+        avm.vendor_id,
+        strftime(ra.action_date, '%Y-%m') AS year_month,
+        SUM(ra.obligation_amount) AS obligation_sum,
+        COUNT(*) AS award_count,
+        AVG(CAST(ra.obligation_amount AS DOUBLE)) AS avg_award_size
+    FROM raw_awards ra
+    JOIN award_vendor_map avm ON ra.run_id = avm.run_id AND ra.award_id = avm.award_id
+    WHERE ra.run_id = ?
+    AND ra.action_date IS NOT NULL
+    GROUP BY avm.vendor_id, year_month
+"""
+
+# A month's rolling MAD reads deviations up to 2 rows back, each of which
+# reads a median up to 2 rows further back
+ROLLING_REACH = 4
+
+
+def rolling_sql(source: str, qualify: str = "") -> str:
+    """Rolling mean and MAD over ``source`` rows, as monthly_vendor_spend columns."""
+    return f"""
+        rolling AS (
+            SELECT
+                *,
+                AVG(CAST(obligation_sum AS DOUBLE)) OVER w AS rolling_3m_mean,
+                ABS(obligation_sum - MEDIAN(CAST(obligation_sum AS DOUBLE)) OVER w) AS deviation
+            FROM {source}
+            WINDOW w AS (PARTITION BY vendor_id ORDER BY year_month ROWS 2 PRECEDING)
+        )
+        SELECT
+            ?, vendor_id, year_month, obligation_sum, award_count,
+            avg_award_size, rolling_3m_mean,
+            MEDIAN(deviation) OVER (
+                PARTITION BY vendor_id ORDER BY year_month ROWS 2 PRECEDING
+            ) AS rolling_3m_mad
+        FROM rolling
+        {qualify}
+    """
+
 
 class MonthlyAggregator:
     """Aggregate spending by vendor and month."""
-    
+
     def __init__(self):
         self.conn = get_connection()
-    
+
     def aggregate_run(self, run_id: str):
-        """Aggregate monthly spend for a run."""
-        # Get awards with vendor mapping
-        query = """
-            SELECT 
-                avm.vendor_id,
-                strftime('%Y-%m', ra.action_date) as year_month,
-                ra.obligation_amount
-            FROM raw_awards ra
-            JOIN award_vendor_map avm ON ra.run_id = avm.run_id AND ra.award_id = avm.award_id
-            WHERE ra.run_id = ?
-            AND ra.action_date IS NOT NULL
+        """Aggregate monthly spend for a run.
+
+        Rolling statistics cover the vendor's current and two previous
+        months with activity: ``rolling_3m_mean`` averages monthly spend and
+        ``rolling_3m_mad`` is the rolling median of each month's deviation
+        from its rolling median.
         """
-        
-        df = pd.read_sql_query(query, self.conn, params=[run_id])
-        
-        if df.empty:
-            return 0
-        
-        # Monthly aggregation
-        monthly = df.groupby(['vendor_id', 'year_month']).agg({
-            'obligation_amount': ['sum', 'count', 'mean']
-        }).reset_index()
-        
-        monthly.columns = ['vendor_id', 'year_month', 'obligation_sum', 'award_count', 'avg_award_size']
-        
-        # Rolling features (3-month window)
-        monthly = monthly.sort_values(['vendor_id', 'year_month'])
-        monthly['rolling_3m_mean'] = monthly.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: x.rolling(3, min_periods=1).mean()
-        )
-        monthly['rolling_3m_mad'] = monthly.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: (x - x.rolling(3, min_periods=1).median()).abs().rolling(3, min_periods=1).median()
-        )
-        
-        # Insert into database
-        for _, row in monthly.iterrows():
+        return self.conn.execute(f"""
+            INSERT OR REPLACE INTO monthly_vendor_spend (
+                run_id, vendor_id, year_month, obligation_sum, award_count,
+                avg_award_size, rolling_3m_mean, rolling_3m_mad
+            )
+            WITH monthly AS ({MONTHLY_SQL}),
+            {rolling_sql("monthly")}
+        """, [run_id, run_id]).fetchone()[0]
+
+    def default_base_run(self, run_id: str) -> Optional[str]:
+        """Latest aggregated run an incremental run was built on, if any."""
+        row = self.conn.execute("""
+            SELECT filters_json FROM run_manifest WHERE run_id = ?
+        """, [run_id]).fetchone()
+        if not row or not row[0]:
+            return None
+        for base_run_id in reversed(json.loads(row[0]).get('base_run_ids') or []):
+            if self._has_monthly(base_run_id):
+                return base_run_id
+        return None
+
+    def _has_monthly(self, run_id: str) -> bool:
+        return self.conn.execute("""
+            SELECT COUNT(*) > 0 FROM monthly_vendor_spend WHERE run_id = ?
+        """, [run_id]).fetchone()[0]
+
+    def refresh_run(self, run_id: str, base_run_id: str = None) -> Dict:
+        """Update monthly spend for a run, rewriting only rows whose inputs changed.
+
+        Vendor-months whose total or count differ from the stored row (or
+        that are new or gone) are changed cells. Rolling statistics are
+        recomputed from the few months before each change and upserted for
+        the rows a change can reach; everything else is left as stored. A
+        run with no monthly rows yet starts from ``base_run_id``'s rows
+        (by default the latest aggregated run in its ``base_run_ids``).
+
+        Returns counts of changed cells, upserted and deleted rows, and the
+        affected vendor ids.
+        """
+        if not self._has_monthly(run_id):
+            base_run_id = base_run_id or self.default_base_run(run_id)
+            if base_run_id is None:
+                upserted = self.aggregate_run(run_id)
+                vendors = [r[0] for r in self.conn.execute("""
+                    SELECT DISTINCT vendor_id FROM monthly_vendor_spend WHERE run_id = ?
+                """, [run_id]).fetchall()]
+                return {'changed': upserted, 'upserted': upserted, 'deleted': 0, 'vendors': vendors}
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            if base_run_id is not None and not self._has_monthly(run_id):
+                self.conn.execute("""
+                    INSERT INTO monthly_vendor_spend
+                    SELECT ?, vendor_id, year_month, obligation_sum, award_count,
+                           avg_award_size, rolling_3m_mean, rolling_3m_mad
+                    FROM monthly_vendor_spend WHERE run_id = ?
+                """, [run_id, base_run_id])
+
+            self.conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE monthly_base AS {MONTHLY_SQL}
+            """, [run_id])
+            self.conn.execute("""
+                CREATE OR REPLACE TEMP TABLE monthly_removed AS
+                SELECT m.vendor_id, m.year_month
+                FROM monthly_vendor_spend m
+                ANTI JOIN monthly_base b ON b.vendor_id = m.vendor_id AND b.year_month = m.year_month
+                WHERE m.run_id = ?
+            """, [run_id])
+
+            # A removed month shifts the window of the next remaining month
             self.conn.execute("""
+                CREATE OR REPLACE TEMP TABLE monthly_changed AS
+                WITH ordered AS (
+                    SELECT b.*,
+                           LAG(b.year_month) OVER (PARTITION BY b.vendor_id ORDER BY b.year_month) AS prev_month,
+                           m.vendor_id IS NULL
+                               OR m.obligation_sum <> b.obligation_sum
+                               OR m.award_count <> b.award_count AS cell_changed
+                    FROM monthly_base b
+                    LEFT JOIN monthly_vendor_spend m
+                        ON m.run_id = ? AND m.vendor_id = b.vendor_id AND m.year_month = b.year_month
+                )
+                SELECT o.* EXCLUDE (prev_month),
+                       o.cell_changed OR EXISTS (
+                           SELECT 1 FROM monthly_removed r
+                           WHERE r.vendor_id = o.vendor_id
+                           AND r.year_month < o.year_month
+                           AND r.year_month > COALESCE(o.prev_month, '')
+                       ) AS changed
+                FROM ordered o
+            """, [run_id])
+
+            changed = self.conn.execute("""
+                SELECT COUNT(*) FILTER (WHERE cell_changed) + (SELECT COUNT(*) FROM monthly_removed)
+                FROM monthly_changed
+            """).fetchone()[0]
+
+            deleted = self.conn.execute("""
+                DELETE FROM monthly_vendor_spend m
+                USING monthly_removed r
+                WHERE m.run_id = ? AND m.vendor_id = r.vendor_id AND m.year_month = r.year_month
+            """, [run_id]).fetchone()[0]
+
+            # Rows a change can reach, and the rows their windows read
+            upserted = self.conn.execute(f"""
                 INSERT OR REPLACE INTO monthly_vendor_spend (
                     run_id, vendor_id, year_month, obligation_sum, award_count,
                     avg_award_size, rolling_3m_mean, rolling_3m_mad
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, [
-                run_id, row['vendor_id'], row['year_month'],
-                float(row['obligation_sum']), int(row['award_count']),
-                float(row['avg_award_size']), float(row['rolling_3m_mean']),
-                float(row['rolling_3m_mad'])
-            ])
-        
-        return len(monthly)
+                )
+                WITH reach AS (
+                    SELECT *,
+                           BOOL_OR(changed) OVER (
+                               PARTITION BY vendor_id ORDER BY year_month
+                               ROWS {ROLLING_REACH} PRECEDING
+                           ) AS affected
+                    FROM monthly_changed
+                ),
+                needed AS (
+                    SELECT * FROM (
+                        SELECT *,
+                               BOOL_OR(affected) OVER (
+                                   PARTITION BY vendor_id ORDER BY year_month
+                                   ROWS BETWEEN CURRENT ROW AND {ROLLING_REACH} FOLLOWING
+                               ) AS is_needed
+                        FROM reach
+                    )
+                    WHERE is_needed
+                ),
+                {rolling_sql("needed", "QUALIFY affected")}
+            """, [run_id]).fetchone()[0]
+
+            vendors = [r[0] for r in self.conn.execute("""
+                SELECT vendor_id FROM monthly_changed WHERE changed
+                UNION
+                SELECT vendor_id FROM monthly_removed
+                ORDER BY 1
+            """).fetchall()]
+
+            self.conn.execute("COMMIT")
+        except Exception:
+            rollback(self.conn)
+            raise
+
+        return {'changed': changed, 'upserted': upserted, 'deleted': deleted, 'vendors': vendors}
@@ -0,0 +1,146 @@
+"""Multi-granularity spending cube built with DuckDB grouping sets."""
+from itertools import product
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+
+from civicspend.db.connection import get_connection
+from civicspend.db.transaction import rollback
+
+# Time grains materialized in the cube, finest first. 'all' is the whole run.
+GRAINS = ('week', 'month', 'quarter', 'all')
+
+# Coarser grains answered by rolling up a materialized one
+DERIVED_GRAINS = {'year': ('quarter', "substr(period, 1, 4)")}
+
+# Dimension sets -> cube level
+LEVELS = {
+    frozenset(): 'total',
+    frozenset({'vendor'}): 'vendor',
+    frozenset({'agency'}): 'agency',
+    frozenset({'vendor', 'agency'}): 'vendor_agency',
+}
+
+DIMENSION_COLUMNS = {'vendor': 'vendor_id', 'agency': 'agency'}
+
+
+def _grouping_sets() -> str:
+    sets = []
+    for grain, dims in product(GRAINS, [('vendor_id', 'agency'), ('vendor_id',), ('agency',), ()]):
+        cols = ([grain] if grain != 'all' else []) + list(dims)
+        sets.append("(" + ", ".join(cols) + ")")
+    return ",\n                ".join(sets)
+
+
+class SpendingCube:
+    """Spend totals at week/month/quarter/all x total/vendor/agency/vendor-agency.
+
+    ``build`` materializes every combination into ``spending_cube`` with one
+    ``GROUPING SETS`` pass over a run's awards. ``query`` routes a request to
+    the smallest level holding its dimensions (group-by columns plus
+    filters), so agency or quarter analyses read a few pre-aggregated rows
+    instead of scanning awards.
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or get_connection()
+
+    def build(self, run_id: str) -> int:
+        """Rebuild the cube for a run; returns rows written."""
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute("DELETE FROM spending_cube WHERE run_id = ?", [run_id])
+            rows = self.conn.execute(f"""
+                INSERT INTO spending_cube (
+                    run_id, grain, period, level, vendor_id, agency, obligation_sum, award_count
+                )
+                WITH awards AS (
+                    SELECT
+                        avm.vendor_id,
+                        ra.awarding_agency_name AS agency,
+                        strftime(date_trunc('week', ra.action_date), '%Y-%m-%d') AS week,
+                        strftime(ra.action_date, '%Y-%m') AS month,
+                        strftime(ra.action_date, '%Y') || '-Q' || quarter(ra.action_date) AS quarter,
+                        ra.obligation_amount
+                    FROM raw_awards ra
+                    LEFT JOIN award_vendor_map avm
+                        ON ra.run_id = avm.run_id AND ra.award_id = avm.award_id
+                    WHERE ra.run_id = ?
+                    AND ra.action_date IS NOT NULL
+                )
+                SELECT
+                    ?,
+                    CASE
+                        WHEN GROUPING(week) = 0 THEN 'week'
+                        WHEN GROUPING(month) = 0 THEN 'month'
+                        WHEN GROUPING(quarter) = 0 THEN 'quarter'
+                        ELSE 'all'
+                    END AS grain,
+                    COALESCE(week, month, quarter, 'all') AS period,
+                    CASE GROUPING(vendor_id, agency)
+                        WHEN 0 THEN 'vendor_agency'
+                        WHEN 1 THEN 'vendor'
+                        WHEN 2 THEN 'agency'
+                        ELSE 'total'
+                    END AS level,
+                    vendor_id,
+                    agency,
+                    SUM(obligation_amount),
+                    COUNT(*)
+                FROM awards
+                GROUP BY GROUPING SETS (
+                {_grouping_sets()}
+                )
+            """, [run_id, run_id]).fetchone()[0]
+            self.conn.execute("COMMIT")
+        except Exception:
+            rollback(self.conn)
+            raise
+        return rows
+
+    @staticmethod
+    def route(grain: str, dims: Iterable[str]) -> Tuple[str, str, str]:
+        """Stored grain, level and period expression answering a request."""
+        dims = frozenset(dims)
+        if dims not in LEVELS:
+            raise ValueError(f"Unknown dimensions: {sorted(dims - set(DIMENSION_COLUMNS))}")
+        if grain in GRAINS:
+            return grain, LEVELS[dims], "period"
+        if grain in DERIVED_GRAINS:
+            stored, period = DERIVED_GRAINS[grain]
+            return stored, LEVELS[dims], period
+        raise ValueError(f"Unknown grain: {grain}")
+
+    def query(
+        self,
+        run_id: str,
+        grain: str = 'month',
+        by: Iterable[str] = (),
+        vendor_id: Optional[str] = None,
+        agency: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Spend by period and the ``by`` dimensions, optionally filtered."""
+        by = list(by)
+        filters = {'vendor': vendor_id, 'agency': agency}
+        dims = set(by) | {d for d, value in filters.items() if value is not None}
+        stored, level, period = self.route(grain, dims)
+
+        group_cols = [DIMENSION_COLUMNS[d] for d in by]
+        where = ["run_id = ?", "grain = ?", "level = ?"]
+        params = [run_id, stored, level]
+        for dim, value in filters.items():
+            if value is not None:
+                where.append(f"{DIMENSION_COLUMNS[dim]} = ?")
+                params.append(value)
+
+        select_cols = ", ".join([f"{period} AS period"] + group_cols)
+        group_by = ", ".join(["1"] + [str(i + 2) for i in range(len(group_cols))])
+        return self.conn.execute(f"""
+            SELECT {select_cols},
+                   SUM(obligation_sum) AS obligation_sum,
+                   CAST(SUM(award_count) AS BIGINT) AS award_count
+            FROM spending_cube
+            WHERE {' AND '.join(where)}
+            GROUP BY {group_by}
+            ORDER BY {group_by}
+        """, params).df()
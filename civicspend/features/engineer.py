@@ -1,7 +1,15 @@
 """Feature engineering for ML anomaly detection."""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
 import numpy as np
 import pandas as pd
 from civicspend.db.connection import get_connection
+from civicspend.features import kernels
+
+ROLLING_WINDOW = 3
+
 
 class FeatureEngineer:
     """Engineer features for ML models."""
@@ -9,9 +17,59 @@ class FeatureEngineer:
     def __init__(self):
         self.conn = get_connection()
     
-    def engineer_features(self, run_id: str) -> pd.DataFrame:
-        """Create 18 features for ML detection."""
-        query = """
+    def engineer_features(self, run_id: str, vendor_ids: list = None) -> pd.DataFrame:
+        """Create 16 features for ML detection, optionally for some vendors only."""
+        if vendor_ids is None:
+            df = self._monthly(run_id)
+        else:
+            df = self._monthly(run_id, "AND mvs.vendor_id IN (SELECT UNNEST(?))", [list(vendor_ids)])
+        
+        if df.empty:
+            return df
+        
+        return self.build_features(df)
+    
+    def engineer_partitions(
+        self,
+        run_id: str,
+        partitions: int,
+        workers: int = 1
+    ) -> Iterator[pd.DataFrame]:
+        """Yield features one vendor partition at a time.
+        
+        Vendors are hash-bucketed into ``partitions`` groups and each group
+        is read from DuckDB and engineered on its own, so memory is bounded
+        by the largest partition rather than the run. Every feature is
+        per-vendor, so the concatenated partitions equal
+        ``engineer_features`` up to row order. With ``workers > 1`` the
+        pandas work runs on a process pool while the next partitions are
+        read; at most ``2 * workers`` partitions are in flight.
+        """
+        frames = (
+            df for df in (
+                self._monthly(run_id, "AND hash(mvs.vendor_id) % ? = ?", [partitions, bucket])
+                for bucket in range(partitions)
+            )
+            if not df.empty
+        )
+        
+        if workers <= 1:
+            for df in frames:
+                yield self.build_features(df)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for df in frames:
+                pending.append(pool.submit(FeatureEngineer.build_features, df))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _monthly(self, run_id: str, vendor_filter: str = "", params: list = ()) -> pd.DataFrame:
+        """Monthly rows for a run, sorted by vendor_id and year_month."""
+        query = f"""
             SELECT 
                 mvs.vendor_id,
                 mvs.year_month,
@@ -24,16 +82,19 @@ class FeatureEngineer:
             FROM monthly_vendor_spend mvs
             JOIN vendor_entities ve ON mvs.vendor_id = ve.vendor_id
             WHERE mvs.run_id = ?
+            {vendor_filter}
             ORDER BY mvs.vendor_id, mvs.year_month
         """
-        
-        df = pd.read_sql_query(query, self.conn, params=[run_id])
-        
-        if df.empty:
-            return df
+        return pd.read_sql_query(query, self.conn, params=[run_id] + list(params))
+    
+    @staticmethod
+    def build_features(df: pd.DataFrame) -> pd.DataFrame:
+        """Add feature columns to monthly rows sorted by vendor_id, year_month."""
+        obligation = df['obligation_sum']
+        by_vendor = obligation.groupby(df['vendor_id'], sort=False)
         
         # 1-3: Log transforms (handle zeros)
-        df['log_obligation'] = np.log1p(df['obligation_sum'])
+        df['log_obligation'] = np.log1p(obligation)
         df['log_award_count'] = np.log1p(df['award_count'])
         df['log_avg_size'] = np.log1p(df['avg_award_size'])
         
@@ -42,45 +103,41 @@ class FeatureEngineer:
         df['log_rolling_3m_mad'] = np.log1p(df['rolling_3m_mad'])
         
         # 7: Month-over-month change
-        df['mom_pct_change'] = df.groupby('vendor_id')['obligation_sum'].pct_change()
+        df['mom_pct_change'] = by_vendor.pct_change()
         df['mom_pct_change'] = df['mom_pct_change'].fillna(0).replace([np.inf, -np.inf], 0)
         
         # 8-9: Cyclical month encoding
-        df['month'] = pd.to_datetime(df['year_month'] + '-01').dt.month
+        df['month'] = df['year_month'].str[5:7].astype(int)
         df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
         df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
         
         # 10: Vendor tenure (months since first award)
-        df['vendor_tenure'] = df.groupby('vendor_id').cumcount() + 1
+        df['vendor_tenure'] = by_vendor.cumcount() + 1
+        
+        # Per-vendor statistics broadcast back to rows
+        vendor_mean = by_vendor.transform('mean')
+        vendor_std = by_vendor.transform('std')
         
         # 11: Deviation from vendor median
-        df['deviation_from_median'] = df.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: (x - x.median()) / (x.std() + 1e-6)
-        )
+        df['deviation_from_median'] = (obligation - by_vendor.transform('median')) / (vendor_std + 1e-6)
         
         # 12: Coefficient of variation (stability measure)
-        df['cv'] = df.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: x.std() / (x.mean() + 1e-6)
-        )
+        df['cv'] = vendor_std / (vendor_mean + 1e-6)
         
         # 13: Award size concentration (largest award / total)
-        df['size_concentration'] = df['avg_award_size'] / (df['obligation_sum'] + 1e-6)
+        df['size_concentration'] = df['avg_award_size'] / (obligation + 1e-6)
         
         # 14-15: Trend features
-        df['rolling_trend'] = df.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: x.rolling(3, min_periods=1).apply(lambda y: np.polyfit(range(len(y)), y, 1)[0] if len(y) > 1 else 0)
-        )
+        values = obligation.to_numpy(dtype=float)
+        offsets = kernels.group_offsets(df['vendor_id'].to_numpy())
+        df['rolling_trend'] = kernels.rolling_slope(values, offsets, ROLLING_WINDOW)
         
         # 16: Volatility (rolling std)
-        df['volatility'] = df.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: x.rolling(3, min_periods=1).std()
-        ).fillna(0)
+        df['volatility'] = np.nan_to_num(kernels.rolling_std(values, offsets, ROLLING_WINDOW))
         
         # 17-18: Relative position in distribution
-        df['percentile_rank'] = df.groupby('vendor_id')['obligation_sum'].rank(pct=True)
-        df['z_score_vendor'] = df.groupby('vendor_id')['obligation_sum'].transform(
-            lambda x: (x - x.mean()) / (x.std() + 1e-6)
-        )
+        df['percentile_rank'] = by_vendor.rank(pct=True)
+        df['z_score_vendor'] = (obligation - vendor_mean) / (vendor_std + 1e-6)
         
         return df
     
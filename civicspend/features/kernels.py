@@ -0,0 +1,118 @@
+"""Segmented rolling-window kernels over many series at once.
+
+Every kernel takes one contiguous ``values`` array holding all series back
+to back and ``offsets``, where series ``g`` is ``values[offsets[g]:offsets[g + 1]]``.
+Windows are trailing and never cross a series boundary; the first rows of
+a series use the shorter window available (``min_periods=1``). The
+rolling mean and MAD of monthly spend are computed in SQL by the
+aggregator; these kernels cover the engineered trend and volatility.
+
+Kernels are compiled with numba when it is installed and otherwise run as
+vectorized NumPy over a ``(rows, window)`` matrix of lagged values. Both
+paths return the same results.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency, fall back to NumPy
+    njit = None
+
+HAVE_NUMBA = njit is not None
+
+
+def group_offsets(keys) -> np.ndarray:
+    """Offsets of the runs of equal keys in an array sorted by key."""
+    keys = np.asarray(keys)
+    starts = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return np.concatenate(([0], starts, [len(keys)])).astype(np.int64)
+
+
+def _lagged(values: np.ndarray, offsets: np.ndarray, window: int) -> np.ndarray:
+    """Each row's trailing window as a row of a matrix, NaN outside its series."""
+    starts = np.repeat(offsets[:-1], np.diff(offsets))
+    rows = np.arange(len(values))[:, None] - np.arange(window)[None, :]
+    return np.where(rows >= starts[:, None], values[np.maximum(rows, 0)], np.nan)
+
+
+def _rolling_std_numpy(values, offsets, window):
+    lagged = _lagged(values, offsets, window)
+    count = np.sum(~np.isnan(lagged), axis=1)
+    mean = np.nansum(lagged, axis=1) / count
+    squares = np.nansum((lagged - mean[:, None]) ** 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+
+def _rolling_slope_numpy(values, offsets, window):
+    lagged = _lagged(values, offsets, window)
+    n = np.sum(~np.isnan(lagged), axis=1).astype(float)
+    # Lag k sits at x = n - 1 - k within the row's window
+    x = n[:, None] - 1 - np.arange(window)[None, :]
+    sum_y = np.nansum(lagged, axis=1)
+    sum_xy = np.nansum(x * lagged, axis=1)
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x ** 2)
+    return np.where(n > 1, slope, 0.0)
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _rolling_std_jit(values, offsets, window):
+        out = np.empty(len(values))
+        for g in range(len(offsets) - 1):
+            for i in range(offsets[g], offsets[g + 1]):
+                start = max(offsets[g], i - window + 1)
+                n = i + 1 - start
+                if n < 2:
+                    out[i] = np.nan
+                    continue
+                mean = values[start:i + 1].mean()
+                squares = 0.0
+                for j in range(start, i + 1):
+                    squares += (values[j] - mean) ** 2
+                out[i] = np.sqrt(squares / (n - 1))
+        return out
+
+    @njit(cache=True)
+    def _rolling_slope_jit(values, offsets, window):
+        out = np.zeros(len(values))
+        for g in range(len(offsets) - 1):
+            for i in range(offsets[g], offsets[g + 1]):
+                start = max(offsets[g], i - window + 1)
+                n = i + 1 - start
+                if n < 2:
+                    continue
+                sum_y = 0.0
+                sum_xy = 0.0
+                for j in range(start, i + 1):
+                    sum_y += values[j]
+                    sum_xy += (j - start) * values[j]
+                sum_x = n * (n - 1) / 2
+                sum_xx = (n - 1) * n * (2 * n - 1) / 6
+                out[i] = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x ** 2)
+        return out
+
+    _KERNELS = {'std': _rolling_std_jit, 'slope': _rolling_slope_jit}
+else:
+    _KERNELS = {'std': _rolling_std_numpy, 'slope': _rolling_slope_numpy}
+
+
+def _run(kernel: str, values, offsets, window: int) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    if len(values) == 0:
+        return np.empty(0)
+    return _KERNELS[kernel](values, offsets, window)
+
+
+def rolling_std(values, offsets, window: int) -> np.ndarray:
+    """Trailing sample standard deviation; NaN for single-point windows."""
+    return _run('std', values, offsets, window)
+
+
+def rolling_slope(values, offsets, window: int) -> np.ndarray:
+    """Least-squares slope over each trailing window at x = 0..n-1; 0 for single points."""
+    return _run('slope', values, offsets, window)
@@ -0,0 +1,183 @@
+"""Versioned on-disk store for engineered features."""
+import hashlib
+import inspect
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from civicspend.config import config
+from civicspend.features import engineer as engineer_module
+from civicspend.features import kernels
+from civicspend.features.engineer import FeatureEngineer
+
+
+def feature_version() -> str:
+    """Hash of the feature definitions: build code, helpers and column list."""
+    parts = [
+        inspect.getsource(FeatureEngineer.engineer_features),
+        inspect.getsource(FeatureEngineer._monthly),
+        inspect.getsource(FeatureEngineer.build_features),
+        inspect.getsource(kernels),
+        inspect.getsource(FeatureEngineer.get_feature_columns),
+        repr(engineer_module.ROLLING_WINDOW),
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+class FeatureStore:
+    """Materialized features per run, shared by training and prediction.
+
+    Features are written once to ``<store_dir>/<run_id>/<version>.parquet``
+    and recorded in ``feature_sets`` with the feature definition version and
+    a fingerprint of the run's monthly_vendor_spend rows. ``load`` reuses the
+    file while both still match and rebuilds it otherwise.
+    """
+
+    def __init__(self, engineer: FeatureEngineer = None, store_dir: str = None):
+        self.engineer = engineer or FeatureEngineer()
+        self.conn = self.engineer.conn
+        self.store_dir = Path(store_dir or config.get('features.store_dir', 'data/features'))
+        self.version = feature_version()
+
+    def input_hash(self, run_id: str) -> str:
+        """Fingerprint of the rows features are built from."""
+        count, checksum = self.conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(hash(
+                mvs.vendor_id, mvs.year_month, mvs.obligation_sum, mvs.award_count,
+                mvs.avg_award_size, mvs.rolling_3m_mean, mvs.rolling_3m_mad, ve.canonical_name
+            )::HUGEINT), 0)
+            FROM monthly_vendor_spend mvs
+            JOIN vendor_entities ve ON mvs.vendor_id = ve.vendor_id
+            WHERE mvs.run_id = ?
+        """, [run_id]).fetchone()
+        return f"{count}:{checksum}"
+
+    def path(self, run_id: str) -> Path:
+        return self.store_dir / run_id / f"{self.version}.parquet"
+
+    def is_current(self, run_id: str) -> bool:
+        """Whether stored features match the current definitions and inputs."""
+        row = self.conn.execute("""
+            SELECT feature_version, input_hash, path FROM feature_sets WHERE run_id = ?
+        """, [run_id]).fetchone()
+        return bool(
+            row and row[0] == self.version and row[1] == self.input_hash(run_id)
+            and Path(row[2]).exists()
+        )
+
+    def materialize(self, run_id: str) -> pd.DataFrame:
+        """Engineer features for a run and persist them."""
+        input_hash = self.input_hash(run_id)
+        df = self.engineer.engineer_features(run_id)
+        if df.empty:
+            return df
+        return self._write(run_id, df, input_hash)
+
+    def materialize_partitioned(self, run_id: str, partitions: int = None, workers: int = None) -> int:
+        """Engineer and persist features one vendor partition at a time.
+
+        Each partition is written to a staging Parquet file as soon as it
+        is built; DuckDB then merges them into the same sorted file
+        ``materialize`` writes, spilling to disk if needed. Returns the
+        number of rows stored.
+        """
+        partitions = partitions or config.get('features.partitions', 16)
+        workers = workers or config.get('features.workers', 1)
+        input_hash = self.input_hash(run_id)
+
+        path = self.path(run_id)
+        staging = path.parent / f"{self.version}.parts"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        try:
+            rows = 0
+            for part, df in enumerate(self.engineer.engineer_partitions(run_id, partitions, workers)):
+                self._copy(df, staging / f"part-{part:05d}.parquet")
+                rows += len(df)
+            if not rows:
+                return 0
+
+            pattern = str(staging / "*.parquet").replace("'", "''")
+            target = str(path).replace("'", "''")
+            self.conn.execute(f"""
+                COPY (
+                    SELECT * FROM read_parquet('{pattern}') ORDER BY vendor_id, year_month
+                ) TO '{target}' (FORMAT PARQUET)
+            """)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._record(run_id, path, input_hash, rows)
+        return rows
+
+    def refresh(self, run_id: str, vendor_ids: list, base_run_id: str = None) -> pd.DataFrame:
+        """Recompute features for changed vendors only and store the merged frame.
+
+        Per-vendor statistics (median, std, cv, percentile rank) span a
+        vendor's whole history, so every row of a changed vendor is rebuilt;
+        other vendors' rows are kept as stored. A run without current stored
+        features starts from ``base_run_id``'s, or is built in full.
+        """
+        if self.is_current(run_id):
+            return self.load(run_id)
+
+        input_hash = self.input_hash(run_id)
+        source = run_id if self._has_version(run_id) else base_run_id
+        if source is None or not self._has_version(source):
+            return self.materialize(run_id)
+
+        kept = self.conn.execute("""
+            SELECT * FROM read_parquet(?) WHERE vendor_id NOT IN (SELECT UNNEST(?))
+        """, [str(self.path(source)), list(vendor_ids)]).df()
+        fresh = self.engineer.engineer_features(run_id, vendor_ids=list(vendor_ids))
+
+        df = pd.concat([kept, fresh], ignore_index=True) if not fresh.empty else kept
+        df = df.sort_values(['vendor_id', 'year_month'], ignore_index=True)
+        if df.empty:
+            return df
+        return self._write(run_id, df, input_hash)
+
+    def _has_version(self, run_id: str) -> bool:
+        """Whether a run has a stored file for the current feature version."""
+        row = self.conn.execute("""
+            SELECT feature_version FROM feature_sets WHERE run_id = ?
+        """, [run_id]).fetchone()
+        return bool(row and row[0] == self.version and self.path(run_id).exists())
+
+    def _write(self, run_id: str, df: pd.DataFrame, input_hash: str) -> pd.DataFrame:
+        path = self.path(run_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._copy(df, path)
+        self._record(run_id, path, input_hash, len(df))
+        return df
+
+    def _copy(self, df: pd.DataFrame, path: Path):
+        self.conn.register('engineered_features', df)
+        try:
+            target = str(path).replace("'", "''")
+            self.conn.execute(f"COPY engineered_features TO '{target}' (FORMAT PARQUET)")
+        finally:
+            self.conn.unregister('engineered_features')
+
+    def _record(self, run_id: str, path: Path, input_hash: str, row_count: int):
+        # Drop files written for older feature versions
+        for stale in path.parent.glob("*.parquet"):
+            if stale != path:
+                stale.unlink()
+
+        self.conn.execute("""
+            INSERT OR REPLACE INTO feature_sets
+                (run_id, feature_version, input_hash, path, row_count, created_at)
+            VALUES (?, ?, ?, ?, ?, current_timestamp)
+        """, [run_id, self.version, input_hash, str(path), row_count])
+
+    def load(self, run_id: str) -> pd.DataFrame:
+        """Stored features for a run, rebuilding them if stale."""
+        if not self.is_current(run_id):
+            return self.materialize(run_id)
+        return self.conn.execute("SELECT * FROM read_parquet(?)", [str(self.path(run_id))]).df()
+
+    def invalidate(self, run_id: str):
+        """Forget stored features for a run."""
+        self.conn.execute("DELETE FROM feature_sets WHERE run_id = ?", [run_id])
@@ -1,44 +1,131 @@
 """USAspending API client."""
+import threading
 import time
+import uuid
 import requests
-from typing import Dict, List, Optional
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+from civicspend.config import config
+from civicspend.exceptions import APIError
+from civicspend.ingest.cache import ResponseCache
 
 API_BASE = "https://api.usaspending.gov/api/v2"
 RATE_LIMIT_DELAY = 0.2  # 5 requests per second
+DEFAULT_WORKERS = 4
+
+# raw_awards column -> USAspending search result field
+AWARD_FIELDS = {
+    'award_id': 'Award ID',
+    'recipient_name': 'Recipient Name',
+    'recipient_duns': 'recipient_duns',
+    'awarding_agency_name': 'Awarding Agency',
+    'action_date': 'Start Date',
+    'obligation_amount': 'Award Amount',
+}
+
+
+def normalize_award(award: Dict) -> Dict:
+    """Map an API search result onto raw_awards column names."""
+    row = {col: award.get(field) for col, field in AWARD_FIELDS.items()}
+    row['award_id'] = row['award_id'] or f"unknown_{uuid.uuid4()}"
+    if row['obligation_amount'] is None:
+        row['obligation_amount'] = 0
+    return row
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every request a client makes.
+
+    Tokens refill at ``rate`` per second up to ``capacity``. With the
+    default capacity of 1 the bucket spaces requests ``1 / rate`` seconds
+    apart, no matter how many threads are waiting on it.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class USAspendingClient:
     """Client for USAspending.gov API."""
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        rate_limit: Optional[float] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_workers: Optional[int] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.base_url = (base_url or config.api_base_url or API_BASE).rstrip("/")
+        self.rate_limiter = rate_limiter or TokenBucket(rate_limit or config.api_rate_limit)
+        self.max_workers = max_workers or config.get('api.max_workers', DEFAULT_WORKERS)
+        self.timeout = config.get('api.timeout', 30)
+        self.max_retries = config.get('api.max_retries', 3)
+        self.backoff_factor = config.get('api.backoff_factor', 2)
+        self.cache = cache
+
+        # One pooled session shared by all worker threads
         self.session = requests.Session()
-        self.last_request_time = 0
-    
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def _rate_limit(self):
         """Enforce rate limiting."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < RATE_LIMIT_DELAY:
-            time.sleep(RATE_LIMIT_DELAY - elapsed)
-        self.last_request_time = time.time()
-    
-    def _request(self, endpoint: str, payload: Dict, max_retries: int = 3) -> Dict:
+        self.rate_limiter.acquire()
+
+    def _request(self, endpoint: str, payload: Dict, max_retries: Optional[int] = None) -> Dict:
         """Make API request with retry logic."""
-        url = f"{API_BASE}/{endpoint}"
-        
+        url = f"{self.base_url}/{endpoint}"
+        max_retries = max_retries or self.max_retries
+
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, payload)
+            if cached is not None:
+                return cached
+            if self.cache.offline:
+                raise APIError(f"Offline mode: no cached response for {endpoint}")
+
         for attempt in range(max_retries):
             try:
                 self._rate_limit()
-                response = self.session.post(url, json=payload, timeout=30)
+                response = self.session.post(url, json=payload, timeout=self.timeout)
                 response.raise_for_status()
-                return response.json()
+                data = response.json()
+                if self.cache is not None:
+                    self.cache.put(endpoint, payload, data)
+                return data
             except requests.exceptions.RequestException as e:
                 if attempt == max_retries - 1:
                     raise
-                wait = 2 ** attempt
+                wait = self.backoff_factor ** attempt
                 time.sleep(wait)
-        
+
         return {}
-    
+
     def fetch_awards(
         self,
         state: str,
@@ -63,5 +150,83 @@ class USAspendingClient:
             "sort": "Award Amount",
             "order": "desc"
         }
-        
+
         return self._request("search/spending_by_award", payload)
+
+    def fetch_pages(
+        self,
+        state: str,
+        start_date: str,
+        end_date: str,
+        limit: int = 100,
+        max_pages: Optional[int] = 5,
+        start_page: int = 1,
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Fetch consecutive pages concurrently and yield them in page order.
+
+        Up to ``max_workers`` pages are kept in flight; every request still
+        goes through the shared token bucket, so the combined request rate
+        never exceeds ``api.rate_limit``. Iteration stops at the first empty
+        page or when ``page_metadata.hasNext`` is false. With ``max_pages``
+        set to None, pages are fetched until the API runs out.
+        """
+        workers = max_workers or self.max_workers
+        last_page = start_page + max_pages - 1 if max_pages is not None else None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            next_page = start_page
+
+            def submit_until_full():
+                nonlocal next_page
+                while len(pending) < workers and (last_page is None or next_page <= last_page):
+                    pending[next_page] = executor.submit(
+                        self.fetch_awards, state, start_date, end_date, limit, next_page
+                    )
+                    next_page += 1
+
+            try:
+                submit_until_full()
+                page = start_page
+                while page in pending:
+                    result = pending.pop(page).result()
+                    if not result.get('results'):
+                        return
+                    yield page, result
+                    if result.get('page_metadata', {}).get('hasNext') is False:
+                        return
+                    page += 1
+                    submit_until_full()
+            finally:
+                for future in pending.values():
+                    future.cancel()
+
+    def iter_awards(
+        self,
+        state: str,
+        start_date: str,
+        end_date: str,
+        limit: int = 100,
+        max_pages: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        as_frames: bool = False
+    ) -> Iterator:
+        """Stream normalized award records across all pages.
+
+        Pagination follows ``page_metadata``; the next ``prefetch`` pages
+        are requested while the current one is consumed, so at most that
+        many pages are held in memory. Yields one dict per award in
+        raw_awards column layout, or one DataFrame per page when
+        ``as_frames`` is true.
+        """
+        pages = self.fetch_pages(
+            state, start_date, end_date, limit, max_pages,
+            max_workers=prefetch or self.max_workers
+        )
+        for _, result in pages:
+            records = [normalize_award(award) for award in result['results']]
+            if as_frames:
+                yield pd.DataFrame(records, columns=list(AWARD_FIELDS))
+            else:
+                yield from records
@@ -0,0 +1,127 @@
+"""Load USAspending bulk-download CSV archives into raw_awards."""
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from civicspend.db.award_store import STORE_LOCK, store_run_awards
+from civicspend.db.transaction import rollback
+
+# raw_awards column -> candidate bulk-download headers, in priority order.
+# Transaction files are keyed by transaction so every obligation and action
+# date is kept; award summary files fall through to the award keys. Each
+# column reads the first candidate that is set on a row, so contract and
+# assistance files can be loaded together.
+BULK_COLUMNS = {
+    'award_id': [
+        'contract_transaction_unique_key', 'assistance_transaction_unique_key',
+        'contract_award_unique_key', 'assistance_award_unique_key',
+        'award_id_piid', 'award_id_fain', 'Award ID',
+    ],
+    'recipient_name': ['recipient_name', 'recipient_name_raw', 'Recipient Name'],
+    'recipient_duns': ['recipient_duns', 'recipient_uei', 'recipient_duns_number'],
+    'awarding_agency_name': ['awarding_agency_name', 'Awarding Agency'],
+    'action_date': ['action_date', 'award_base_action_date', 'period_of_performance_start_date', 'Start Date'],
+    'obligation_amount': [
+        'federal_action_obligation', 'total_obligated_amount', 'total_obligation', 'Award Amount',
+    ],
+    'place_of_performance_state': [
+        'primary_place_of_performance_state_code', 'place_of_performance_state_code',
+        'place_of_performance_state',
+    ],
+}
+
+
+def expand_csv_paths(paths: List[str], extract_dir: str) -> List[str]:
+    """Resolve files, directories and ZIP archives to a list of CSV paths.
+
+    Each archive is extracted into its own subdirectory of ``extract_dir``
+    so same-named members of different downloads do not overwrite each other.
+    """
+    csv_paths = []
+    for i, raw in enumerate(paths):
+        path = Path(raw)
+        if path.is_dir():
+            csv_paths.extend(str(p) for p in sorted(path.glob("*.csv")))
+        elif path.suffix.lower() == ".zip":
+            archive_dir = Path(extract_dir) / f"{i:04d}_{path.stem}"
+            with zipfile.ZipFile(path) as archive:
+                members = [m for m in archive.namelist() if m.lower().endswith(".csv")]
+                archive.extractall(archive_dir, members)
+            csv_paths.extend(str(archive_dir / m) for m in members)
+        else:
+            csv_paths.append(str(path))
+    return csv_paths
+
+
+def resolve_columns(headers: List[str]) -> Dict[str, List[str]]:
+    """Available bulk headers for each raw_awards column, in priority order."""
+    available = set(headers)
+    return {
+        col: [c for c in candidates if c in available]
+        for col, candidates in BULK_COLUMNS.items()
+    }
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _coalesce(names: List[str]) -> str:
+    """SQL for the first non-null of several headers."""
+    if not names:
+        return "NULL"
+    if len(names) == 1:
+        return _quote(names[0])
+    return "COALESCE(" + ", ".join(_quote(n) for n in names) + ")"
+
+
+def load_bulk_files(conn, run_id: str, paths: List[str], state: Optional[str] = None) -> int:
+    """Load bulk CSV files into raw_awards for a run.
+
+    DuckDB's ``read_csv`` reads every file in parallel; ZIP archives are
+    extracted to a temporary directory first. Returns rows inserted.
+    """
+    with tempfile.TemporaryDirectory() as extract_dir:
+        csv_paths = expand_csv_paths(paths, extract_dir)
+        if not csv_paths:
+            return 0
+
+        source = "read_csv(?, header=true, all_varchar=true, union_by_name=true)"
+        headers = [d[0] for d in conn.execute(f"SELECT * FROM {source} LIMIT 0", [csv_paths]).description]
+        columns = resolve_columns(headers)
+
+        if not columns['award_id']:
+            raise ValueError(f"No award identifier column found in {csv_paths[0]}")
+
+        state_cols = columns['place_of_performance_state']
+        state_expr = _coalesce(state_cols) if state_cols else "?"
+        params = ([] if state_cols else [state]) + [csv_paths]
+
+        where = ""
+        if state and state_cols:
+            where = f"WHERE {state_expr} = ?"
+            params.append(state)
+
+        with STORE_LOCK:
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                added = store_run_awards(conn, run_id, f"""
+                    SELECT
+                        {_coalesce(columns['award_id'])} AS award_id,
+                        {_coalesce(columns['recipient_name'])} AS recipient_name,
+                        {_coalesce(columns['recipient_duns'])} AS recipient_duns,
+                        {_coalesce(columns['awarding_agency_name'])} AS awarding_agency_name,
+                        TRY_CAST({_coalesce(columns['action_date'])} AS DATE) AS action_date,
+                        COALESCE(TRY_CAST({_coalesce(columns['obligation_amount'])} AS DECIMAL(18,2)), 0)
+                            AS obligation_amount,
+                        {state_expr} AS place_of_performance_state
+                    FROM {source}
+                    {where}
+                """, params)
+                conn.execute("COMMIT")
+            except Exception:
+                rollback(conn)
+                raise
+
+    return added
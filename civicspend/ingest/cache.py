@@ -0,0 +1,161 @@
+"""On-disk response cache for the USAspending client."""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from civicspend.config import config
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, fall back to zlib
+    zstandard = None
+    import zlib
+
+CACHE_DIR = "data/cache"
+
+
+class ResponseCache:
+    """Content-addressed cache of API responses.
+
+    Entries are keyed by endpoint plus a hash of the canonical JSON payload
+    and stored as compressed JSON (zstd when ``zstandard`` is installed,
+    zlib otherwise). A file's mtime is its write time, used for the TTL;
+    its atime is bumped on every hit and drives LRU eviction once the
+    total size exceeds ``max_bytes``.
+
+    With ``offline=True`` the cache acts as a replay store: entries never
+    expire and the client must not touch the network on a miss.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        offline: bool = False
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.suffix = ".json.zst" if zstandard else ".json.z"
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    @classmethod
+    def from_config(cls, offline: bool = False) -> "ResponseCache":
+        """Build a cache from the ``cache`` config section."""
+        ttl_hours = config.get('cache.ttl_hours')
+        max_mb = config.get('cache.max_mb')
+        return cls(
+            cache_dir=config.get('cache.dir', CACHE_DIR),
+            ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+            offline=offline
+        )
+
+    def key(self, endpoint: str, payload: Dict) -> str:
+        """Hash of endpoint plus canonical payload."""
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f"{endpoint}\n{canonical}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return zlib.compress(data, 6)
+
+    def _decompress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def get(self, endpoint: str, payload: Dict) -> Optional[Dict]:
+        """Return a cached response, or None on a miss or expired entry."""
+        path = self._path(self.key(endpoint, payload))
+
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        if not self.offline and self.ttl_seconds is not None:
+            if time.time() - stat.st_mtime > self.ttl_seconds:
+                self._remove(path)
+                return None
+
+        try:
+            response = json.loads(self._decompress(path.read_bytes()))
+            # Record the access for LRU, keep the write time for TTL
+            os.utime(path, (time.time(), stat.st_mtime))
+        except Exception:  # evicted or corrupt entry counts as a miss
+            return None
+
+        return response
+
+    def put(self, endpoint: str, payload: Dict, response: Dict):
+        """Store a response and evict old entries if over budget."""
+        path = self._path(self.key(endpoint, payload))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = self._compress(json.dumps(response, separators=(',', ':')).encode())
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            if self._total_bytes is not None:
+                self._total_bytes += len(data) - old_size
+            self._evict()
+
+    def _entries(self):
+        return list(self.cache_dir.glob(f"*/*{self.suffix}"))
+
+    def _remove(self, path: Path):
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                return
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _evict(self):
+        """Drop least recently used entries until under ``max_bytes``."""
+        if self.max_bytes is None:
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self._entries())
+
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, p))
+
+        for _, size, p in sorted(entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+
+    def size_bytes(self) -> int:
+        """Total bytes currently stored."""
+        return sum(p.stat().st_size for p in self._entries())
@@ -0,0 +1,47 @@
+"""Per-page checkpoints for resumable ingestion runs."""
+import hashlib
+import json
+from typing import Dict, Optional
+
+
+def filters_hash(filters: Dict) -> str:
+    """Stable hash of run filters (key order independent)."""
+    canonical = json.dumps(filters, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def save_checkpoint(conn, run_id: str, fhash: str, page_limit: int, last_page: int,
+                    page_cap: Optional[int] = None):
+    """Record the last page whose awards are committed to raw_awards.
+
+    ``page_cap`` is the absolute last page the run may fetch (None when
+    uncapped), so a resume stops where the original run would have.
+    Call inside the same transaction as the insert so the checkpoint never
+    runs ahead of the data.
+    """
+    conn.execute("""
+        INSERT OR REPLACE INTO ingest_checkpoints (
+            run_id, filters_hash, page_limit, last_page, rows_written, page_cap, updated_at
+        )
+        SELECT ?, ?, ?, ?, COUNT(*), ?, CURRENT_TIMESTAMP
+        FROM raw_awards WHERE run_id = ?
+    """, [run_id, fhash, page_limit, last_page, page_cap, run_id])
+
+
+def load_checkpoint(conn, run_id: str) -> Optional[Dict]:
+    """Get the checkpoint for a run, or None if no page was committed."""
+    row = conn.execute("""
+        SELECT filters_hash, page_limit, last_page, rows_written, page_cap
+        FROM ingest_checkpoints WHERE run_id = ?
+    """, [run_id]).fetchone()
+
+    if not row:
+        return None
+
+    return {
+        'filters_hash': row[0],
+        'page_limit': row[1],
+        'last_page': row[2],
+        'rows_written': row[3],
+        'page_cap': row[4]
+    }
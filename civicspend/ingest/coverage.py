@@ -0,0 +1,125 @@
+"""Date coverage of completed ingestion runs, for incremental ingest."""
+import json
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+DateRange = Tuple[date, date]
+
+SHARD_MONTHS = {'month': 1, 'quarter': 3, 'year': 12}
+
+
+def _parse(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+def run_ranges(filters: Dict) -> List[DateRange]:
+    """Date ranges a completed run actually fetched."""
+    if filters.get('fetch_ranges') is not None:
+        return [(_parse(s), _parse(e)) for s, e in filters['fetch_ranges']]
+    if filters.get('start_date') and filters.get('end_date'):
+        return [(_parse(filters['start_date']), _parse(filters['end_date']))]
+    return []
+
+
+def run_window(filters: Dict) -> Optional[DateRange]:
+    """First and last date of the window a run's awards were gathered for.
+
+    Incremental runs also hold awards copied from earlier runs inside
+    their requested window, so that window counts alongside the ranges
+    they fetched.
+    """
+    ranges = run_ranges(filters)
+    if filters.get('start_date') and filters.get('end_date'):
+        ranges.append((_parse(filters['start_date']), _parse(filters['end_date'])))
+    if not ranges:
+        return None
+    return min(s for s, _ in ranges), max(e for _, e in ranges)
+
+
+def exhausted_ranges(filters: Dict) -> List[DateRange]:
+    """Date ranges a completed run fetched every page of.
+
+    Ranges cut short by a page cap are left out, so incremental ingest
+    fetches them again. Runs recorded before exhaustion was tracked cover
+    nothing.
+    """
+    return [(_parse(s), _parse(e)) for s, e in filters.get('exhausted_ranges', [])]
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """Merge overlapping or adjacent date ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered: List[DateRange], start: date, end: date) -> List[DateRange]:
+    """Sub-ranges of [start, end] not covered by any range in ``covered``."""
+    gaps = []
+    cursor = start
+    for c_start, c_end in merge_ranges(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - timedelta(days=1)))
+        cursor = max(cursor, c_end + timedelta(days=1))
+        if cursor > end:
+            return gaps
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def completed_coverage(conn, state: str, start: date, end: date) -> Tuple[List[DateRange], List[str]]:
+    """Exhausted ranges of completed runs for a state inside [start, end], and those runs.
+
+    Awards are reused by run membership rather than by date, since an
+    award's action date need not fall in the range it was fetched for.
+    Runs whose window reaches outside [start, end] are therefore skipped:
+    reusing them would bring in awards a full pull would not return.
+    """
+    rows = conn.execute("""
+        SELECT run_id, filters_json FROM run_manifest
+        WHERE status = 'completed' AND filters_json IS NOT NULL
+        ORDER BY run_timestamp
+    """).fetchall()
+
+    covered = []
+    run_ids = []
+    for run_id, filters_json in rows:
+        try:
+            filters = json.loads(filters_json)
+        except ValueError:
+            continue
+        if filters.get('state') != state:
+            continue
+        window = run_window(filters)
+        if window is None or window[0] < start or window[1] > end:
+            continue
+        ranges = exhausted_ranges(filters)
+        if ranges:
+            covered.extend(ranges)
+            run_ids.append(run_id)
+
+    return covered, run_ids
+
+
+def split_range(start: date, end: date, granularity: str = 'month') -> List[DateRange]:
+    """Split [start, end] into calendar-aligned month, quarter or year shards."""
+    step = SHARD_MONTHS[granularity]
+    shards = []
+    cursor = start
+    while cursor <= end:
+        # First day of the next shard boundary after cursor
+        month_index = cursor.year * 12 + cursor.month - 1
+        boundary = (month_index // step + 1) * step
+        next_start = date(boundary // 12, boundary % 12 + 1, 1)
+        shards.append((cursor, min(end, next_start - timedelta(days=1))))
+        cursor = next_start
+    return shards
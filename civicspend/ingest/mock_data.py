@@ -1,6 +1,14 @@
 """Mock data generator for testing."""
 import random
 from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from civicspend.db.award_store import STORE_LOCK, store_run_awards
+from civicspend.db.transaction import rollback
 
 VENDORS = [
     "3M Company", "Target Corporation", "Best Buy", "General Mills",
@@ -14,6 +22,26 @@ AGENCIES = [
     "Department of Energy", "Department of Veterans Affairs"
 ]
 
+# Consonant-vowel syllables for synthetic vendor names
+SYLLABLES = np.array([c + v for c in "BCDFGHKLMNPRSTVZ" for v in "AEIOU"], dtype=object)
+
+
+def synthetic_vendor_names(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Distinct vendor names made of two random four-syllable words.
+
+    Numbered names like "VENDOR 0000012" differ by a digit or two and score
+    far above the fuzzy matching threshold against each other, so vendor
+    normalization merges them. Random words keep pairs well apart: no two
+    of 5000 names score above 80 with ``fuzz.ratio``.
+    """
+    names = np.empty(0, dtype=object)
+    while len(names) < count:
+        s = SYLLABLES[rng.integers(0, len(SYLLABLES), size=(count - len(names), 8))]
+        drawn = s[:, 0] + s[:, 1] + s[:, 2] + s[:, 3] + " " + s[:, 4] + s[:, 5] + s[:, 6] + s[:, 7] + " LLC"
+        names = pd.unique(np.concatenate([names, drawn]))
+    return np.asarray(names, dtype=object)
+
+
 def generate_mock_awards(count: int = 100):
     """Generate mock award data."""
     awards = []
@@ -32,3 +60,157 @@ def generate_mock_awards(count: int = 100):
         awards.append(award)
     
     return {"results": awards, "page_metadata": {"total": count}}
+
+
+class SyntheticAwardGenerator:
+    """Vectorized, seeded generator of award rows for load testing.
+
+    Vendors follow a Zipf-like popularity curve and each has its own typical
+    award size. Monthly volume and amounts follow a seasonal curve with a
+    fiscal year-end (September) spike. A fraction of vendor-months get a
+    spending multiplier; these are returned by ``labels()`` as ground truth
+    for measuring detector recall.
+
+    Rows are produced in chunks, each from its own seeded stream, so the
+    output for given parameters is reproducible and memory stays bounded
+    by ``chunk_rows``.
+    """
+
+    def __init__(
+        self,
+        n_vendors: int = 1000,
+        n_agencies: int = 20,
+        start_date: str = "2022-01-01",
+        months: int = 24,
+        anomaly_rate: float = 0.01,
+        anomaly_multiplier: tuple = (4.0, 12.0),
+        seed: int = 42
+    ):
+        self.n_vendors = n_vendors
+        self.n_agencies = n_agencies
+        self.months = months
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+
+        self.vendor_names = np.concatenate([
+            np.array(VENDORS[:n_vendors], dtype=object),
+            synthetic_vendor_names(rng, max(n_vendors - len(VENDORS), 0)),
+        ])
+        # Drawn without replacement: a repeated DUNS would merge two vendors
+        self.vendor_duns = (rng.choice(900000000, n_vendors, replace=False) + 100000000).astype(str).astype(object)
+        self.agency_names = np.array(
+            AGENCIES[:n_agencies] + [f"Synthetic Agency {i:03d}" for i in range(len(AGENCIES), n_agencies)],
+            dtype=object
+        )
+
+        # Popularity and typical award size per vendor
+        weights = 1.0 / np.arange(1, n_vendors + 1) ** 1.1
+        self.vendor_p = weights / weights.sum()
+        self.vendor_scale = rng.lognormal(mean=11.0, sigma=1.0, size=n_vendors)
+        self.agency_p = rng.dirichlet(np.ones(n_agencies))
+
+        # Seasonality by calendar month of each month in the window
+        first = np.datetime64(start_date[:7], 'M')
+        self.month_starts = first + np.arange(months)
+        calendar_month = self.month_starts.astype(int) % 12  # 0 = January
+        self.season = 1.0 + 0.25 * np.sin(2 * np.pi * calendar_month / 12)
+        self.season[calendar_month == 8] *= 1.5
+        self.month_p = self.season / self.season.sum()
+
+        # Ground-truth anomalies: vendor-month cells with a spend multiplier.
+        # Weighting by popularity ** 0.25 favours vendors that actually have
+        # awards most months without piling every anomaly onto the largest.
+        n_cells = n_vendors * months
+        n_anomalies = int(round(anomaly_rate * n_cells))
+        cell_p = np.repeat(self.vendor_p ** 0.25, months)
+        cells = rng.choice(n_cells, size=n_anomalies, replace=False, p=cell_p / cell_p.sum())
+        self.cell_multiplier = np.ones(n_cells)
+        self.cell_multiplier[cells] = rng.uniform(*anomaly_multiplier, size=n_anomalies)
+        self.anomaly_cells = np.sort(cells)
+
+    def _chunk(self, offset: int, size: int, chunk_index: int) -> pd.DataFrame:
+        rng = np.random.default_rng([self.seed, chunk_index])
+
+        vendor = rng.choice(self.n_vendors, size=size, p=self.vendor_p)
+        agency = rng.choice(self.n_agencies, size=size, p=self.agency_p)
+        month = rng.choice(self.months, size=size, p=self.month_p)
+        day = rng.integers(0, 28, size=size)
+
+        amount = (
+            self.vendor_scale[vendor]
+            * rng.lognormal(mean=0.0, sigma=0.5, size=size)
+            * self.season[month]
+            * self.cell_multiplier[vendor * self.months + month]
+        )
+
+        return pd.DataFrame({
+            'award_id': "SYN_AWD_" + pd.Series(np.arange(offset, offset + size)).astype(str).str.zfill(10),
+            'recipient_name': self.vendor_names[vendor],
+            'recipient_duns': self.vendor_duns[vendor],
+            'awarding_agency_name': self.agency_names[agency],
+            'action_date': self.month_starts[month].astype('datetime64[D]') + day,
+            'obligation_amount': np.round(amount, 2),
+        })
+
+    def iter_chunks(self, n_rows: int, chunk_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+        """Yield award rows (raw_awards layout, without run/state) in chunks."""
+        for chunk_index, offset in enumerate(range(0, n_rows, chunk_rows)):
+            yield self._chunk(offset, min(chunk_rows, n_rows - offset), chunk_index)
+
+    def generate(self, n_rows: int) -> pd.DataFrame:
+        """Generate all rows in memory (for small datasets)."""
+        return pd.concat(list(self.iter_chunks(n_rows)), ignore_index=True)
+
+    def labels(self) -> pd.DataFrame:
+        """Injected anomalies as (vendor, month, multiplier) ground truth."""
+        vendor = self.anomaly_cells // self.months
+        month = self.anomaly_cells % self.months
+        return pd.DataFrame({
+            'recipient_name': self.vendor_names[vendor],
+            'recipient_duns': self.vendor_duns[vendor],
+            'year_month': self.month_starts[month].astype(str),
+            'multiplier': np.round(self.cell_multiplier[self.anomaly_cells], 3),
+        })
+
+    def write_parquet(self, conn, out_dir: str, n_rows: int, chunk_rows: int = 1_000_000) -> int:
+        """Write rows as Parquet part files plus a labels file into a directory."""
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+
+        for i, chunk in enumerate(self.iter_chunks(n_rows, chunk_rows)):
+            target = str(out / f'part-{i:05d}.parquet').replace("'", "''")
+            conn.register('synthetic_chunk', chunk)
+            conn.execute(f"COPY synthetic_chunk TO '{target}' (FORMAT PARQUET)")
+            conn.unregister('synthetic_chunk')
+
+        target = str(out / 'labels.parquet').replace("'", "''")
+        conn.register('synthetic_labels', self.labels())
+        conn.execute(f"COPY synthetic_labels TO '{target}' (FORMAT PARQUET)")
+        conn.unregister('synthetic_labels')
+
+        return n_rows
+
+    def write_raw_awards(self, conn, run_id: str, n_rows: int, state: str = "MN",
+                         chunk_rows: int = 1_000_000) -> int:
+        """Insert rows into raw_awards for a run, one transaction per chunk."""
+        for chunk in self.iter_chunks(n_rows, chunk_rows):
+            conn.register('synthetic_chunk', chunk)
+            try:
+                with STORE_LOCK:
+                    conn.execute("BEGIN TRANSACTION")
+                    try:
+                        store_run_awards(conn, run_id, """
+                            SELECT award_id, recipient_name, recipient_duns,
+                                   awarding_agency_name, action_date, obligation_amount,
+                                   ? AS place_of_performance_state
+                            FROM synthetic_chunk
+                        """, [state])
+                        conn.execute("COMMIT")
+                    except Exception:
+                        rollback(conn)
+                        raise
+            finally:
+                conn.unregister('synthetic_chunk')
+
+        return n_rows
@@ -0,0 +1,174 @@
+"""Ingestion run lifecycle shared by the ingest commands."""
+import json
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from civicspend.db.award_store import STORE_LOCK, store_run_awards
+from civicspend.db.transaction import rollback
+from civicspend.exceptions import ValidationError
+from civicspend.ingest.checkpoint import filters_hash, load_checkpoint
+from civicspend.ingest.coverage import run_ranges
+from civicspend.ingest.writer import RawAwardWriter, DEFAULT_BATCH_ROWS
+
+
+def create_run(conn, filters: Dict) -> str:
+    """Register a new running ingestion run."""
+    run_id = str(uuid.uuid4())
+    conn.execute("""
+        INSERT INTO run_manifest (run_id, filters_json, status)
+        VALUES (?, ?, 'running')
+    """, [run_id, json.dumps(filters)])
+    return run_id
+
+
+def load_resume_state(conn, run_id: str) -> Dict:
+    """Filters and restart position for an interrupted run.
+
+    When the run has a checkpoint, ``max_pages`` is the number of pages
+    left before the original run's page cap (None if it had none).
+    """
+    row = conn.execute("""
+        SELECT filters_json, status FROM run_manifest WHERE run_id = ?
+    """, [run_id]).fetchone()
+
+    if not row:
+        raise ValidationError(f"Unknown run: {run_id}")
+    if row[1] == 'completed':
+        raise ValidationError(f"Run {run_id} already completed")
+
+    filters = json.loads(row[0])
+    fetch_ranges = [(s.isoformat(), e.isoformat()) for s, e in run_ranges(filters)]
+    if len(fetch_ranges) != 1:
+        raise ValidationError(
+            f"Run {run_id} spans {len(fetch_ranges)} date ranges; rerun with --incremental instead"
+        )
+
+    resume = {
+        'filters': filters,
+        'fetch_ranges': fetch_ranges,
+        'start_page': 1,
+        'limit': None,
+        'rows_written': 0
+    }
+
+    checkpoint = load_checkpoint(conn, run_id)
+    if checkpoint:
+        if checkpoint['filters_hash'] != filters_hash(filters):
+            raise ValidationError(f"Checkpoint for {run_id} does not match its filters")
+        resume['limit'] = checkpoint['page_limit']
+        resume['start_page'] = checkpoint['last_page'] + 1
+        resume['rows_written'] = checkpoint['rows_written']
+        page_cap = checkpoint['page_cap']
+        resume['max_pages'] = max(page_cap - checkpoint['last_page'], 0) if page_cap is not None else None
+
+    conn.execute("""
+        UPDATE run_manifest SET status = 'running' WHERE run_id = ?
+    """, [run_id])
+    return resume
+
+
+def ingest_ranges(
+    conn,
+    client,
+    run_id: str,
+    filters: Dict,
+    fetch_ranges: List[Tuple[str, str]],
+    limit: int = 100,
+    max_pages: Optional[int] = 5,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    start_page: int = 1,
+    total_records: int = 0,
+    echo: Callable[[str], None] = lambda message: None
+) -> int:
+    """Fetch date ranges into raw_awards and mark the run completed.
+
+    Ranges whose pagination ran out (rather than stopping at ``max_pages``)
+    are recorded as ``exhausted_ranges`` in the run's filters; only those
+    count as coverage for incremental ingest. On failure, pages that were
+    fully fetched are still flushed (with their checkpoint) and the run is
+    marked failed before the error is re-raised.
+    """
+    state = filters['state']
+    page_cap = start_page + max_pages - 1 if max_pages is not None else None
+    exhausted = []
+
+    # Page checkpoints only identify a position within a single date range
+    writer = RawAwardWriter(
+        conn, run_id, state, batch_rows=batch_rows,
+        filters_hash=filters_hash(filters) if len(fetch_ranges) == 1 else None,
+        page_limit=limit, page_cap=page_cap
+    )
+
+    try:
+        for range_start, range_end in fetch_ranges:
+            echo(f"Fetching {state} awards from {range_start} to {range_end}")
+
+            pages = client.fetch_pages(
+                state, range_start, range_end, limit, max_pages, start_page=start_page
+            )
+            last_page, has_next = start_page - 1, True
+            for page, result in pages:
+                count = writer.add(result['results'], page=page)
+                total_records += count
+                last_page = page
+                has_next = result.get('page_metadata', {}).get('hasNext') is not False
+                echo(f"Fetched page {page}: {count} records")
+
+            # Stopping before the cap means an empty page or hasNext ended the range
+            if page_cap is None or last_page < page_cap or not has_next:
+                exhausted.append([range_start, range_end])
+            else:
+                echo(f"Stopped at page {page_cap}; more pages remain for {range_start} to {range_end}")
+
+        writer.flush()
+
+        # Pull covered awards from earlier runs so this run is complete for its window
+        base_run_ids = filters.get("base_run_ids")
+        if base_run_ids:
+            copied = copy_base_awards(conn, run_id, base_run_ids)
+            total_records += copied
+            echo(f"Reused {copied} awards from {len(base_run_ids)} earlier run(s)")
+
+        conn.execute("""
+            UPDATE run_manifest
+            SET status = 'completed', row_count_raw = ?, filters_json = ?
+            WHERE run_id = ?
+        """, [total_records, json.dumps(dict(filters, exhausted_ranges=exhausted)), run_id])
+
+    except Exception:
+        try:
+            writer.flush()  # keep fully fetched pages so a resume can skip them
+        except Exception:
+            pass
+        conn.execute("""
+            UPDATE run_manifest SET status = 'failed' WHERE run_id = ?
+        """, [run_id])
+        raise
+
+    return total_records
+
+
+def copy_base_awards(conn, run_id: str, base_run_ids: List[str]) -> int:
+    """Copy every award of the earlier runs being reused, keeping freshly fetched rows.
+
+    Awards are picked by run membership, not by action date: the API
+    filters on activity in the period, so an award fetched for a range
+    may well have started outside it.
+    """
+    placeholders = ", ".join("?" for _ in base_run_ids)
+    with STORE_LOCK:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            added = store_run_awards(conn, run_id, f"""
+                SELECT award_id, recipient_name, recipient_duns,
+                       awarding_agency_name, action_date, obligation_amount,
+                       place_of_performance_state
+                FROM raw_awards
+                WHERE run_id IN ({placeholders})
+            """, base_run_ids)
+            conn.execute("COMMIT")
+        except Exception:
+            rollback(conn)
+            raise
+
+    return added
@@ -0,0 +1,95 @@
+"""Batched writes of API award records into raw_awards."""
+import pandas as pd
+from typing import Dict, List, Optional
+
+from civicspend.ingest.api_client import AWARD_FIELDS, normalize_award
+from civicspend.db.award_store import STORE_LOCK, store_run_awards
+from civicspend.db.transaction import rollback
+from civicspend.ingest.checkpoint import save_checkpoint
+
+DEFAULT_BATCH_ROWS = 5000
+
+
+class RawAwardWriter:
+    """Buffer award records and insert them into raw_awards in bulk.
+
+    Rows are accumulated in memory and written set-based per flush, inside
+    one transaction, through the shared award store; an award already in
+    the run is ignored, as with ``INSERT OR IGNORE``.
+
+    When ``filters_hash`` and ``page_limit`` are given, each flush also
+    records the last buffered page (and the run's ``page_cap``) in
+    ``ingest_checkpoints`` within the same transaction, so an interrupted
+    run can resume after it. Such runs flush at every page boundary, even
+    below ``batch_rows``, so a run killed between flushes loses at most
+    the page in flight.
+    """
+
+    def __init__(
+        self,
+        conn,
+        run_id: str,
+        state: str,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        filters_hash: Optional[str] = None,
+        page_limit: Optional[int] = None,
+        page_cap: Optional[int] = None
+    ):
+        self.conn = conn
+        self.run_id = run_id
+        self.state = state
+        self.batch_rows = batch_rows
+        self.filters_hash = filters_hash
+        self.page_limit = page_limit
+        self.page_cap = page_cap
+        self.buffer: List[Dict] = []
+        self.last_page: Optional[int] = None
+
+    def add(self, awards: List[Dict], page: Optional[int] = None) -> int:
+        """Buffer a page of awards, flushing once the batch is full or the page is checkpointed."""
+        self.buffer.extend(normalize_award(award) for award in awards)
+
+        if page is not None:
+            self.last_page = page
+
+        checkpointed = self.filters_hash is not None and page is not None
+        if checkpointed or len(self.buffer) >= self.batch_rows:
+            self.flush()
+
+        return len(awards)
+
+    def flush(self) -> int:
+        """Write buffered awards in one transaction."""
+        if not self.buffer and self.last_page is None:
+            return 0
+
+        df = pd.DataFrame(self.buffer, columns=list(AWARD_FIELDS))
+        df = df.drop_duplicates(subset='award_id', keep='first')
+        self.buffer = []
+
+        self.conn.register('raw_awards_batch', df)
+        try:
+            with STORE_LOCK:
+                self.conn.execute("BEGIN TRANSACTION")
+                try:
+                    store_run_awards(self.conn, self.run_id, """
+                        SELECT
+                            award_id, recipient_name, recipient_duns,
+                            awarding_agency_name, action_date, obligation_amount,
+                            ? AS place_of_performance_state
+                        FROM raw_awards_batch
+                    """, [self.state])
+                    if self.filters_hash and self.last_page is not None:
+                        save_checkpoint(
+                            self.conn, self.run_id, self.filters_hash,
+                            self.page_limit, self.last_page, self.page_cap
+                        )
+                    self.conn.execute("COMMIT")
+                except Exception:
+                    rollback(self.conn)
+                    raise
+        finally:
+            self.conn.unregister('raw_awards_batch')
+            self.last_page = None
+
+        return len(df)
@@ -0,0 +1,119 @@
+"""Recall and throughput of the vendor matcher backends.
+
+Run with ``python -m civicspend.normalize.benchmark [n_registry] [n_queries]``.
+"""
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from civicspend.normalize.blocking import VendorIndex
+from civicspend.normalize.tfidf import TfidfMatcher
+
+WORDS = [
+    "ACME", "ADVANCED", "AEROSPACE", "ALLIED", "AMERICAN", "ANALYTICS", "APEX", "ASSOCIATES",
+    "BIO", "BUILDERS", "CAPITAL", "CENTRAL", "COASTAL", "CONSULTING", "CONSTRUCTION", "DATA",
+    "DEFENSE", "DYNAMICS", "ELECTRIC", "ENERGY", "ENGINEERING", "ENVIRONMENTAL", "FEDERAL",
+    "FIRST", "GLOBAL", "GROUP", "HEALTH", "HOLDINGS", "INDUSTRIES", "INNOVATIONS", "LABS",
+    "LOGISTICS", "MEDICAL", "MIDWEST", "NATIONAL", "NETWORKS", "NORTHERN", "PACIFIC", "PARTNERS",
+    "PRECISION", "RESEARCH", "RESOURCES", "SCIENCES", "SECURITY", "SERVICES", "SOLUTIONS",
+    "STRATEGIC", "SUPPLY", "SYSTEMS", "TECHNOLOGIES", "UNITED", "VALLEY", "WESTERN",
+]
+SUFFIXES = ["INC", "LLC", "CORP", "CO", "LTD", "LP", ""]
+SYLLABLES = [
+    "AL", "BER", "CA", "DEN", "EL", "FOR", "GAR", "HAL", "IN", "JO", "KEL", "LAN", "MAR", "NOR",
+    "OS", "PER", "QUI", "RO", "SAN", "TOR", "UL", "VAN", "WES", "XE", "YOR", "ZEN",
+]
+
+
+def synthetic_registry(n: int, seed: int = 0) -> List[str]:
+    """Distinct company-like normalized names: a proper name, generic words, a suffix."""
+    rng = np.random.default_rng(seed)
+    names = set()
+    while len(names) < n:
+        proper = "".join(rng.choice(SYLLABLES, size=rng.integers(2, 4)))
+        words = rng.choice(WORDS, size=rng.integers(0, 3), replace=False)
+        suffix = rng.choice(SUFFIXES)
+        names.add(" ".join([proper] + list(words) + ([suffix] if suffix else [])))
+    return sorted(names)
+
+
+def perturb(name: str, rng) -> str:
+    """A recipient-name variant: typos, dropped or swapped suffixes."""
+    chars = list(name)
+    for _ in range(rng.integers(0, 3)):
+        pos = int(rng.integers(0, len(chars)))
+        op = rng.random()
+        if op < 0.4:
+            del chars[pos]
+        elif op < 0.7:
+            chars.insert(pos, chr(int(rng.integers(65, 91))))
+        else:
+            chars[pos] = chr(int(rng.integers(65, 91)))
+    variant = "".join(chars)
+    if rng.random() < 0.3:
+        variant = variant.rsplit(" ", 1)[0] + " " + rng.choice(SUFFIXES[:4])
+    return variant.strip()
+
+
+def run_benchmark(n_registry: int = 20000, n_queries: int = 2000, threshold: float = 85.0,
+                  seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Time each backend on the same queries and score recall against an exact scan.
+
+    Over queries that have an exact match (first registry name scoring at
+    least ``threshold``), ``recall`` is the share for which the backend
+    returns any name reaching the threshold and ``agreement`` the share for
+    which it returns the same name as the exact scan.
+    """
+    rng = np.random.default_rng(seed)
+    registry = synthetic_registry(n_registry, seed)
+    queries = [perturb(registry[i], rng) for i in rng.integers(0, n_registry, n_queries)]
+
+    def exact_cdist() -> List:
+        scores = process.cdist(queries, registry, scorer=fuzz.ratio, score_cutoff=threshold,
+                               dtype=np.float32, workers=-1)
+        hits = scores > 0
+        first = hits.argmax(axis=1)
+        return [int(c) if hits[r, c] else None for r, c in enumerate(first)]
+
+    def blocking() -> List:
+        index = VendorIndex(threshold)
+        for i, name in enumerate(registry):
+            index.add(i, name)
+        return [index.find(q) for q in queries]
+
+    def tfidf() -> List:
+        return TfidfMatcher(threshold).fit(registry).match(queries)
+
+    results = {}
+    truth = None
+    for backend, run in [('cdist', exact_cdist), ('blocking', blocking), ('tfidf', tfidf)]:
+        start = time.perf_counter()
+        found = run()
+        elapsed = time.perf_counter() - start
+        if truth is None:
+            truth = found
+        expected = [i for i, t in enumerate(truth) if t is not None]
+        recalled = sum(1 for i in expected if found[i] is not None)
+        agreed = sum(1 for i in expected if found[i] == truth[i])
+        results[backend] = {
+            'seconds': elapsed,
+            'names_per_sec': n_queries / elapsed if elapsed else float('inf'),
+            'recall': recalled / len(expected) if expected else 1.0,
+            'agreement': agreed / len(expected) if expected else 1.0,
+        }
+    return results
+
+
+def _print(results: Dict[str, Dict[str, float]]):
+    print(f"{'backend':<10} {'seconds':>9} {'names/s':>10} {'recall':>7} {'agree':>7}")
+    for backend, r in results.items():
+        print(f"{backend:<10} {r['seconds']:>9.2f} {r['names_per_sec']:>10.0f} "
+              f"{r['recall']:>7.3f} {r['agreement']:>7.3f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    _print(run_benchmark(*args))
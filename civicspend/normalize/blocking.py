@@ -0,0 +1,120 @@
+"""Candidate blocking index for fuzzy vendor matching."""
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from rapidfuzz import fuzz
+
+QGRAM = 3
+
+
+def qgrams(text: str, q: int = QGRAM) -> Counter:
+    """Multiset of overlapping q-grams."""
+    return Counter(text[i:i + q] for i in range(len(text) - q + 1))
+
+
+class VendorIndex:
+    """In-memory index that limits fuzzy scoring to plausible candidates.
+
+    ``fuzz.ratio`` is ``200 * LCS / (len_a + len_b)``, so a score of at least
+    ``threshold`` bounds both the length of a match and its Indel distance.
+    An Indel distance ``d`` can destroy at most ``q * d`` q-grams, which gives
+    the classic count filter: a match shares at least
+    ``max(len_a, len_b) - q + 1 - q * d`` q-grams with the query, so it must
+    appear in the postings of the query's rarest q-grams. Every vendor that
+    could reach the threshold is scored, so results are identical to scoring
+    every vendor, including the first-match-wins order.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.vendor_ids: List[str] = []
+        self.names: List[str] = []
+        self.lengths: List[int] = []
+        self.by_length: Dict[int, List[int]] = defaultdict(list)
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.vendor_ids)
+
+    def add(self, vendor_id: str, normalized_name: str):
+        """Append a vendor; later vendors lose ties to earlier ones."""
+        idx = len(self.vendor_ids)
+        self.vendor_ids.append(vendor_id)
+        self.names.append(normalized_name)
+        self.lengths.append(len(normalized_name))
+        self.by_length[len(normalized_name)].append(idx)
+        self.positions.setdefault(vendor_id, idx)
+        for gram in qgrams(normalized_name):
+            self.postings[gram].append(idx)
+
+    def name_of(self, vendor_id: str) -> Optional[str]:
+        """Normalized name a vendor was indexed under."""
+        idx = self.positions.get(vendor_id)
+        return self.names[idx] if idx is not None else None
+
+    def _length_range(self, length: int) -> range:
+        """Candidate lengths that can reach the threshold."""
+        t = self.threshold
+        if t <= 0:
+            return range(0, max(self.by_length, default=0) + 1)
+        if t >= 200:
+            return range(0)
+        # 200 * min / (length + other) >= t, widened by one for float rounding
+        low = math.floor(length * t / (200 - t)) - 1
+        high = math.ceil(length * (200 - t) / t) + 1
+        return range(max(0, low), high + 1)
+
+    def _min_shared(self, length: int, other: int) -> int:
+        """Minimum shared q-grams for a match between two lengths."""
+        total = length + other
+        min_lcs = math.ceil(self.threshold * total / 200 - 1e-9)
+        max_distance = total - 2 * min_lcs
+        return max(length, other) - QGRAM + 1 - QGRAM * max_distance
+
+    def candidates(self, normalized_name: str) -> List[int]:
+        """Indices of vendors that pass the length and q-gram filters, in order."""
+        length = len(normalized_name)
+        lengths = [l for l in self._length_range(length) if l in self.by_length]
+        if not lengths:
+            return []
+
+        required = {l: self._min_shared(length, l) for l in lengths}
+
+        # Lengths whose bound is not positive cannot be pruned by q-grams
+        selected = set()
+        for l in lengths:
+            if required[l] <= 0:
+                selected.update(self.by_length[l])
+
+        pruned = [r for r in required.values() if r > 0]
+        if pruned:
+            # Prefix filter: a vendor sharing r of the query's q-grams shares
+            # at least one of its |Q| - r + 1 rarest ones
+            grams = qgrams(normalized_name)
+            prefix_size = sum(grams.values()) - min(pruned) + 1
+            for gram in sorted(grams, key=lambda g: (len(self.postings.get(g, ())), g)):
+                if prefix_size <= 0:
+                    break
+                prefix_size -= grams[gram]
+                for idx in self.postings.get(gram, ()):
+                    if required.get(self.lengths[idx], 0) > 0:
+                        selected.add(idx)
+
+        return sorted(selected)
+
+    def matches(self, normalized_name: str) -> List[str]:
+        """Every indexed vendor scoring at least the threshold."""
+        return [
+            self.vendor_ids[idx] for idx in self.candidates(normalized_name)
+            if fuzz.ratio(normalized_name, self.names[idx], score_cutoff=self.threshold) >= self.threshold
+        ]
+
+    def find(self, normalized_name: str) -> Optional[str]:
+        """First indexed vendor scoring at least the threshold, if any."""
+        for idx in self.candidates(normalized_name):
+            score = fuzz.ratio(normalized_name, self.names[idx], score_cutoff=self.threshold)
+            if score >= self.threshold:
+                return self.vendor_ids[idx]
+        return None
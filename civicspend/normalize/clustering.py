@@ -0,0 +1,158 @@
+"""Incremental vendor clustering with union-find."""
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from civicspend.db.transaction import rollback
+from civicspend.normalize.blocking import VendorIndex
+
+
+def name_node(normalized: str) -> str:
+    return f"name:{normalized}"
+
+
+def identifier_node(kind: str, value: str) -> str:
+    return f"{kind}:{value}"
+
+
+def _rep_key(node: str):
+    # Names outrank identifiers, then lexicographic order
+    return (0 if node.startswith("name:") else 1, node)
+
+
+class VendorClusterer:
+    """Cluster vendor names over fuzzy edges and DUNS/UEI hard links.
+
+    Nodes are normalized names (``name:...``) and recipient identifiers
+    (``duns:...``, ``uei:...``). Two names are linked when ``fuzz.ratio``
+    reaches the threshold, and a name is linked to every identifier it
+    appears with. Clusters are the connected components, so they do not
+    depend on the order names arrive in, and the canonical representative
+    is the smallest member name.
+
+    Every node points straight at its cluster root; a union re-points the
+    smaller cluster (union by size), so each node moves O(log n) times in
+    total. Only re-pointed nodes and changed roots are written back by
+    ``save``, so a registry of millions of names is extended rather than
+    re-clustered.
+    """
+
+    def __init__(self, threshold: float = 85.0):
+        self.threshold = threshold
+        self.root: Dict[str, str] = {}
+        self.members: Dict[str, List[str]] = {}
+        self.representative: Dict[str, str] = {}
+        self.index = VendorIndex(threshold)
+        self._dirty = set()
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.root
+
+    def _add_node(self, node: str):
+        self.root[node] = node
+        self.members[node] = [node]
+        self.representative[node] = node
+        self._dirty.add(node)
+        if node.startswith("name:"):
+            self.index.add(node, node[len("name:"):])
+
+    def find(self, node: str) -> str:
+        """Cluster root of a node."""
+        return self.root[node]
+
+    def union(self, a: str, b: str) -> str:
+        """Merge the clusters of two nodes; returns the surviving root."""
+        root_a, root_b = self.root[a], self.root[b]
+        if root_a == root_b:
+            return root_a
+        if len(self.members[root_a]) < len(self.members[root_b]):
+            root_a, root_b = root_b, root_a
+
+        moved = self.members.pop(root_b)
+        for node in moved:
+            self.root[node] = root_a
+        self.members[root_a].extend(moved)
+        self._dirty.update(moved)
+
+        rep_b = self.representative.pop(root_b)
+        if _rep_key(rep_b) < _rep_key(self.representative[root_a]):
+            self.representative[root_a] = rep_b
+            self._dirty.add(root_a)
+        return root_a
+
+    def add_name(self, normalized: str, identifiers: Iterable[tuple] = ()) -> Optional[str]:
+        """Add a name with its (kind, value) identifiers; returns its cluster root."""
+        if not normalized:
+            return None
+
+        node = name_node(normalized)
+        if node not in self.root:
+            neighbours = self.index.matches(normalized)
+            self._add_node(node)
+            for other in neighbours:
+                self.union(node, other)
+
+        for kind, value in identifiers:
+            if not value:
+                continue
+            ident = identifier_node(kind, value)
+            if ident not in self.root:
+                self._add_node(ident)
+            self.union(node, ident)
+
+        return self.root[node]
+
+    def canonical(self, node: str) -> str:
+        """Deterministic representative of a node's cluster."""
+        return self.representative[self.root[node]]
+
+    def canonical_name(self, normalized: str) -> Optional[str]:
+        """Representative name for a normalized name, if it has been added."""
+        node = name_node(normalized)
+        if node not in self.root:
+            return None
+        return self.canonical(node)[len("name:"):]
+
+    def clusters(self) -> Dict[str, List[str]]:
+        """Representative -> member nodes."""
+        return {self.representative[r]: sorted(m) for r, m in self.members.items()}
+
+    @classmethod
+    def load(cls, conn, threshold: float = 85.0) -> "VendorClusterer":
+        """Restore clusters from vendor_clusters without re-scoring names."""
+        clusterer = cls(threshold)
+        rows = conn.execute("""
+            SELECT node, root, representative FROM vendor_clusters ORDER BY node
+        """).fetchall()
+
+        for node, root, representative in rows:
+            clusterer.root[node] = root
+            clusterer.members.setdefault(root, []).append(node)
+            if representative is not None:
+                clusterer.representative[root] = representative
+            if node.startswith("name:"):
+                clusterer.index.add(node, node[len("name:"):])
+        return clusterer
+
+    def save(self, conn) -> int:
+        """Write nodes whose root or representative changed; returns rows written."""
+        rows = [
+            (node, self.root[node], self.representative.get(node) if self.root[node] == node else None)
+            for node in sorted(self._dirty)
+        ]
+        if rows:
+            conn.register('cluster_updates', pd.DataFrame(rows, columns=['node', 'root', 'representative']))
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.execute("""
+                    INSERT OR REPLACE INTO vendor_clusters (node, root, representative, updated_at)
+                    SELECT node, root, representative, current_timestamp FROM cluster_updates
+                """)
+                conn.execute("COMMIT")
+            except Exception:
+                rollback(conn)
+                raise
+            finally:
+                conn.unregister('cluster_updates')
+        self._dirty.clear()
+        return len(rows)
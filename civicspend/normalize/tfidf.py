@@ -0,0 +1,87 @@
+"""Character n-gram TF-IDF candidate search for large vendor registries."""
+from typing import List, Optional, Sequence
+
+import numpy as np
+from rapidfuzz import fuzz
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class TfidfMatcher:
+    """Nearest-neighbour vendor search over sparse character n-gram vectors.
+
+    Registry names are embedded as L2-normalised TF-IDF vectors of character
+    n-grams. Queries are multiplied against the registry matrix in chunks
+    (one sparse product per chunk), each row keeps only its ``top_k`` most
+    similar vendors above ``min_similarity``, and those candidates are
+    rescored with ``fuzz.ratio``. Unlike the exact backends this is
+    approximate: a match outside the top k is missed.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 85.0,
+        ngram_size: int = 3,
+        top_k: int = 10,
+        min_similarity: float = 0.2,
+        chunk_size: int = 2000
+    ):
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.chunk_size = chunk_size
+        self.vectorizer = None
+        self.choices: List[str] = []
+        self._registry_t = None
+
+    def fit(self, choices: Sequence[str]) -> "TfidfMatcher":
+        """Build the registry matrix from normalized names."""
+        self.choices = list(choices)
+        self.vectorizer = TfidfVectorizer(
+            analyzer='char_wb', ngram_range=(self.ngram_size, self.ngram_size),
+            lowercase=False, dtype=np.float32
+        )
+        try:
+            matrix = self.vectorizer.fit_transform(self.choices)
+        except ValueError:
+            # No n-grams at all (empty registry or only empty names)
+            self.vectorizer = None
+            self._registry_t = None
+            return self
+        self._registry_t = matrix.T.tocsr()
+        return self
+
+    def candidates(self, queries: Sequence[str]) -> List[np.ndarray]:
+        """Registry indices of the top-k most similar names per query, best first."""
+        if self.vectorizer is None:
+            return [np.empty(0, dtype=np.int64) for _ in queries]
+
+        results = []
+        for start in range(0, len(queries), self.chunk_size):
+            chunk = self.vectorizer.transform(queries[start:start + self.chunk_size])
+            similarity = (chunk @ self._registry_t).tocsr()
+
+            for row in range(similarity.shape[0]):
+                lo, hi = similarity.indptr[row], similarity.indptr[row + 1]
+                cols = similarity.indices[lo:hi]
+                sims = similarity.data[lo:hi]
+
+                keep = sims >= self.min_similarity
+                cols, sims = cols[keep], sims[keep]
+                if len(cols) > self.top_k:
+                    top = np.argpartition(-sims, self.top_k - 1)[:self.top_k]
+                    cols, sims = cols[top], sims[top]
+                results.append(cols[np.lexsort((cols, -sims))])
+
+        return results
+
+    def match(self, queries: Sequence[str]) -> List[Optional[int]]:
+        """Earliest registry index among candidates reaching the threshold, per query."""
+        matches = []
+        for query, cols in zip(queries, self.candidates(queries)):
+            passing = [
+                col for col in cols
+                if fuzz.ratio(query, self.choices[col], score_cutoff=self.threshold) >= self.threshold
+            ]
+            matches.append(int(min(passing)) if passing else None)
+        return matches
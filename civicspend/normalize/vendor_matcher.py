@@ -1,14 +1,39 @@
 """Vendor normalization using fuzzy matching."""
 import uuid
-from rapidfuzz import fuzz
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+from civicspend.config import config
 from civicspend.db.connection import get_connection
+from civicspend.db.transaction import rollback
+from civicspend.normalize.blocking import VendorIndex
+from civicspend.normalize.clustering import VendorClusterer
+from civicspend.normalize.tfidf import TfidfMatcher
+
+# Score matrix cells per cdist chunk (float32, so ~200MB)
+CDIST_CHUNK_CELLS = 50_000_000
+
+MATCHER_BACKENDS = ('cdist', 'tfidf')
+
+
+def identifier_type(value: str) -> str:
+    """Alias type for a recipient identifier: 12-character UEI or DUNS."""
+    value = value.strip()
+    if len(value) == 12 and value.isalnum() and not value.isdigit():
+        return 'uei'
+    return 'duns'
 
 class VendorMatcher:
     """Match and normalize vendor names."""
     
-    def __init__(self, threshold: float = 85.0):
+    def __init__(self, threshold: float = 85.0, backend: str = None):
         self.threshold = threshold
+        self.backend = backend or config.get('normalization.matcher', 'cdist')
+        if self.backend not in MATCHER_BACKENDS:
+            raise ValueError(f"Unknown matcher backend: {self.backend}")
         self.conn = get_connection()
+        self._index = None
+        self._aliases = None
     
     def normalize_name(self, name: str) -> str:
         """Normalize vendor name for matching."""
@@ -16,52 +41,344 @@ class VendorMatcher:
             return ""
         return name.upper().strip().replace(",", "").replace(".", "")
     
-    def find_match(self, name: str, vendor_id: str = None) -> str:
-        """Find matching vendor or create new one."""
+    @property
+    def fuzzy_alias_type(self) -> str:
+        """Alias type for fuzzy name resolutions, which only hold at this threshold."""
+        return f"name@{self.threshold:g}"
+    
+    def name_alias(self, normalized: str, vendor_id: str) -> tuple:
+        """Alias recording that a normalized name resolved to a vendor.
+        
+        A name equal to the vendor's own normalized name is an exact
+        ``name`` alias; any other match came from fuzzy scoring and is keyed
+        by the threshold, so a stricter matcher does not reuse it.
+        """
+        kind = 'name' if self.get_index().name_of(vendor_id) == normalized else self.fuzzy_alias_type
+        return (kind, normalized, vendor_id)
+    
+    def lookup_name(self, normalized: str) -> str:
+        """Vendor previously resolved for a normalized name at this threshold, if any."""
+        aliases = self.get_aliases()
+        vid = aliases.get(('name', normalized))
+        if vid is None:
+            vid = aliases.get((self.fuzzy_alias_type, normalized))
+        return vid
+    
+    def find_match(self, name: str, vendor_id: str = None, pending_aliases: list = None) -> str:
+        """Find matching vendor or create new one.
+        
+        New aliases are written immediately, or appended to
+        ``pending_aliases`` for the caller to write in its own transaction.
+        """
         normalized = self.normalize_name(name)
         
-        # Check existing vendors
-        vendors = self.conn.execute("""
-            SELECT vendor_id, canonical_name FROM vendor_entities
-        """).fetchall()
+        # Names resolved before skip fuzzy scoring
+        vid = self.lookup_name(normalized)
+        if vid is not None:
+            return vid
         
-        for vid, canonical in vendors:
-            score = fuzz.ratio(normalized, self.normalize_name(canonical))
-            if score >= self.threshold:
-                return vid
+        # Check existing vendors
+        index = self.get_index()
+        vid = index.find(normalized)
+        if vid is not None:
+            self.store_aliases([self.name_alias(normalized, vid)], pending_aliases)
+            return vid
         
         # Create new vendor
         new_id = vendor_id or str(uuid.uuid4())
-        self.conn.execute("""
+        inserted = self.conn.execute("""
             INSERT OR IGNORE INTO vendor_entities (vendor_id, canonical_name)
             VALUES (?, ?)
-        """, [new_id, name])
+        """, [new_id, name]).fetchone()[0]
+        if inserted:
+            index.add(new_id, normalized)
+            self.store_aliases([('name', normalized, new_id)], pending_aliases)
         
         return new_id
     
+    def get_index(self) -> VendorIndex:
+        """Blocking index over existing vendors, built once per matcher."""
+        if self._index is None:
+            vendors = self.conn.execute("""
+                SELECT vendor_id, canonical_name FROM vendor_entities
+            """).fetchall()
+            
+            self._index = VendorIndex(self.threshold)
+            for vid, canonical in vendors:
+                self._index.add(vid, self.normalize_name(canonical))
+        return self._index
+    
+    def get_aliases(self) -> dict:
+        """Resolved (alias_type, alias_value) -> vendor_id, loaded once per matcher."""
+        if self._aliases is None:
+            rows = self.conn.execute("""
+                SELECT alias_type, alias_value, vendor_id FROM vendor_aliases
+            """).fetchall()
+            self._aliases = {(kind, value): vid for kind, value, vid in rows}
+        return self._aliases
+    
+    def _new_aliases(self, aliases: list) -> list:
+        """Aliases not yet known; the first resolution of an alias wins."""
+        known = self.get_aliases()
+        fresh = []
+        for kind, value, vid in aliases:
+            if value and (kind, value) not in known:
+                known[(kind, value)] = vid
+                fresh.append((kind, value, vid))
+        return fresh
+    
+    def store_aliases(self, aliases: list, pending: list = None):
+        """Record (alias_type, alias_value, vendor_id) resolutions.
+        
+        With ``pending`` the new aliases are appended to it instead of
+        being inserted.
+        """
+        fresh = self._new_aliases(aliases)
+        if pending is not None:
+            pending.extend(fresh)
+        elif fresh:
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO vendor_aliases (alias_type, alias_value, vendor_id)
+                VALUES (?, ?, ?)
+            """, fresh)
+    
+    def lookup_identifier(self, duns: str) -> str:
+        """Vendor previously resolved for a DUNS or UEI, if any."""
+        return self.get_aliases().get((identifier_type(duns), duns))
+    
     def normalize_run(self, run_id: str):
         """Normalize all vendors in a run."""
         awards = self.conn.execute("""
             SELECT award_id, recipient_name, recipient_duns
             FROM raw_awards
             WHERE run_id = ?
+            ORDER BY award_id
         """, [run_id]).fetchall()
         
         vendor_map = {}
+        assignments = []
+        new_aliases = []
         
         for award_id, name, duns in awards:
             # Use DUNS as strong identifier
             if duns and duns in vendor_map:
                 vendor_id = vendor_map[duns]
             else:
-                vendor_id = self.find_match(name)
+                vendor_id = self.lookup_identifier(duns) if duns else None
+                if vendor_id is None:
+                    vendor_id = self.find_match(name, pending_aliases=new_aliases)
                 if duns:
                     vendor_map[duns] = vendor_id
+                    self.store_aliases([(identifier_type(duns), duns, vendor_id)], new_aliases)
             
-            # Insert mapping
+            assignments.append((award_id, vendor_id))
+        
+        # Insert aliases and mappings in one transaction
+        frames = {
+            'award_assignments': pd.DataFrame(assignments, columns=['award_id', 'vendor_id']),
+            'new_aliases': pd.DataFrame(new_aliases, columns=['alias_type', 'alias_value', 'vendor_id']),
+        }
+        for view, frame in frames.items():
+            self.conn.register(view, frame)
+        
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO vendor_aliases (alias_type, alias_value, vendor_id)
+                SELECT alias_type, alias_value, vendor_id FROM new_aliases
+            """)
             self.conn.execute("""
                 INSERT OR IGNORE INTO award_vendor_map (run_id, award_id, vendor_id)
-                VALUES (?, ?, ?)
-            """, [run_id, award_id, vendor_id])
+                SELECT ?, award_id, vendor_id FROM award_assignments
+            """, [run_id])
+            self.conn.execute("COMMIT")
+        except Exception:
+            rollback(self.conn)
+            # Drop aliases that were never stored
+            self._aliases = None
+            raise
+        finally:
+            for view in frames:
+                self.conn.unregister(view)
         
         return len(set(vendor_map.values()))
+    
+    def normalize_run_batch(self, run_id: str, workers: int = None):
+        """Normalize all vendors in a run, scoring each distinct name once.
+        
+        Produces the same assignments as ``normalize_run``: known DUNS, UEI
+        and name aliases resolve first, remaining names are scored against
+        the existing registry with ``process.cdist`` on all cores, and only
+        names that match nothing are resolved in award order against the
+        vendors this run creates. Only distinct (name, DUNS) pairs pass
+        through Python; award rows are mapped by a join in DuckDB.
+        """
+        if workers is None:
+            workers = config.get('normalization.match_workers', -1)
+        
+        # Distinct recipients in the order normalize_run first meets them
+        recipients = self.conn.execute("""
+            SELECT recipient_name, recipient_duns
+            FROM raw_awards
+            WHERE run_id = ?
+            GROUP BY recipient_name, recipient_duns
+            ORDER BY MIN(award_id)
+        """, [run_id]).fetchall()
+        
+        # Recipients that call find_match: no DUNS, or the first with a DUNS
+        # that has not been resolved in an earlier run
+        lookup_names = {}
+        seen_duns = set()
+        for name, duns in recipients:
+            if duns and duns in seen_duns:
+                continue
+            if duns:
+                seen_duns.add(duns)
+                if self.lookup_identifier(duns) is not None:
+                    continue
+            lookup_names.setdefault(self.normalize_name(name), name)
+        
+        resolved = {n: self.lookup_name(n) for n in lookup_names}
+        unresolved = [n for n, vid in resolved.items() if vid is None]
+        resolved.update(self._match_registry(unresolved, workers))
+        new_aliases = [self.name_alias(n, resolved[n]) for n in unresolved if resolved[n] is not None]
+        
+        # Names without a registry match become vendors in award order
+        new_vendors = []
+        for normalized, name in lookup_names.items():
+            if resolved[normalized] is not None:
+                continue
+            index = self.get_index()
+            vid = index.find(normalized)
+            if vid is None:
+                vid = str(uuid.uuid4())
+                index.add(vid, normalized)
+                new_vendors.append((vid, name))
+            resolved[normalized] = vid
+            new_aliases.append(self.name_alias(normalized, vid))
+        
+        # DUNS decide the vendor for all their awards; other awards go by name
+        vendor_map = {}
+        name_map = {}
+        for name, duns in recipients:
+            if duns:
+                if duns not in vendor_map:
+                    vendor_id = self.lookup_identifier(duns) or resolved[self.normalize_name(name)]
+                    vendor_map[duns] = vendor_id
+                    new_aliases.append((identifier_type(duns), duns, vendor_id))
+            else:
+                name_map[name] = resolved[self.normalize_name(name)]
+        
+        self._write_assignments(run_id, new_vendors, new_aliases, vendor_map, name_map)
+        
+        return len(set(vendor_map.values()))
+    
+    def _match_registry(self, names: list, workers: int) -> dict:
+        """First registry vendor scoring at least the threshold for each name.
+        
+        The ``tfidf`` backend only rescores each name's nearest neighbours,
+        so it trades a little recall for throughput on very large registries.
+        """
+        resolved = {name: None for name in names}
+        if not names:
+            return resolved
+        index = self.get_index()
+        if not len(index):
+            return resolved
+        
+        if self.backend == 'tfidf':
+            tfidf = TfidfMatcher(
+                self.threshold,
+                top_k=config.get('normalization.tfidf_top_k', 10),
+                min_similarity=config.get('normalization.tfidf_min_similarity', 0.2)
+            ).fit(index.names)
+            for name, col in zip(names, tfidf.match(names)):
+                if col is not None:
+                    resolved[name] = index.vendor_ids[col]
+            return resolved
+        
+        choices = index.names
+        chunk = max(1, CDIST_CHUNK_CELLS // len(choices))
+        for start in range(0, len(names), chunk):
+            queries = names[start:start + chunk]
+            scores = process.cdist(
+                queries, choices, scorer=fuzz.ratio,
+                score_cutoff=self.threshold, dtype=np.float32, workers=workers
+            )
+            # Scores below the cutoff come back as 0
+            hits = scores > 0 if self.threshold > 0 else np.ones(scores.shape, dtype=bool)
+            first = hits.argmax(axis=1)
+            for row, (name, col) in enumerate(zip(queries, first)):
+                if hits[row, col]:
+                    resolved[name] = index.vendor_ids[col]
+        
+        return resolved
+    
+    def _write_assignments(self, run_id: str, new_vendors: list, aliases: list,
+                           duns_map: dict, name_map: dict):
+        """Insert new vendors, aliases and award mappings in one transaction."""
+        frames = {
+            'new_vendors': pd.DataFrame(new_vendors, columns=['vendor_id', 'canonical_name']),
+            'new_aliases': pd.DataFrame(
+                self._new_aliases(aliases), columns=['alias_type', 'alias_value', 'vendor_id']
+            ),
+            'duns_vendor_map': pd.DataFrame(list(duns_map.items()), columns=['duns', 'vendor_id']),
+            'name_vendor_map': pd.DataFrame(list(name_map.items()), columns=['name', 'vendor_id'],
+                                            dtype=object),
+        }
+        for view, frame in frames.items():
+            self.conn.register(view, frame)
+        
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO vendor_entities (vendor_id, canonical_name)
+                SELECT vendor_id, canonical_name FROM new_vendors
+            """)
+            self.conn.execute("""
+                INSERT OR IGNORE INTO vendor_aliases (alias_type, alias_value, vendor_id)
+                SELECT alias_type, alias_value, vendor_id FROM new_aliases
+            """)
+            self.conn.execute("""
+                INSERT OR IGNORE INTO award_vendor_map (run_id, award_id, vendor_id)
+                SELECT r.run_id, r.award_id, COALESCE(d.vendor_id, n.vendor_id)
+                FROM raw_awards r
+                LEFT JOIN duns_vendor_map d ON d.duns = r.recipient_duns
+                LEFT JOIN name_vendor_map n
+                    ON n.name IS NOT DISTINCT FROM r.recipient_name
+                    AND COALESCE(r.recipient_duns, '') = ''
+                WHERE r.run_id = ?
+            """, [run_id])
+            self.conn.execute("COMMIT")
+        except Exception:
+            rollback(self.conn)
+            # Drop vendors and aliases that were never stored
+            self._index = None
+            self._aliases = None
+            raise
+        finally:
+            for view in frames:
+                self.conn.unregister(view)
+    
+    def update_clusters(self, run_id: str) -> int:
+        """Add a run's names and identifiers to the persisted vendor clusters.
+        
+        Returns the number of clusters touched by the run.
+        """
+        rows = self.conn.execute("""
+            SELECT DISTINCT recipient_name, recipient_duns
+            FROM raw_awards
+            WHERE run_id = ?
+            ORDER BY ALL
+        """, [run_id]).fetchall()
+        
+        clusterer = VendorClusterer.load(self.conn, self.threshold)
+        roots = set()
+        for name, duns in rows:
+            identifiers = [(identifier_type(duns), duns)] if duns else []
+            root = clusterer.add_name(self.normalize_name(name), identifiers)
+            if root is not None:
+                roots.add(root)
+        clusterer.save(self.conn)
+        
+        return len({clusterer.find(r) for r in roots})
@@ -3,7 +3,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from civicspend.db.anomaly_store import load_anomalies
 from civicspend.db.connection import get_connection
+from civicspend.features.cube import SpendingCube
 from civicspend.ui.demo_data import ensure_demo_data
 
 st.set_page_config(
@@ -67,27 +69,18 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 with tab1:
     st.header("🔍 Detected Spending Anomalies")
     
-    anomalies_df = pd.read_sql_query("""
-        SELECT ve.canonical_name as vendor_name, mvs.month,
-               mvs.obligation_sum as value, mvs.award_count,
-               CASE 
-                   WHEN mvs.obligation_sum > mvs.rolling_3m_avg * 3 THEN 'critical'
-                   WHEN mvs.obligation_sum > mvs.rolling_3m_avg * 2 THEN 'high'
-                   ELSE 'medium'
-               END as severity
-        FROM monthly_vendor_spend mvs
-        JOIN vendor_entities ve ON mvs.vendor_id = ve.vendor_id
-        WHERE mvs.run_id = ? AND mvs.rolling_3m_avg IS NOT NULL
-        ORDER BY mvs.obligation_sum DESC LIMIT 50
-    """, conn, params=[run_id])
+    anomalies_df = load_anomalies(conn, run_id=run_id, limit=50)
     
     if not anomalies_df.empty:
-        fig = px.scatter(anomalies_df, x='month', y='value', color='severity',
-                        size='value', hover_data=['vendor_name', 'award_count'],
+        fig = px.scatter(anomalies_df, x='year_month', y='value', color='severity',
+                        size='value', hover_data=['vendor_name', 'award_count', 'detector', 'score'],
                         title='Spending Anomalies Over Time')
         st.plotly_chart(fig, use_container_width=True)
         
-        st.dataframe(anomalies_df.style.format({'value': '${:,.2f}'}), use_container_width=True)
+        st.dataframe(anomalies_df[['vendor_name', 'year_month', 'value', 'award_count', 'detector', 'score', 'severity']]
+                     .style.format({'value': '${:,.2f}'}), use_container_width=True)
+    else:
+        st.info("No anomalies stored for this run yet. Run `civicspend detect --run-id <run_id>`.")
 
 # TAB 2: Vendor Analysis
 with tab2:
@@ -238,14 +231,17 @@ with tab5:
     
     # Agency distribution
     st.subheader("Spending by Agency")
-    agency_df = pd.read_sql_query("""
-        SELECT awarding_agency_name, SUM(total_obligation) as total_spending,
-               COUNT(*) as award_count
-        FROM raw_awards
-        WHERE run_id = ?
-        GROUP BY awarding_agency_name
-        ORDER BY total_spending DESC LIMIT 10
-    """, conn, params=[run_id])
+    cube = SpendingCube(conn)
+    agency_df = cube.query(run_id, 'all', by=['agency'])
+    if agency_df.empty:
+        # Runs built before the spending cube existed
+        cube.build(run_id)
+        agency_df = cube.query(run_id, 'all', by=['agency'])
+    agency_df = agency_df.rename(columns={
+        'agency': 'awarding_agency_name', 'obligation_sum': 'total_spending'
+    })
+    agency_df['total_spending'] = agency_df['total_spending'].astype(float)
+    agency_df = agency_df.nlargest(10, 'total_spending')
     
     if not agency_df.empty:
         fig = px.pie(agency_df, values='total_spending', names='awarding_agency_name',
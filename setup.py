@@ -15,6 +15,12 @@ setup(
         "rapidfuzz>=3.0.0",
         "PyYAML>=6.0.0",
     ],
+    extras_require={
+        # Compiles the rolling feature kernels; NumPy is used without it
+        "numba": ["numba>=0.58.0"],
+        # Compresses the API response cache with zstd; zlib is used without it
+        "zstd": ["zstandard>=0.22.0"],
+    },
     entry_points={
         "console_scripts": [
             "civicspend=civicspend.cli.main:cli",
@@ -0,0 +1,113 @@
+"""Shared test fixtures."""
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+def _monthly_results(body, per_month):
+    """Awards active in each month of the requested period, one page of them.
+
+    Every award started a year before the month it is active in, so its
+    Start Date lies outside any window that fetches it.
+    """
+    period = body['filters']['time_period'][0]
+    start, end = date.fromisoformat(period['start_date']), date.fromisoformat(period['end_date'])
+    awards = []
+    month = start.replace(day=1)
+    while month <= end:
+        awards.extend(
+            {"Award ID": f"AWD_{month:%Y-%m}_{i}", "Start Date": f"{month.year - 1}-{month:%m}-15",
+             "Award Amount": 1000.0}
+            for i in range(per_month)
+        )
+        month = (month + timedelta(days=32)).replace(day=1)
+    offset = (body['page'] - 1) * body['limit']
+    return awards[offset:offset + body['limit']], offset + body['limit'] < len(awards)
+
+
+def _start_stub_server(total_pages=6, delay=0.1, fail_once=(), shared_awards=False, monthly_awards=0):
+    """Start a local stub of the spending_by_award endpoint.
+
+    With ``shared_awards`` every request gets the same awards for a page,
+    whatever its filters, so concurrent runs overlap. With
+    ``monthly_awards`` each month in the requested period contributes that
+    many awards, so overlapping requests return the same awards and
+    ``total_pages`` is ignored.
+    """
+    state = {'in_flight': 0, 'peak': 0, 'calls': [], 'bodies': [], 'times': [], 'failed': set()}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            page = body['page']
+            with lock:
+                state['calls'].append(page)
+                state['bodies'].append(body)
+                state['times'].append(time.monotonic())
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            time.sleep(delay)
+            with lock:
+                state['in_flight'] -= 1
+                should_fail = page in fail_once and page not in state['failed']
+                if should_fail:
+                    state['failed'].add(page)
+
+            if should_fail:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            results = []
+            has_next = page < total_pages
+            start = body['filters']['time_period'][0]['start_date']
+            prefix = f"AWD_{start}"
+            if shared_awards:
+                start, prefix = '2024-01-15', 'AWD_SHARED'
+            if monthly_awards:
+                results, has_next = _monthly_results(body, monthly_awards)
+            elif page <= total_pages:
+                results = [
+                    {"Award ID": f"{prefix}_{page}_{i}", "Start Date": start, "Award Amount": 1000.0}
+                    for i in range(body['limit'])
+                ]
+            payload = json.dumps({
+                "results": results,
+                "page_metadata": {"page": page, "hasNext": has_next}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+@pytest.fixture
+def stub_server():
+    """Factory for stub API servers, shut down when the test ends.
+
+    Call it with the stub options; it returns ``(server, state)`` where
+    ``state`` records the pages, request bodies and timings it served.
+    """
+    servers = []
+
+    def start(**options):
+        server, state = _start_stub_server(**options)
+        servers.append(server)
+        return server, state
+
+    yield start
+    for server in servers:
+        server.shutdown()
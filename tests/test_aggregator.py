@@ -0,0 +1,169 @@
+"""Test monthly aggregation."""
+import numpy as np
+import pandas as pd
+
+from civicspend.db import connection
+
+
+def _pandas_reference(conn, run_id):
+    """Monthly aggregation as previously computed in pandas."""
+    df = conn.execute("""
+        SELECT avm.vendor_id, strftime(ra.action_date, '%Y-%m') AS year_month,
+               CAST(ra.obligation_amount AS DOUBLE) AS obligation_amount
+        FROM raw_awards ra
+        JOIN award_vendor_map avm ON ra.run_id = avm.run_id AND ra.award_id = avm.award_id
+        WHERE ra.run_id = ? AND ra.action_date IS NOT NULL
+    """, [run_id]).df()
+
+    monthly = df.groupby(['vendor_id', 'year_month']).agg({
+        'obligation_amount': ['sum', 'count', 'mean']
+    }).reset_index()
+    monthly.columns = ['vendor_id', 'year_month', 'obligation_sum', 'award_count', 'avg_award_size']
+
+    monthly = monthly.sort_values(['vendor_id', 'year_month'])
+    monthly['rolling_3m_mean'] = monthly.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: x.rolling(3, min_periods=1).mean()
+    )
+    monthly['rolling_3m_mad'] = monthly.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: (x - x.rolling(3, min_periods=1).median()).abs().rolling(3, min_periods=1).median()
+    )
+    return monthly.reset_index(drop=True)
+
+
+def test_sql_aggregation_matches_pandas(tmp_path, monkeypatch):
+    """Test the DuckDB aggregation reproduces the pandas rolling statistics."""
+    from civicspend.features.aggregator import MonthlyAggregator
+    from civicspend.ingest.writer import RawAwardWriter
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "agg.duckdb")
+    connection.init_database()
+
+    rng = np.random.default_rng(5)
+    awards = []
+    for i in range(400):
+        month = rng.choice([1, 2, 3, 5, 6, 9, 10, 11, 12])  # gaps between active months
+        awards.append({
+            "Award ID": f"AGG_{i}", "Recipient Name": f"VENDOR {i % 7}",
+            "Start Date": f"2023-{month:02d}-{rng.integers(1, 28):02d}" if i % 50 else None,
+            "Award Amount": round(float(rng.lognormal(9, 1.5)), 2),
+        })
+
+    aggregator = MonthlyAggregator()
+    conn = aggregator.conn
+    writer = RawAwardWriter(conn, "run", "MN")
+    writer.add(awards)
+    writer.flush()
+    conn.execute("""
+        INSERT INTO award_vendor_map
+        SELECT run_id, award_id, 'V' || (hash(recipient_name) % 5) FROM raw_awards
+    """)
+
+    count = aggregator.aggregate_run("run")
+
+    result = conn.execute("""
+        SELECT vendor_id, year_month,
+               CAST(obligation_sum AS DOUBLE) AS obligation_sum, award_count,
+               CAST(avg_award_size AS DOUBLE) AS avg_award_size,
+               CAST(rolling_3m_mean AS DOUBLE) AS rolling_3m_mean,
+               CAST(rolling_3m_mad AS DOUBLE) AS rolling_3m_mad
+        FROM monthly_vendor_spend WHERE run_id = 'run'
+        ORDER BY vendor_id, year_month
+    """).df()
+    expected = _pandas_reference(conn, "run")
+    conn.close()
+
+    assert count == len(expected) == len(result)
+    assert (result[['vendor_id', 'year_month']].values == expected[['vendor_id', 'year_month']].values).all()
+    assert (result['award_count'].values == expected['award_count'].values).all()
+    for col in ['obligation_sum', 'avg_award_size', 'rolling_3m_mean', 'rolling_3m_mad']:
+        # Stored as DECIMAL(18,2)
+        np.testing.assert_allclose(result[col], expected[col].round(2), atol=0.0051)
+
+
+def _stored_monthly(conn, run_id):
+    return conn.execute("""
+        SELECT vendor_id, year_month,
+               CAST(obligation_sum AS DOUBLE) AS obligation_sum, award_count,
+               CAST(avg_award_size AS DOUBLE) AS avg_award_size,
+               CAST(rolling_3m_mean AS DOUBLE) AS rolling_3m_mean,
+               CAST(rolling_3m_mad AS DOUBLE) AS rolling_3m_mad
+        FROM monthly_vendor_spend WHERE run_id = ?
+        ORDER BY vendor_id, year_month
+    """, [run_id]).df()
+
+
+def test_incremental_refresh_matches_full_aggregation(tmp_path, monkeypatch):
+    """Test refreshing only changed vendor-months equals re-aggregating the run."""
+    from civicspend.features.aggregator import MonthlyAggregator
+    from civicspend.ingest.writer import RawAwardWriter
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "refresh.duckdb")
+    connection.init_database()
+
+    rng = np.random.default_rng(8)
+    awards = []
+    for i in range(600):
+        year, month = 2021 + int(rng.integers(0, 3)), int(rng.integers(1, 13))
+        awards.append({
+            "Award ID": f"INC_{i}", "Recipient Name": f"VENDOR {i % 20}",
+            "Start Date": f"{year}-{month:02d}-{rng.integers(1, 28):02d}",
+            "Award Amount": round(float(rng.lognormal(9, 1.5)), 2),
+        })
+
+    aggregator = MonthlyAggregator()
+    conn = aggregator.conn
+    writer = RawAwardWriter(conn, "base", "MN")
+    writer.add(awards)
+    writer.flush()
+    conn.execute("""
+        INSERT INTO award_vendor_map
+        SELECT run_id, award_id, 'V' || (hash(recipient_name) % 20) FROM raw_awards
+    """)
+    aggregator.aggregate_run("base")
+    total = conn.execute("SELECT COUNT(*) FROM monthly_vendor_spend WHERE run_id = 'base'").fetchone()[0]
+
+    # Next run: same awards, one amended, one vendor-month dropped, one new month
+    conn.execute("INSERT INTO run_awards SELECT 'next', award_id, row_hash FROM run_awards WHERE run_id = 'base'")
+    conn.execute("INSERT INTO award_vendor_map SELECT 'next', award_id, vendor_id FROM award_vendor_map WHERE run_id = 'base'")
+    conn.execute("""
+        INSERT INTO award_store (award_id, row_hash, recipient_name, awarding_agency_name, action_date, obligation_amount)
+        SELECT award_id, 'amended', recipient_name, awarding_agency_name, action_date, obligation_amount * 3
+        FROM award_store WHERE award_id = 'INC_10'
+    """)
+    conn.execute("UPDATE run_awards SET row_hash = 'amended' WHERE run_id = 'next' AND award_id = 'INC_10'")
+    vendor, year_month = conn.execute("""
+        SELECT vendor_id, year_month FROM monthly_vendor_spend
+        WHERE run_id = 'base' ORDER BY vendor_id, year_month LIMIT 1 OFFSET 5
+    """).fetchone()
+    conn.execute("""
+        DELETE FROM run_awards r USING raw_awards ra, award_vendor_map m
+        WHERE r.run_id = 'next' AND ra.run_id = 'next' AND m.run_id = 'next'
+        AND ra.award_id = r.award_id AND m.award_id = r.award_id
+        AND m.vendor_id = ? AND strftime(ra.action_date, '%Y-%m') = ?
+    """, [vendor, year_month])
+    conn.execute("""
+        INSERT INTO award_store (award_id, row_hash, recipient_name, action_date, obligation_amount)
+        VALUES ('INC_NEW', 'new', 'VENDOR 3', '2024-02-10', 1234.50)
+    """)
+    conn.execute("INSERT INTO run_awards VALUES ('next', 'INC_NEW', 'new')")
+    conn.execute("""
+        INSERT INTO award_vendor_map
+        SELECT 'next', 'INC_NEW', vendor_id FROM award_vendor_map WHERE run_id = 'base' AND award_id = 'INC_3'
+    """)
+
+    stats = aggregator.refresh_run("next", "base")
+    assert stats['changed'] >= 3
+    assert stats['deleted'] == 1
+    assert 0 < stats['upserted'] < total
+    assert len(stats['vendors']) <= 3
+
+    # Same awards aggregated from scratch
+    conn.execute("INSERT INTO run_awards SELECT 'full', award_id, row_hash FROM run_awards WHERE run_id = 'next'")
+    conn.execute("INSERT INTO award_vendor_map SELECT 'full', award_id, vendor_id FROM award_vendor_map WHERE run_id = 'next'")
+    aggregator.aggregate_run("full")
+    pd.testing.assert_frame_equal(_stored_monthly(conn, "next"), _stored_monthly(conn, "full"))
+
+    # Refreshing again with nothing changed touches nothing
+    stats = aggregator.refresh_run("next")
+    assert stats == {'changed': 0, 'upserted': 0, 'deleted': 0, 'vendors': []}
+    conn.close()
@@ -0,0 +1,76 @@
+"""Test persisted anomalies."""
+import numpy as np
+
+from civicspend.db import connection
+
+
+def _seed(conn):
+    rng = np.random.default_rng(3)
+    conn.executemany("""
+        INSERT INTO vendor_entities (vendor_id, canonical_name) VALUES (?, ?)
+    """, [(f"V{v}", f"VENDOR {v}") for v in range(20)])
+    rows = []
+    for v in range(20):
+        for m in range(12):
+            value = float(rng.lognormal(10, 0.3)) * (25 if v % 5 == 0 and m == 6 else 1)
+            rows.append(("run", f"V{v}", f"2023-{m + 1:02d}", round(value, 2), 2, value / 2, value, 0))
+    conn.executemany("INSERT INTO monthly_vendor_spend VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def test_detectors_persist_anomalies(tmp_path, monkeypatch):
+    """Test both detectors write anomalies that the API reads back."""
+    from fastapi.testclient import TestClient
+
+    from civicspend.db.anomaly_store import load_anomalies
+    from civicspend.detect.baseline import RobustMADDetector
+    from civicspend.detect.ml import MLDetector
+    from civicspend.features.store import FeatureStore
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "anomalies.duckdb")
+    connection.init_database()
+    from civicspend.api import main as api
+
+    baseline = RobustMADDetector(threshold=3.5)
+    conn = baseline.conn
+    _seed(conn)
+
+    found = baseline.detect_run("run")
+    assert baseline.save_anomalies("run", found) == len(found) > 0
+
+    # Re-detecting replaces the detector's rows for the run
+    assert baseline.save_anomalies("run", found.head(2)) == 2
+    stored = load_anomalies(conn, run_id="run", detector="robust_mad")
+    assert len(stored) == 2
+    assert set(stored['detector_version']) == {baseline.detector_version}
+    assert stored['vendor_name'].notna().all() and stored['value'].notna().all()
+
+    ml = MLDetector(contamination=0.05)
+    ml.store = FeatureStore(ml.engineer, store_dir=str(tmp_path / "features"))
+    ml.train("run")
+    predictions = ml.predict("run")
+    assert ml.save_anomalies("run", predictions) == len(predictions) > 0
+
+    stored = load_anomalies(conn, run_id="run", limit=1000)
+    assert set(stored['detector']) == {"robust_mad", "isolation_forest"}
+    assert list(stored['value']) == sorted(stored['value'], reverse=True)
+    critical = load_anomalies(conn, run_id="run", severity="critical", limit=1000)
+    assert (critical['severity'] == 'critical').all()
+
+    monkeypatch.setattr(api, "conn", conn)
+    response = TestClient(api.app).get("/anomalies", params={"run_id": "run", "detector": "isolation_forest"})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == len(predictions)
+    assert {row['severity'] for row in body} <= {'critical', 'high', 'medium', 'low'}
+
+    # A detector loading the model reports the contamination it was trained with
+    monkeypatch.chdir(tmp_path)
+    ml.save_model("run")
+    loaded = MLDetector(contamination=0.2)
+    loaded.store = ml.store
+    loaded.load_model("run")
+    assert loaded.detector_version == ml.detector_version
+
+    loaded.engineer.conn.close()
+    ml.engineer.conn.close()
+    conn.close()
@@ -19,3 +19,127 @@ def test_rate_limiting():
     
     # Should take at least RATE_LIMIT_DELAY seconds
     assert elapsed >= 0.2
+
+def test_concurrent_fetch_pages(stub_server):
+    """Test pages are fetched concurrently and yielded in order."""
+    server, state = stub_server(total_pages=6, delay=0.2)
+    client = USAspendingClient(
+        base_url=f"http://127.0.0.1:{server.server_port}",
+        rate_limit=50,
+        max_workers=4
+    )
+    pages = list(client.fetch_pages('MN', '2024-01-01', '2024-12-31', limit=3, max_pages=10))
+
+    assert [page for page, _ in pages] == [1, 2, 3, 4, 5, 6]
+    assert pages[0][1]['results'][0]['Award ID'] == 'AWD_2024-01-01_1_0'
+    assert state['peak'] > 1
+    assert max(state['calls']) <= 6 + 4
+
+def test_concurrent_fetch_retries_failed_page(stub_server):
+    """Test a transient server error is retried inside the worker."""
+    server, state = stub_server(total_pages=3, delay=0.0, fail_once=(2,))
+    client = USAspendingClient(
+        base_url=f"http://127.0.0.1:{server.server_port}",
+        rate_limit=50,
+        max_workers=2
+    )
+    pages = list(client.fetch_pages('MN', '2024-01-01', '2024-12-31', limit=2, max_pages=3))
+
+    assert [page for page, _ in pages] == [1, 2, 3]
+    assert state['calls'].count(2) == 2
+
+def test_token_bucket_shared_across_threads():
+    """Test the token bucket caps the combined request rate."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from civicspend.ingest.api_client import TokenBucket
+
+    bucket = TokenBucket(rate=20)
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(executor.map(lambda _: bucket.acquire(), range(11)))
+    elapsed = time.time() - start
+
+    # First token is immediate, the remaining 10 are spaced 50ms apart
+    assert elapsed >= 0.45
+
+def test_response_cache_and_offline_replay(tmp_path, stub_server):
+    """Test cached pages are replayed without hitting the server."""
+    import pytest
+    from civicspend.exceptions import APIError
+    from civicspend.ingest.cache import ResponseCache
+
+    server, state = stub_server(total_pages=3, delay=0.0)
+    client = USAspendingClient(
+        base_url=f"http://127.0.0.1:{server.server_port}",
+        rate_limit=50,
+        cache=ResponseCache(str(tmp_path), ttl_seconds=3600)
+    )
+    first = list(client.fetch_pages('MN', '2024-01-01', '2024-12-31', limit=2, max_pages=5))
+    calls = len(state['calls'])
+    second = list(client.fetch_pages('MN', '2024-01-01', '2024-12-31', limit=2, max_pages=5))
+
+    assert first == second
+    assert len(state['calls']) == calls
+
+    # Offline replay works with the server gone, and misses raise
+    offline = USAspendingClient(base_url="http://127.0.0.1:9", cache=ResponseCache(str(tmp_path), offline=True))
+    assert offline.fetch_awards('MN', '2024-01-01', '2024-12-31', limit=2, page=1) == first[0][1]
+    with pytest.raises(APIError):
+        offline.fetch_awards('WI', '2024-01-01', '2024-12-31', limit=2, page=1)
+
+def test_response_cache_ttl_and_lru_eviction(tmp_path):
+    """Test expired entries are dropped and LRU eviction bounds total size."""
+    import os
+    import time
+    from civicspend.ingest.cache import ResponseCache
+
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60)
+    cache.put('search', {'page': 1}, {'results': [1]})
+    path = cache._path(cache.key('search', {'page': 1}))
+    os.utime(path, (time.time(), time.time() - 120))
+    assert cache.get('search', {'page': 1}) is None
+
+    # Payload key order does not change the key
+    assert cache.key('search', {'a': 1, 'b': 2}) == cache.key('search', {'b': 2, 'a': 1})
+
+    cache = ResponseCache(str(tmp_path / 'lru'))
+    blob = {'results': [os.urandom(16).hex() for _ in range(50)]}
+    cache.put('search', {'page': 1}, blob)
+    entry_size = cache.size_bytes()
+
+    cache = ResponseCache(str(tmp_path / 'lru'), max_bytes=int(entry_size * 2.5))
+    cache.put('search', {'page': 2}, blob)
+    old = time.time() - 100
+    os.utime(cache._path(cache.key('search', {'page': 2})), (old, old))
+    assert cache.get('search', {'page': 1}) == blob
+    cache.put('search', {'page': 3}, blob)
+
+    # Page 2 was least recently used and is evicted
+    assert cache.size_bytes() <= entry_size * 2.5
+    assert cache.get('search', {'page': 2}) is None
+    assert cache.get('search', {'page': 1}) == blob
+    assert cache.get('search', {'page': 3}) == blob
+
+def test_iter_awards_streams_with_bounded_prefetch(stub_server):
+    """Test the award iterator paginates lazily with bounded prefetch."""
+    server, state = stub_server(total_pages=8, delay=0.05)
+    client = USAspendingClient(
+        base_url=f"http://127.0.0.1:{server.server_port}",
+        rate_limit=100
+    )
+    stream = client.iter_awards('MN', '2024-01-01', '2024-12-31', limit=4, prefetch=2)
+    first = next(stream)
+    calls_after_first = len(state['calls'])
+    rest = list(stream)
+
+    frames = list(client.iter_awards('MN', '2024-01-01', '2024-12-31', limit=4,
+                                     prefetch=2, as_frames=True))
+
+    assert first['award_id'] == 'AWD_2024-01-01_1_0'
+    assert first['action_date'] == '2024-01-01'
+    assert calls_after_first <= 3
+    assert state['peak'] <= 2
+    assert len(rest) == 8 * 4 - 1
+    assert len(frames) == 8
+    assert list(frames[0].columns)[0] == 'award_id'
@@ -0,0 +1,49 @@
+"""Test the robust MAD baseline detector."""
+import numpy as np
+
+from civicspend.db import connection
+
+
+def test_vectorized_detection_matches_per_vendor_loop(tmp_path, monkeypatch):
+    """Test set-based detection equals scoring each vendor separately."""
+    from civicspend.detect.baseline import RobustMADDetector
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "baseline.duckdb")
+    connection.init_database()
+
+    rng = np.random.default_rng(6)
+    rows = []
+    for v in range(300):
+        for m in range(int(rng.integers(1, 15))):
+            # Every tenth vendor has repeated values and often zero MAD
+            value = float(rng.choice([100.0, 200.0])) if v % 10 == 0 else round(float(rng.lognormal(9, 1.5)), 2)
+            rows.append(("run", f"V{v:03d}", f"2023-{m + 1:02d}", value, 1, value, value, 0))
+
+    detector = RobustMADDetector(threshold=2.5)
+    conn = detector.conn
+    conn.executemany("INSERT INTO monthly_vendor_spend VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    expected = []
+    df = conn.execute("""
+        SELECT vendor_id, year_month, CAST(obligation_sum AS DOUBLE) AS value
+        FROM monthly_vendor_spend WHERE run_id = 'run' ORDER BY vendor_id, year_month
+    """).df()
+    for vendor_id, group in df.groupby('vendor_id'):
+        if len(group) < 3:
+            continue
+        for z, row in zip(detector.compute_robust_z(group['value'].values), group.itertuples()):
+            if abs(z) > 2.5:
+                expected.append((vendor_id, row.year_month, z, row.value))
+
+    anomalies = detector.detect_run("run")
+    conn.close()
+
+    assert list(anomalies.columns) == ['vendor_id', 'year_month', 'z_score', 'severity', 'value']
+    assert list(zip(anomalies['vendor_id'], anomalies['year_month'])) == [e[:2] for e in expected]
+    np.testing.assert_allclose(anomalies['z_score'], [e[2] for e in expected], rtol=1e-9)
+    np.testing.assert_allclose(anomalies['value'], [e[3] for e in expected])
+
+    z = anomalies['z_score'].abs()
+    assert (anomalies.loc[z > 4.0, 'severity'] == 'critical').all()
+    assert (anomalies.loc[(z > 3.0) & (z <= 3.5), 'severity'] == 'medium').all()
+    assert (anomalies.loc[z <= 3.0, 'severity'] == 'low').all()
@@ -0,0 +1,70 @@
+"""Test the spending cube."""
+import numpy as np
+import pytest
+
+from civicspend.db import connection
+
+
+def test_cube_levels_match_direct_queries(tmp_path, monkeypatch):
+    """Test every grain and level equals grouping the awards directly."""
+    from civicspend.features.cube import SpendingCube
+    from civicspend.ingest.writer import RawAwardWriter
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "cube.duckdb")
+    connection.init_database()
+
+    rng = np.random.default_rng(4)
+    awards = []
+    for i in range(500):
+        awards.append({
+            "Award ID": f"CUBE_{i}", "Recipient Name": f"VENDOR {i % 9}",
+            "Awarding Agency": f"AGENCY {i % 4}",
+            "Start Date": f"{2022 + i % 2}-{rng.integers(1, 13):02d}-{rng.integers(1, 28):02d}" if i % 40 else None,
+            "Award Amount": round(float(rng.lognormal(9, 1.5)), 2),
+        })
+
+    conn = connection.get_connection()
+    writer = RawAwardWriter(conn, "run", "MN")
+    writer.add(awards)
+    writer.flush()
+    conn.execute("""
+        INSERT INTO award_vendor_map
+        SELECT run_id, award_id, 'V' || (hash(recipient_name) % 6) FROM raw_awards
+    """)
+
+    cube = SpendingCube(conn)
+    assert cube.build("run") > 0
+    assert cube.build("run") == conn.execute("SELECT COUNT(*) FROM spending_cube").fetchone()[0]
+
+    periods = {
+        'week': "strftime(date_trunc('week', ra.action_date), '%Y-%m-%d')",
+        'month': "strftime(ra.action_date, '%Y-%m')",
+        'quarter': "strftime(ra.action_date, '%Y') || '-Q' || quarter(ra.action_date)",
+        'year': "strftime(ra.action_date, '%Y')",
+        'all': "'all'",
+    }
+    columns = {'vendor': 'avm.vendor_id', 'agency': 'ra.awarding_agency_name'}
+    for grain, period in periods.items():
+        for by in [[], ['vendor'], ['agency'], ['vendor', 'agency']]:
+            select = ", ".join([f"{period} AS period"] + [columns[d] for d in by])
+            keys = ", ".join(str(i + 1) for i in range(len(by) + 1))
+            expected = conn.execute(f"""
+                SELECT {select}, CAST(SUM(ra.obligation_amount) AS DOUBLE), COUNT(*)
+                FROM raw_awards ra
+                JOIN award_vendor_map avm ON ra.run_id = avm.run_id AND ra.award_id = avm.award_id
+                WHERE ra.run_id = 'run' AND ra.action_date IS NOT NULL
+                GROUP BY {keys} ORDER BY {keys}
+            """).fetchall()
+            result = cube.query("run", grain, by=by)
+            assert [tuple(r) for r in result.itertuples(index=False)] == expected, (grain, by)
+
+    # Filters route to the level holding the filtered dimension
+    agency = cube.query("run", "quarter", agency="AGENCY 1")
+    direct = cube.query("run", "quarter", by=['agency'])
+    direct = direct[direct['agency'] == "AGENCY 1"]
+    assert list(agency['obligation_sum']) == list(direct['obligation_sum'])
+    assert cube.route('year', {'vendor'}) == ('quarter', 'vendor', "substr(period, 1, 4)")
+
+    with pytest.raises(ValueError):
+        cube.query("run", "decade")
+    conn.close()
@@ -13,3 +13,68 @@ def test_database_creation():
     assert "raw_awards" in table_names
     
     conn.close()
+
+def test_award_store_dedups_across_runs():
+    """Test overlapping runs share stored award rows through the raw_awards view."""
+    import uuid
+    from civicspend.ingest.writer import RawAwardWriter
+
+    init_database()
+    conn = get_connection()
+
+    prefix = f"DEDUP_{uuid.uuid4().hex[:8]}"
+    awards = [
+        {"Award ID": f"{prefix}_{i}", "Recipient Name": "3M COMPANY",
+         "Start Date": "2024-01-15", "Award Amount": 1000 + i}
+        for i in range(10)
+    ]
+    changed = dict(awards[0], **{"Award Amount": 99999})
+
+    run_a, run_b = str(uuid.uuid4()), str(uuid.uuid4())
+    for run_id, rows in [(run_a, awards), (run_b, [changed] + awards[1:])]:
+        writer = RawAwardWriter(conn, run_id, 'MN')
+        writer.add(rows)
+        writer.flush()
+
+    stored = conn.execute("""
+        SELECT COUNT(*) FROM award_store WHERE award_id LIKE ?
+    """, [f"{prefix}%"]).fetchone()[0]
+    amounts = dict(conn.execute("""
+        SELECT run_id, obligation_amount FROM raw_awards WHERE award_id = ?
+    """, [f"{prefix}_0"]).fetchall())
+    per_run = conn.execute("""
+        SELECT COUNT(*) FROM raw_awards WHERE run_id IN (?, ?)
+    """, [run_a, run_b]).fetchone()[0]
+    conn.close()
+
+    # 10 shared versions plus one changed version of the first award
+    assert stored == 11
+    assert per_run == 20
+    assert float(amounts[run_a]) == 1000
+    assert float(amounts[run_b]) == 99999
+
+def test_rollback_after_failed_commit(tmp_path):
+    """Test rollback is a no-op once a failed COMMIT has ended the transaction."""
+    import duckdb
+    import pytest
+    from civicspend.db.transaction import rollback
+
+    conn = duckdb.connect(str(tmp_path / "tx.duckdb"))
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+    other = conn.cursor()
+
+    conn.execute("BEGIN TRANSACTION")
+    other.execute("BEGIN TRANSACTION")
+    conn.execute("INSERT INTO t VALUES (1)")
+    other.execute("INSERT INTO t VALUES (1)")
+    conn.execute("COMMIT")
+
+    with pytest.raises(duckdb.TransactionException, match="constraint violation"):
+        try:
+            other.execute("COMMIT")
+        except Exception:
+            rollback(other)
+            raise
+
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    conn.close()
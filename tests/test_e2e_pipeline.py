@@ -3,6 +3,7 @@ import uuid
 import json
 from civicspend.db.connection import get_connection, init_database
 from civicspend.ingest.mock_data import generate_mock_awards
+from civicspend.ingest.writer import RawAwardWriter
 from civicspend.normalize.vendor_matcher import VendorMatcher
 from civicspend.features.aggregator import MonthlyAggregator
 from civicspend.detect.baseline import RobustMADDetector
@@ -21,18 +22,9 @@ def test_full_pipeline():
     """, [run_id, json.dumps({"test": "e2e"})])
     
     mock_data = generate_mock_awards(200)
-    for award in mock_data['results']:
-        conn.execute("""
-            INSERT INTO raw_awards (
-                run_id, award_id, recipient_name, recipient_duns,
-                awarding_agency_name, action_date, obligation_amount,
-                place_of_performance_state
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, [
-            run_id, award['Award ID'], award['Recipient Name'],
-            award['recipient_duns'], award['Awarding Agency'],
-            award['Start Date'], award['Award Amount'], 'MN'
-        ])
+    writer = RawAwardWriter(conn, run_id, 'MN')
+    writer.add(mock_data['results'])
+    writer.flush()
     
     print(f"[1/4] Ingested {len(mock_data['results'])} awards")
     
@@ -51,10 +43,11 @@ def test_full_pipeline():
     anomalies = detector.detect_run(run_id)
     print(f"[4/4] Detected {len(anomalies)} anomalies")
     
-    if anomalies:
+    if not anomalies.empty:
         print("\nTop Anomalies:")
-        for a in sorted(anomalies, key=lambda x: abs(x['z_score']), reverse=True)[:5]:
-            print(f"  {a['year_month']}: ${a['value']:,.2f} (z={a['z_score']:.2f}, {a['severity']})")
+        top = anomalies.loc[anomalies['z_score'].abs().sort_values(ascending=False).index[:5]]
+        for a in top.itertuples():
+            print(f"  {a.year_month}: ${a.value:,.2f} (z={a.z_score:.2f}, {a.severity})")
     
     conn.close()
     
@@ -5,6 +5,7 @@ import csv
 from pathlib import Path
 from civicspend.db.connection import get_connection, init_database
 from civicspend.ingest.mock_data import generate_mock_awards
+from civicspend.ingest.writer import RawAwardWriter
 from civicspend.normalize.vendor_matcher import VendorMatcher
 from civicspend.features.aggregator import MonthlyAggregator
 from civicspend.cli.export import export
@@ -23,18 +24,9 @@ def test_export_csv():
     """, [run_id, json.dumps({"test": "export"})])
     
     mock_data = generate_mock_awards(100)
-    for award in mock_data['results']:
-        conn.execute("""
-            INSERT INTO raw_awards (
-                run_id, award_id, recipient_name, recipient_duns,
-                awarding_agency_name, action_date, obligation_amount,
-                place_of_performance_state
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, [
-            run_id, award['Award ID'], award['Recipient Name'],
-            award['recipient_duns'], award['Awarding Agency'],
-            award['Start Date'], award['Award Amount'], 'MN'
-        ])
+    writer = RawAwardWriter(conn, run_id, 'MN')
+    writer.add(mock_data['results'])
+    writer.flush()
     
     matcher = VendorMatcher()
     matcher.normalize_run(run_id)
@@ -0,0 +1,73 @@
+"""Test feature engineering."""
+import numpy as np
+import pandas as pd
+
+from civicspend.features.engineer import FeatureEngineer
+
+
+def _reference_features(df):
+    """Features as previously computed with per-group lambdas and rolling polyfit."""
+    df['log_obligation'] = np.log1p(df['obligation_sum'])
+    df['log_award_count'] = np.log1p(df['award_count'])
+    df['log_avg_size'] = np.log1p(df['avg_award_size'])
+    df['log_rolling_3m_mean'] = np.log1p(df['rolling_3m_mean'])
+    df['log_rolling_3m_mad'] = np.log1p(df['rolling_3m_mad'])
+    df['mom_pct_change'] = df.groupby('vendor_id')['obligation_sum'].pct_change()
+    df['mom_pct_change'] = df['mom_pct_change'].fillna(0).replace([np.inf, -np.inf], 0)
+    df['month'] = pd.to_datetime(df['year_month'] + '-01').dt.month
+    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
+    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+    df['vendor_tenure'] = df.groupby('vendor_id').cumcount() + 1
+    df['deviation_from_median'] = df.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: (x - x.median()) / (x.std() + 1e-6)
+    )
+    df['cv'] = df.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: x.std() / (x.mean() + 1e-6)
+    )
+    df['size_concentration'] = df['avg_award_size'] / (df['obligation_sum'] + 1e-6)
+    df['rolling_trend'] = df.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: x.rolling(3, min_periods=1).apply(lambda y: np.polyfit(range(len(y)), y, 1)[0] if len(y) > 1 else 0)
+    )
+    df['volatility'] = df.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: x.rolling(3, min_periods=1).std()
+    ).fillna(0)
+    df['percentile_rank'] = df.groupby('vendor_id')['obligation_sum'].rank(pct=True)
+    df['z_score_vendor'] = df.groupby('vendor_id')['obligation_sum'].transform(
+        lambda x: (x - x.mean()) / (x.std() + 1e-6)
+    )
+    return df
+
+
+def _monthly_frame(n_vendors=40, seed=11):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for v in range(n_vendors):
+        months = sorted(rng.choice(36, size=rng.integers(1, 20), replace=False))
+        for m in months:
+            total = 0.0 if rng.random() < 0.05 else float(rng.lognormal(10, 1.5))
+            count = int(rng.integers(1, 9))
+            rows.append({
+                'vendor_id': f"V{v:03d}", 'year_month': f"{2021 + m // 12}-{m % 12 + 1:02d}",
+                'obligation_sum': round(total, 2), 'award_count': count,
+                'avg_award_size': round(total / count, 2),
+                'rolling_3m_mean': round(total * rng.uniform(0.5, 1.5), 2),
+                'rolling_3m_mad': round(total * rng.uniform(0, 0.5), 2),
+            })
+    return pd.DataFrame(rows).sort_values(['vendor_id', 'year_month']).reset_index(drop=True)
+
+
+def test_vectorized_features_match_reference():
+    """Test the vectorized features equal the previous implementation."""
+    engineer = FeatureEngineer()
+    engineer.conn.close()
+
+    base = _monthly_frame()
+    expected = _reference_features(base.copy())
+    result = engineer.build_features(base.copy())
+
+    for col in engineer.get_feature_columns():
+        np.testing.assert_allclose(
+            result[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+            rtol=1e-9, atol=1e-6, err_msg=col
+        )
+
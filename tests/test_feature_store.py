@@ -0,0 +1,138 @@
+"""Test the feature store."""
+import numpy as np
+import pandas as pd
+
+from civicspend.db import connection
+
+
+def _seed_monthly(conn, run_id, n_vendors=12, months=10):
+    rng = np.random.default_rng(2)
+    conn.executemany("""
+        INSERT INTO vendor_entities (vendor_id, canonical_name) VALUES (?, ?)
+    """, [(f"V{v}", f"VENDOR {v}") for v in range(n_vendors)])
+    rows = []
+    for v in range(n_vendors):
+        for m in range(months):
+            total = float(rng.lognormal(10, 1))
+            rows.append((run_id, f"V{v}", f"2023-{m + 1:02d}", total, 3, total / 3, total, total / 10))
+    conn.executemany("""
+        INSERT INTO monthly_vendor_spend VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+def test_feature_store_reuses_and_invalidates(tmp_path, monkeypatch):
+    """Test features are built once, then rebuilt when inputs or definitions change."""
+    from civicspend.detect.ml import MLDetector
+    from civicspend.features.store import FeatureStore
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "store.duckdb")
+    connection.init_database()
+
+    detector = MLDetector()
+    detector.store = FeatureStore(detector.engineer, store_dir=str(tmp_path / "features"))
+    _seed_monthly(detector.engineer.conn, "run")
+
+    calls = []
+    engineer_features = detector.engineer.engineer_features
+    monkeypatch.setattr(detector.engineer, "engineer_features",
+                        lambda run_id: calls.append(run_id) or engineer_features(run_id))
+
+    # Train then score computes features once
+    detector.train("run")
+    anomalies = detector.predict("run")
+    assert calls == ["run"]
+    assert isinstance(anomalies, list)
+
+    stored = detector.store.load("run")
+    fresh = engineer_features("run")
+    cols = detector.engineer.get_feature_columns()
+    np.testing.assert_allclose(stored[cols].to_numpy(float), fresh[cols].to_numpy(float))
+    assert list(stored['vendor_id']) == list(fresh['vendor_id'])
+
+    # Changed inputs rebuild
+    detector.engineer.conn.execute("""
+        UPDATE monthly_vendor_spend SET obligation_sum = obligation_sum + 1
+        WHERE vendor_id = 'V0' AND year_month = '2023-05'
+    """)
+    detector.store.load("run")
+    assert calls == ["run", "run"]
+
+    # Changed feature definitions rebuild and replace the old file
+    old_path = detector.store.path("run")
+    detector.store.version = "changed"
+    detector.store.load("run")
+    assert calls == ["run", "run", "run"]
+    assert not old_path.exists()
+    assert detector.store.path("run").exists()
+
+    detector.engineer.conn.close()
+
+
+def test_feature_store_refresh_matches_full_build(tmp_path, monkeypatch):
+    """Test refreshing changed vendors yields the same features as a full build."""
+    from civicspend.features.engineer import FeatureEngineer
+    from civicspend.features.store import FeatureStore
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "refresh.duckdb")
+    connection.init_database()
+
+    engineer = FeatureEngineer()
+    store = FeatureStore(engineer, store_dir=str(tmp_path / "features"))
+    _seed_monthly(engineer.conn, "base")
+    store.materialize("base")
+
+    engineer.conn.execute("""
+        INSERT INTO monthly_vendor_spend
+        SELECT 'next', * EXCLUDE (run_id) FROM monthly_vendor_spend WHERE run_id = 'base'
+    """)
+    engineer.conn.execute("""
+        UPDATE monthly_vendor_spend SET obligation_sum = obligation_sum * 4
+        WHERE run_id = 'next' AND vendor_id = 'V3' AND year_month = '2023-06'
+    """)
+    engineer.conn.execute("""
+        INSERT INTO monthly_vendor_spend VALUES ('next', 'V7', '2023-11', 500, 1, 500, 500, 0)
+    """)
+
+    calls = []
+    engineer_features = engineer.engineer_features
+    monkeypatch.setattr(engineer, "engineer_features",
+                        lambda run_id, vendor_ids=None: calls.append(vendor_ids)
+                        or engineer_features(run_id, vendor_ids))
+
+    refreshed = store.refresh("next", ["V3", "V7"], base_run_id="base")
+    assert calls == [["V3", "V7"]]
+    assert store.is_current("next")
+
+    full = engineer_features("next")
+    cols = engineer.get_feature_columns()
+    assert list(refreshed['vendor_id']) == list(full['vendor_id'])
+    assert list(refreshed['year_month']) == list(full['year_month'])
+    np.testing.assert_allclose(refreshed[cols].to_numpy(float), full[cols].to_numpy(float))
+    np.testing.assert_allclose(store.load("next")[cols].to_numpy(float), full[cols].to_numpy(float))
+    assert len(calls) == 1
+
+    engineer.conn.close()
+
+
+def test_partitioned_features_match_in_memory(tmp_path, monkeypatch):
+    """Test out-of-core partitioned builds store the same features as one frame."""
+    from civicspend.features.engineer import FeatureEngineer
+    from civicspend.features.store import FeatureStore
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "parts.duckdb")
+    connection.init_database()
+
+    engineer = FeatureEngineer()
+    _seed_monthly(engineer.conn, "run", n_vendors=30)
+    expected = engineer.engineer_features("run")
+    cols = ['vendor_id', 'year_month'] + engineer.get_feature_columns()
+
+    # Serial, more partitions than vendors, and on a process pool
+    for partitions, workers in [(4, 1), (64, 1), (3, 2)]:
+        store = FeatureStore(engineer, store_dir=str(tmp_path / f"features_{partitions}"))
+        assert store.materialize_partitioned("run", partitions, workers) == len(expected)
+        assert store.is_current("run")
+        assert not list(store.path("run").parent.glob("*.parts"))
+        pd.testing.assert_frame_equal(store.load("run")[cols], expected[cols], check_dtype=False)
+
+    engineer.conn.close()
@@ -0,0 +1,147 @@
+"""Test incremental (delta) ingestion."""
+import json
+import uuid
+from datetime import date
+from click.testing import CliRunner
+from civicspend.config import config
+from civicspend.db.connection import get_connection, init_database
+from civicspend.cli.ingest import ingest
+from civicspend.ingest.coverage import missing_ranges
+
+def test_missing_ranges():
+    """Test gaps are computed against merged coverage."""
+    d = date.fromisoformat
+    covered = [(d('2024-01-01'), d('2024-03-31')), (d('2024-04-01'), d('2024-04-30')),
+               (d('2024-07-01'), d('2024-08-31'))]
+
+    assert missing_ranges(covered, d('2024-01-01'), d('2024-04-30')) == []
+    assert missing_ranges(covered, d('2024-02-01'), d('2024-09-30')) == [
+        (d('2024-05-01'), d('2024-06-30')),
+        (d('2024-09-01'), d('2024-09-30')),
+    ]
+    assert missing_ranges([], d('2024-01-01'), d('2024-01-31')) == [(d('2024-01-01'), d('2024-01-31'))]
+
+def test_incremental_fetches_only_missing_range(monkeypatch, stub_server):
+    """Test a delta run fetches uncovered dates and reuses earlier awards."""
+    init_database()
+    state_code = f"T{uuid.uuid4().hex[:6]}"
+    server, stub = stub_server(total_pages=2, delay=0.0)
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 50
+    })
+
+    runner = CliRunner()
+    first = runner.invoke(ingest, [
+        '--state', state_code, '--start-date', '2024-01-01', '--end-date', '2024-06-30',
+        '--limit', '5', '--workers', '1'
+    ])
+    assert first.exit_code == 0, first.output
+    base_run_id = first.output.split("Starting ingestion run: ")[1].split()[0]
+
+    calls_before = len(stub['bodies'])
+    delta = runner.invoke(ingest, [
+        '--state', state_code, '--start-date', '2024-01-01', '--end-date', '2024-09-30',
+        '--limit', '5', '--workers', '1', '--incremental'
+    ])
+    assert delta.exit_code == 0, delta.output
+    run_id = delta.output.split("Starting ingestion run: ")[1].split()[0]
+
+    noop = runner.invoke(ingest, [
+        '--state', state_code, '--start-date', '2024-01-01', '--end-date', '2024-06-30',
+        '--incremental'
+    ])
+    assert noop.exit_code == 0
+    assert "already covered" in noop.output
+
+    periods = {b['filters']['time_period'][0]['start_date'] for b in stub['bodies'][calls_before:]}
+    assert periods == {'2024-07-01'}
+
+    conn = get_connection()
+    filters = json.loads(conn.execute("""
+        SELECT filters_json FROM run_manifest WHERE run_id = ?
+    """, [run_id]).fetchone()[0])
+    counts = dict(conn.execute("""
+        SELECT strftime(action_date, '%Y-%m'), COUNT(*) FROM raw_awards
+        WHERE run_id = ? GROUP BY 1
+    """, [run_id]).fetchall())
+    conn.close()
+
+    # 10 freshly fetched awards plus the 10 from the base run
+    assert counts == {'2024-07': 10, '2024-01': 10}
+    assert filters['fetch_ranges'] == [['2024-07-01', '2024-09-30']]
+    assert filters['base_run_ids'] == [base_run_id]
+
+def test_incremental_refetches_range_cut_at_page_cap(monkeypatch, stub_server):
+    """Test a run stopped by --max-pages does not count as coverage."""
+    init_database()
+    state_code = f"P{uuid.uuid4().hex[:6]}"
+    server, stub = stub_server(total_pages=3, delay=0.0)
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 50
+    })
+
+    args = ['--state', state_code, '--start-date', '2024-01-01', '--end-date', '2024-03-31',
+            '--limit', '5', '--workers', '1']
+    runner = CliRunner()
+    capped = runner.invoke(ingest, args + ['--max-pages', '2'])
+    assert capped.exit_code == 0, capped.output
+    assert "more pages remain" in capped.output
+
+    full = runner.invoke(ingest, args + ['--max-pages', '10', '--incremental'])
+    assert full.exit_code == 0, full.output
+    assert "Starting ingestion run" in full.output
+
+    noop = runner.invoke(ingest, args + ['--incremental'])
+    assert "already covered" in noop.output
+
+    run_id = full.output.split("Starting ingestion run: ")[1].split()[0]
+    conn = get_connection()
+    filters = json.loads(conn.execute("""
+        SELECT filters_json FROM run_manifest WHERE run_id = ?
+    """, [run_id]).fetchone()[0])
+    stored = conn.execute("SELECT COUNT(*) FROM raw_awards WHERE run_id = ?", [run_id]).fetchone()[0]
+    conn.close()
+
+    assert filters['fetch_ranges'] == [['2024-01-01', '2024-03-31']]
+    assert filters['exhausted_ranges'] == [['2024-01-01', '2024-03-31']]
+    assert stored == 15
+
+def test_incremental_matches_full_run_for_awards_started_earlier(monkeypatch, tmp_path, stub_server):
+    """Test reused awards are picked by run, not by their Start Date."""
+    from civicspend.db import connection
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "incremental.duckdb")
+    init_database()
+
+    server, _ = stub_server(delay=0.0, monthly_awards=3)
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 50
+    })
+
+    runner = CliRunner()
+    args = ['--state', 'MN', '--limit', '5', '--max-pages', '10', '--workers', '1', '--no-cache']
+    base = runner.invoke(ingest, args + ['--start-date', '2024-01-01', '--end-date', '2024-03-31'])
+    assert base.exit_code == 0, base.output
+
+    window = ['--start-date', '2024-01-01', '--end-date', '2024-06-30']
+    delta = runner.invoke(ingest, args + window + ['--incremental'])
+    assert delta.exit_code == 0, delta.output
+    assert "Reused 9 awards" in delta.output
+    full = runner.invoke(ingest, args + window)
+    assert full.exit_code == 0, full.output
+
+    def award_ids(result):
+        run_id = result.output.split("Starting ingestion run: ")[1].split()[0]
+        conn = get_connection()
+        rows = conn.execute("SELECT award_id FROM raw_awards WHERE run_id = ?", [run_id]).fetchall()
+        conn.close()
+        return {row[0] for row in rows}
+
+    # Every award started in 2023, outside the windows that fetched it
+    assert award_ids(delta) == award_ids(full)
+    assert len(award_ids(full)) == 6 * 3
@@ -0,0 +1,91 @@
+"""Test fan-out ingestion over states and date shards."""
+import json
+import uuid
+from datetime import date
+from click.testing import CliRunner
+from civicspend.config import config
+from civicspend.db.connection import get_connection, init_database
+from civicspend.cli.ingest_fanout import ingest_fanout
+from civicspend.ingest.coverage import split_range
+
+def test_split_range_months():
+    """Test shards align to calendar months."""
+    shards = split_range(date(2023, 12, 15), date(2024, 2, 10), 'month')
+    assert shards == [
+        (date(2023, 12, 15), date(2023, 12, 31)),
+        (date(2024, 1, 1), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 10)),
+    ]
+    assert len(split_range(date(2024, 1, 1), date(2024, 12, 31), 'quarter')) == 4
+
+def test_fanout_shares_rate_limit_and_retries_failed_shards(monkeypatch, stub_server):
+    """Test shards run in parallel under one rate budget and retry alone."""
+    init_database()
+    states = [f"F{uuid.uuid4().hex[:5]}", f"G{uuid.uuid4().hex[:5]}"]
+    server, stub = stub_server(total_pages=2, delay=0.02, fail_once=(1,))
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 20,
+        'max_retries': 1
+    })
+
+    runner = CliRunner()
+    first = runner.invoke(ingest_fanout, [
+        '--states', ','.join(states), '--start-date', '2024-01-01', '--end-date', '2024-03-31',
+        '--shard', 'month', '--workers', '4', '--limit', '5'
+    ])
+    assert first.exit_code != 0
+    fanout_id = first.output.split("Starting fan-out ")[1].split(":")[0]
+    assert "5 shard(s) completed, 1 failed" in first.output
+
+    retry = runner.invoke(ingest_fanout, ['--retry', fanout_id, '--limit', '5'])
+    assert retry.exit_code == 0, retry.output
+    assert "Retrying 1 unfinished shard(s)" in retry.output
+
+    # Combined request rate across all workers stays within the budget
+    elapsed = stub['times'][-1] - stub['times'][0]
+    assert (len(stub['times']) - 1) / elapsed <= 20 * 1.1
+
+    conn = get_connection()
+    rows = conn.execute("""
+        SELECT filters_json, status, row_count_raw FROM run_manifest
+        WHERE filters_json LIKE ?
+    """, [f'%{fanout_id}%']).fetchall()
+    conn.close()
+
+    assert len(rows) == 6
+    assert {r[1] for r in rows} == {'completed'}
+    assert {r[2] for r in rows} == {10}
+    assert {json.loads(r[0])['start_date'] for r in rows} == {'2024-01-01', '2024-02-01', '2024-03-01'}
+
+def test_fanout_shards_with_overlapping_awards(monkeypatch, tmp_path, stub_server):
+    """Test shards that fetch the same awards all commit."""
+    from civicspend.db import connection
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "fanout.duckdb")
+    init_database()
+
+    server, _ = stub_server(total_pages=3, delay=0.01, shared_awards=True)
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 200,
+        'max_retries': 1
+    })
+
+    result = CliRunner().invoke(ingest_fanout, [
+        '--states', 'MN,WI', '--start-date', '2024-01-01', '--end-date', '2024-03-31',
+        '--shard', 'month', '--workers', '6', '--limit', '20', '--batch-rows', '20', '--no-cache'
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert "6 shard(s) completed, 0 failed" in result.output
+
+    conn = get_connection()
+    stored = conn.execute("SELECT COUNT(*) FROM award_store").fetchone()[0]
+    per_run = conn.execute("SELECT run_id, COUNT(*) FROM run_awards GROUP BY run_id").fetchall()
+    conn.close()
+
+    # One stored version per state, shared by that state's three shards
+    assert stored == 2 * 60
+    assert sorted(count for _, count in per_run) == [60] * 6
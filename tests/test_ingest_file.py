@@ -0,0 +1,102 @@
+"""Test bulk-download file ingestion."""
+import csv
+import zipfile
+from click.testing import CliRunner
+from civicspend.db.connection import get_connection, init_database
+from civicspend.cli.ingest_file import ingest_file
+
+HEADER = [
+    'contract_transaction_unique_key', 'contract_award_unique_key', 'recipient_name',
+    'recipient_uei', 'awarding_agency_name', 'action_date', 'federal_action_obligation',
+    'primary_place_of_performance_state_code'
+]
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+def test_ingest_bulk_csv_and_zip(tmp_path):
+    """Test CSV and zipped CSV files load into raw_awards."""
+    init_database()
+
+    _write_csv(tmp_path / 'part1.csv', [
+        ['T1', 'A1', '3M COMPANY', 'UEI1', 'Department of Defense', '2024-01-15', '1000.50', 'MN'],
+        ['T2', 'A1', '3M COMPANY', 'UEI1', 'Department of Defense', '2024-02-15', '-200', 'MN'],
+        ['T3', 'A2', 'ECOLAB INC', 'UEI2', 'Department of Energy', '2024-02-20', '5000', 'WI'],
+    ])
+    _write_csv(tmp_path / 'part2.csv', [
+        ['T4', 'A3', 'TARGET CORP', 'UEI3', 'Department of Agriculture', '2024-03-01', '', 'MN'],
+        ['T1', 'A1', '3M COMPANY', 'UEI1', 'Department of Defense', '2024-01-15', '1000.50', 'MN'],
+    ])
+    with zipfile.ZipFile(tmp_path / 'download.zip', 'w') as archive:
+        archive.write(tmp_path / 'part2.csv', 'Contracts_PrimeTransactions_2.csv')
+
+    runner = CliRunner()
+    result = runner.invoke(ingest_file, [
+        str(tmp_path / 'part1.csv'), str(tmp_path / 'download.zip'), '--state', 'MN'
+    ])
+    assert result.exit_code == 0, result.output
+    run_id = result.output.split("Starting file ingestion run: ")[1].split()[0]
+
+    conn = get_connection()
+    rows = conn.execute("""
+        SELECT award_id, recipient_name, recipient_duns, action_date,
+               obligation_amount, place_of_performance_state
+        FROM raw_awards WHERE run_id = ? ORDER BY award_id
+    """, [run_id]).fetchall()
+    status, row_count = conn.execute("""
+        SELECT status, row_count_raw FROM run_manifest WHERE run_id = ?
+    """, [run_id]).fetchone()
+    conn.close()
+
+    assert [r[0] for r in rows] == ['T1', 'T2', 'T4']
+    assert rows[0][1] == '3M COMPANY'
+    assert rows[0][2] == 'UEI1'
+    assert str(rows[0][3]) == '2024-01-15'
+    assert float(rows[1][4]) == -200
+    assert float(rows[2][4]) == 0
+    assert {r[5] for r in rows} == {'MN'}
+    assert status == 'completed'
+    assert row_count == 3
+
+def test_ingest_mixed_contract_and_assistance_archives(tmp_path):
+    """Test contract and assistance files with different headers load together."""
+    init_database()
+
+    _write_csv(tmp_path / 'contracts.csv', [
+        ['MIX_C1', 'MIX_A1', '3M COMPANY', 'UEI1', 'Department of Defense', '2024-01-15', '1000', 'MN'],
+    ])
+    with open(tmp_path / 'assistance.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            'assistance_transaction_unique_key', 'recipient_name', 'recipient_uei',
+            'awarding_agency_name', 'action_date', 'federal_action_obligation',
+            'primary_place_of_performance_state_code'
+        ])
+        writer.writerow(['MIX_F1', 'UNIVERSITY OF MINNESOTA', 'UEI9', 'National Science Foundation',
+                         '2024-02-01', '2500', 'MN'])
+
+    # Two downloads with the same member name
+    for name in ['contracts', 'assistance']:
+        with zipfile.ZipFile(tmp_path / f'{name}.zip', 'w') as archive:
+            archive.write(tmp_path / f'{name}.csv', 'download_1.csv')
+
+    result = CliRunner().invoke(ingest_file, [
+        str(tmp_path / 'contracts.zip'), str(tmp_path / 'assistance.zip')
+    ])
+    assert result.exit_code == 0, result.output
+    run_id = result.output.split("Starting file ingestion run: ")[1].split()[0]
+
+    conn = get_connection()
+    rows = conn.execute("""
+        SELECT award_id, recipient_name, obligation_amount
+        FROM raw_awards WHERE run_id = ? ORDER BY award_id
+    """, [run_id]).fetchall()
+    conn.close()
+
+    assert [(r[0], r[1], float(r[2])) for r in rows] == [
+        ('MIX_C1', '3M COMPANY', 1000),
+        ('MIX_F1', 'UNIVERSITY OF MINNESOTA', 2500),
+    ]
@@ -0,0 +1,47 @@
+"""Test the segmented rolling kernels."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from civicspend.features import kernels
+
+
+def _series(seed=3):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 9, size=50)
+    values = rng.lognormal(8, 1.5, size=lengths.sum())
+    values[rng.random(len(values)) < 0.1] = 0.0
+    keys = np.repeat(np.arange(len(lengths)), lengths)
+    return values, keys, kernels.group_offsets(keys)
+
+
+def test_rolling_std_matches_pandas():
+    """Test the rolling std against per-group pandas rolling windows."""
+    values, keys, offsets = _series()
+    expected = pd.Series(values).groupby(keys).rolling(3, min_periods=1).std()
+    np.testing.assert_allclose(kernels.rolling_std(values, offsets, 3), expected.to_numpy(), rtol=1e-9)
+
+
+def test_rolling_slope_matches_polyfit():
+    """Test the closed-form rolling slope on windows of every length."""
+    values = np.array([5.0, 1.0, 4.0, 10.0, 2.0, 7.0, 7.0])
+    offsets = np.array([0, 4, 7])
+
+    expected = []
+    for i in range(len(values)):
+        start = 0 if i < 4 else 4
+        window = values[max(i - 4, start):i + 1]
+        expected.append(np.polyfit(range(len(window)), window, 1)[0] if len(window) > 1 else 0)
+
+    np.testing.assert_allclose(kernels.rolling_slope(values, offsets, 5), expected, atol=1e-9)
+    assert len(kernels.rolling_slope(np.empty(0), np.array([0]), 3)) == 0
+
+
+@pytest.mark.skipif(not kernels.HAVE_NUMBA, reason="numba not installed")
+def test_compiled_kernels_match_numpy_fallback():
+    """Test the numba kernels against the NumPy fallback."""
+    values, _, offsets = _series(seed=9)
+    for name in ['std', 'slope']:
+        compiled = getattr(kernels, f"_rolling_{name}_jit")(values, offsets, 3)
+        fallback = getattr(kernels, f"_rolling_{name}_numpy")(values, offsets, 3)
+        np.testing.assert_allclose(compiled, fallback, rtol=1e-9, err_msg=name)
@@ -3,6 +3,7 @@ import uuid
 import json
 from civicspend.db.connection import get_connection, init_database
 from civicspend.ingest.mock_data import generate_mock_awards
+from civicspend.ingest.writer import RawAwardWriter
 from civicspend.normalize.vendor_matcher import VendorMatcher
 from civicspend.features.aggregator import MonthlyAggregator
 from civicspend.detect.baseline import RobustMADDetector
@@ -22,18 +23,9 @@ def test_ml_with_evidence():
     """, [run_id, json.dumps({"test": "ml_evidence"})])
     
     mock_data = generate_mock_awards(300)
-    for award in mock_data['results']:
-        conn.execute("""
-            INSERT INTO raw_awards (
-                run_id, award_id, recipient_name, recipient_duns,
-                awarding_agency_name, action_date, obligation_amount,
-                place_of_performance_state
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, [
-            run_id, award['Award ID'], award['Recipient Name'],
-            award['recipient_duns'], award['Awarding Agency'],
-            award['Start Date'], award['Award Amount'], 'MN'
-        ])
+    writer = RawAwardWriter(conn, run_id, 'MN')
+    writer.add(mock_data['results'])
+    writer.flush()
     
     print(f"[1/6] Ingested {len(mock_data['results'])} awards")
     
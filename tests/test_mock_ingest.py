@@ -3,6 +3,7 @@ import uuid
 import json
 from civicspend.db.connection import get_connection
 from civicspend.ingest.mock_data import generate_mock_awards
+from civicspend.ingest.writer import RawAwardWriter
 
 def test_ingest_mock_data():
     """Test ingestion with mock data."""
@@ -18,23 +19,9 @@ def test_ingest_mock_data():
     # Generate and insert mock data
     mock_data = generate_mock_awards(100)
     
-    for award in mock_data['results']:
-        conn.execute("""
-            INSERT INTO raw_awards (
-                run_id, award_id, recipient_name, recipient_duns,
-                awarding_agency_name, action_date, obligation_amount,
-                place_of_performance_state
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, [
-            run_id,
-            award['Award ID'],
-            award['Recipient Name'],
-            award['recipient_duns'],
-            award['Awarding Agency'],
-            award['Start Date'],
-            award['Award Amount'],
-            'MN'
-        ])
+    writer = RawAwardWriter(conn, run_id, 'MN')
+    writer.add(mock_data['results'])
+    writer.flush()
     
     # Update manifest
     conn.execute("""
@@ -70,5 +57,111 @@ def test_ingest_mock_data():
     conn.close()
     return run_id
 
+def test_bulk_writer_dedup():
+    """Test bulk writer keeps (run_id, award_id) dedup semantics."""
+    from civicspend.db.connection import init_database
+    from civicspend.ingest.writer import RawAwardWriter
+
+    init_database()
+    run_id = str(uuid.uuid4())
+    conn = get_connection()
+
+    mock_data = generate_mock_awards(250)
+    writer = RawAwardWriter(conn, run_id, 'MN', batch_rows=100)
+
+    # Feed the same pages twice plus an award without optional fields
+    for _ in range(2):
+        for start in range(0, 250, 50):
+            writer.add(mock_data['results'][start:start + 50])
+    writer.add([{"Award ID": "CONT_AWD_MN_SPARSE"}])
+    writer.flush()
+
+    count, total = conn.execute("""
+        SELECT COUNT(*), SUM(obligation_amount) FROM raw_awards WHERE run_id = ?
+    """, [run_id]).fetchone()
+    expected = sum(round(a['Award Amount'], 2) for a in mock_data['results'])
+
+    sparse = conn.execute("""
+        SELECT obligation_amount, place_of_performance_state
+        FROM raw_awards WHERE run_id = ? AND award_id = 'CONT_AWD_MN_SPARSE'
+    """, [run_id]).fetchone()
+    conn.close()
+
+    assert count == 251
+    assert abs(float(total) - expected) < 0.01
+    assert float(sparse[0]) == 0
+    assert sparse[1] == 'MN'
+
+def test_synthetic_generator(tmp_path):
+    """Test synthetic generator is reproducible and injects labelled anomalies."""
+    from civicspend.ingest.mock_data import SyntheticAwardGenerator
+
+    params = dict(n_vendors=50, n_agencies=5, months=12, anomaly_rate=0.05, seed=7)
+    df = SyntheticAwardGenerator(**params).generate(20000)
+    again = SyntheticAwardGenerator(**params).generate(20000)
+    labels = SyntheticAwardGenerator(**params).labels()
+
+    assert df.equals(again)
+    assert df['recipient_name'].nunique() <= 50
+    assert df['awarding_agency_name'].nunique() <= 5
+    assert df['award_id'].is_unique
+    assert len(labels) == 30
+
+    # Injected vendor-months carry more spend than the vendor's typical month
+    df['year_month'] = df['action_date'].dt.strftime('%Y-%m')
+    monthly = df.groupby(['recipient_name', 'year_month'])['obligation_amount'].sum()
+    medians = monthly.groupby(level=0).median()
+    lifted = [
+        monthly.get((row.recipient_name, row.year_month), 0) > medians[row.recipient_name]
+        for row in labels.itertuples()
+    ]
+    assert sum(lifted) / len(lifted) > 0.8
+
+    # Parquet output and raw_awards output
+    from civicspend.db.connection import init_database
+    init_database()
+    conn = get_connection()
+    generator = SyntheticAwardGenerator(**params)
+    # A quote in the output path must not break the COPY statement
+    out_dir = tmp_path / "o'synthetic"
+    generator.write_parquet(conn, str(out_dir), 5000, chunk_rows=2000)
+    parquet_rows = conn.execute(
+        "SELECT COUNT(*) FROM read_parquet(?)", [str(out_dir / 'part-*.parquet')]
+    ).fetchone()[0]
+
+    run_id = str(uuid.uuid4())
+    generator.write_raw_awards(conn, run_id, 5000, chunk_rows=2000)
+    stored = conn.execute("SELECT COUNT(*) FROM raw_awards WHERE run_id = ?", [run_id]).fetchone()[0]
+    conn.close()
+
+    assert parquet_rows == 5000
+    assert stored == 5000
+
+def test_synthetic_vendors_survive_normalization(tmp_path, monkeypatch):
+    """Test synthetic vendor names stay distinct vendors after fuzzy matching."""
+    from civicspend.db import connection
+    from civicspend.ingest.mock_data import SyntheticAwardGenerator
+    from civicspend.normalize.vendor_matcher import VendorMatcher
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "synthetic.duckdb")
+    connection.init_database()
+
+    generator = SyntheticAwardGenerator(n_vendors=200, n_agencies=5, months=6, seed=11)
+    matcher = VendorMatcher()
+    generator.write_raw_awards(matcher.conn, "run", 20000)
+    names = matcher.conn.execute("""
+        SELECT COUNT(DISTINCT recipient_name) FROM raw_awards WHERE run_id = 'run'
+    """).fetchone()[0]
+
+    matcher.normalize_run_batch("run", workers=1)
+    vendors = matcher.conn.execute("""
+        SELECT COUNT(DISTINCT vendor_id) FROM award_vendor_map WHERE run_id = 'run'
+    """).fetchone()[0]
+    matcher.conn.close()
+
+    assert len(set(generator.vendor_duns)) == 200
+    assert names > 150
+    assert vendors == names
+
 if __name__ == "__main__":
     test_ingest_mock_data()
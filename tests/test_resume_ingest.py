@@ -0,0 +1,122 @@
+"""Test resumable ingestion runs."""
+from click.testing import CliRunner
+from civicspend.config import config
+from civicspend.db.connection import get_connection, init_database
+from civicspend.cli.ingest import ingest
+
+def test_resume_from_checkpoint(monkeypatch, stub_server):
+    """Test a failed run resumes after its last committed page."""
+    init_database()
+    server, state = stub_server(total_pages=6, delay=0.0, fail_once=(4,))
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 50,
+        'max_retries': 1
+    })
+
+    runner = CliRunner()
+    first = runner.invoke(ingest, [
+        '--state', 'MN', '--start-date', '2024-01-01', '--end-date', '2024-12-31',
+        '--limit', '10', '--max-pages', '10', '--workers', '1', '--batch-rows', '10'
+    ])
+    assert first.exit_code != 0
+
+    run_id = first.output.split("Starting ingestion run: ")[1].split()[0]
+
+    conn = get_connection()
+    status = conn.execute("""
+        SELECT status FROM run_manifest WHERE run_id = ?
+    """, [run_id]).fetchone()[0]
+    last_page = conn.execute("""
+        SELECT last_page FROM ingest_checkpoints WHERE run_id = ?
+    """, [run_id]).fetchone()[0]
+    conn.close()
+
+    assert status == 'failed'
+    assert last_page == 3
+
+    calls_before = len(state['calls'])
+    second = runner.invoke(ingest, ['--resume', run_id, '--max-pages', '10', '--workers', '1'])
+    assert second.exit_code == 0, second.output
+
+    # Only the remaining pages were requested again
+    assert sorted(set(state['calls'][calls_before:])) == [4, 5, 6]
+
+    conn = get_connection()
+    status, row_count = conn.execute("""
+        SELECT status, row_count_raw FROM run_manifest WHERE run_id = ?
+    """, [run_id]).fetchone()
+    stored = conn.execute("SELECT COUNT(*) FROM raw_awards WHERE run_id = ?", [run_id]).fetchone()[0]
+    conn.close()
+
+    assert status == 'completed'
+    assert stored == 60
+    assert row_count == 60
+
+def test_resume_stops_at_original_page_cap(monkeypatch, stub_server):
+    """Test a resumed run does not fetch past the cap of the original run."""
+    init_database()
+    server, state = stub_server(total_pages=20, delay=0.0, fail_once=(4,))
+    monkeypatch.setitem(config._config, 'api', {
+        **config.get('api', {}),
+        'base_url': f"http://127.0.0.1:{server.server_port}",
+        'rate_limit': 50,
+        'max_retries': 1
+    })
+
+    runner = CliRunner()
+    first = runner.invoke(ingest, [
+        '--state', 'MN', '--start-date', '2023-01-01', '--end-date', '2023-12-31',
+        '--limit', '10', '--max-pages', '5', '--workers', '1', '--batch-rows', '10'
+    ])
+    assert first.exit_code != 0
+    run_id = first.output.split("Starting ingestion run: ")[1].split()[0]
+
+    calls_before = len(state['calls'])
+    second = runner.invoke(ingest, ['--resume', run_id, '--max-pages', '5', '--workers', '1'])
+    assert second.exit_code == 0, second.output
+
+    assert sorted(set(state['calls'][calls_before:])) == [4, 5]
+
+    conn = get_connection()
+    page_cap = conn.execute("""
+        SELECT page_cap FROM ingest_checkpoints WHERE run_id = ?
+    """, [run_id]).fetchone()[0]
+    stored = conn.execute("SELECT COUNT(*) FROM raw_awards WHERE run_id = ?", [run_id]).fetchone()[0]
+    conn.close()
+
+    assert page_cap == 5
+    assert stored == 50
+
+def test_killed_run_resumes_at_next_page(monkeypatch, tmp_path):
+    """Test a run killed between batch flushes still checkpoints every page."""
+    from civicspend.db import connection
+    from civicspend.ingest.runner import create_run, ingest_ranges, load_resume_state
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "killed.duckdb")
+    init_database()
+
+    class KilledClient:
+        """Serves three pages, then dies the way a killed process would."""
+        def fetch_pages(self, state, start, end, limit, max_pages, start_page=1):
+            for page in range(start_page, start_page + 3):
+                yield page, {'results': [{'Award ID': f'AWD_{page}_{i}', 'Start Date': start}
+                                         for i in range(limit)]}
+            raise KeyboardInterrupt
+
+    filters = {'state': 'MN', 'start_date': '2024-01-01', 'end_date': '2024-12-31'}
+    conn = get_connection()
+    run_id = create_run(conn, filters)
+    try:
+        ingest_ranges(conn, KilledClient(), run_id, filters, [('2024-01-01', '2024-12-31')],
+                      limit=10, max_pages=10, batch_rows=1000)
+    except KeyboardInterrupt:
+        pass
+    stored = conn.execute("SELECT COUNT(*) FROM raw_awards WHERE run_id = ?", [run_id]).fetchone()[0]
+    resume = load_resume_state(conn, run_id)
+    conn.close()
+
+    # Nothing ran the failure handler, yet every fetched page was committed
+    assert stored == 30
+    assert resume['start_page'] == 4
+    assert resume['max_pages'] == 7
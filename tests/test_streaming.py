@@ -0,0 +1,120 @@
+"""Test online scoring with per-vendor quantile sketches."""
+import numpy as np
+
+from civicspend.db import connection
+
+
+def _seed(conn, rng, n_vendors=60, months=30):
+    rows = []
+    for v in range(n_vendors):
+        length = months if v % 6 else int(rng.integers(2, 6))  # some short histories
+        for m in range(months - length, months):
+            value = float(rng.lognormal(10, 0.4))
+            if v % 10 == 1 and m == months - 1:
+                value *= 40  # spike in the newest month
+            rows.append(("run", f"V{v:03d}", f"{2022 + m // 12}-{m % 12 + 1:02d}", round(value, 2), 1, value, value, 0))
+    conn.executemany("INSERT INTO monthly_vendor_spend VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def test_streaming_scores_newest_month(tmp_path, monkeypatch):
+    """Test cold start plus online scoring flags spikes and folds each month in once."""
+    from civicspend.detect.streaming import StreamingMADDetector
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "stream.duckdb")
+    connection.init_database()
+
+    detector = StreamingMADDetector(threshold=3.5)
+    conn = detector.conn
+    _seed(conn, np.random.default_rng(12))
+
+    assert detector.cold_start("run", through_month="2024-05") == 60
+
+    # Scoring without updating leaves the state alone
+    preview = detector.score_run("run", update=False)
+    anomalies = detector.score_run("run")
+    assert preview.equals(anomalies)
+    assert set(anomalies['year_month']) == {"2024-06"}
+    assert {f"V{v:03d}" for v in range(1, 60, 10)} <= set(anomalies['vendor_id'])
+    assert (anomalies.loc[anomalies['vendor_id'] == "V001", 'severity'] == 'critical').all()
+
+    # Each month is folded in once
+    assert detector.score_run("run").empty
+    observations, last_month = conn.execute("""
+        SELECT observations, last_month FROM vendor_sketches WHERE vendor_id = 'V001'
+    """).fetchone()
+    assert (observations, last_month) == (30, "2024-06")
+
+    # Short histories are scored exactly against the months before
+    strict = StreamingMADDetector(threshold=0, min_months=1)
+    strict.conn.close()
+    strict.conn = conn
+    conn.execute("DELETE FROM vendor_sketches")
+    strict.cold_start("run", through_month="2024-05")
+    scored = strict.score_run("run", update=False).set_index('vendor_id')
+    short = conn.execute("""
+        SELECT vendor_id, list(CAST(obligation_sum AS DOUBLE) ORDER BY year_month) AS values
+        FROM monthly_vendor_spend WHERE vendor_id IN ('V000', 'V006', 'V012') GROUP BY vendor_id
+    """).fetchall()
+    for vendor_id, values in short:
+        history, newest = np.array(values[:-1]), values[-1]
+        median = np.median(history)
+        mad = np.median(np.abs(history - median))
+        if mad > 0:
+            assert np.isclose(scored.loc[vendor_id, 'z_score'], 0.6745 * (newest - median) / mad)
+    conn.close()
+
+
+def test_sketches_track_median_online(tmp_path, monkeypatch):
+    """Test sketches folded month by month stay close to exact medians."""
+    from civicspend.detect.streaming import StreamingMADDetector
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "online.duckdb")
+    connection.init_database()
+
+    detector = StreamingMADDetector()
+    conn = detector.conn
+    _seed(conn, np.random.default_rng(4), months=48)
+
+    # Start from nothing and fold all months in online
+    detector.score_run("run")
+    state = conn.execute("""
+        SELECT s.vendor_id, s.median_heights[3] AS median, s.mad_heights[3] AS mad,
+               MEDIAN(CAST(m.obligation_sum AS DOUBLE)) AS exact
+        FROM vendor_sketches s JOIN monthly_vendor_spend m USING (vendor_id)
+        WHERE s.observations >= 20
+        GROUP BY ALL
+    """).df()
+    conn.close()
+
+    assert len(state) == 50
+    assert np.median(np.abs(state['median'] / state['exact'] - 1)) < 0.1
+    assert (state['mad'] > 0).all()
+
+
+def test_cold_start_heights_match_positions(tmp_path, monkeypatch):
+    """Test cold-start markers sit at the order statistics of their stored ranks."""
+    from civicspend.detect.streaming import StreamingMADDetector, marker_positions
+
+    # Half ranks: n=7 gives 2.5 and 5.5, n=11 gives 8.5
+    assert marker_positions([7, 11]).tolist() == [[1, 3, 4, 6, 7], [1, 4, 6, 9, 11]]
+
+    monkeypatch.setattr(connection, "DB_PATH", tmp_path / "ranks.duckdb")
+    connection.init_database()
+    detector = StreamingMADDetector()
+    conn = detector.conn
+
+    values = {'V7': [float(10 * i) for i in range(7, 0, -1)], 'V11': [float(i * i) for i in range(11)]}
+    conn.executemany("INSERT INTO monthly_vendor_spend VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        ("run", vendor_id, f"2023-{m + 1:02d}", v, 1, v, v, 0)
+        for vendor_id, series in values.items() for m, v in enumerate(series)
+    ])
+    detector.cold_start("run")
+
+    sketches = conn.execute("""
+        SELECT vendor_id, median_heights, median_positions FROM vendor_sketches
+    """).fetchall()
+    conn.close()
+
+    for vendor_id, heights, positions in sketches:
+        ordered = sorted(values[vendor_id])
+        assert heights == [ordered[int(p) - 1] for p in positions]
@@ -0,0 +1,317 @@
+"""Test vendor matching."""
+import random
+
+from rapidfuzz import fuzz
+
+from civicspend.normalize.blocking import VendorIndex
+
+
+def _brute_force(names, query, threshold):
+    for i, name in enumerate(names):
+        if fuzz.ratio(query, name) >= threshold:
+            return i
+    return None
+
+
+def test_vendor_index_matches_full_scan():
+    """Test the blocking index returns the same first match as scoring every vendor."""
+    rng = random.Random(7)
+    words = ["ACME", "GLOBAL", "SYSTEMS", "3M", "CO", "INC", "LLC", "TECH", "MEDICAL",
+             "SUPPLY", "NORTH", "STAR", "BUILDERS", "A", "DATA", "GROUP"]
+
+    def random_name():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+
+    def perturb(name):
+        chars = list(name)
+        for _ in range(rng.randint(0, 3)):
+            op = rng.random()
+            pos = rng.randrange(len(chars) + 1)
+            if op < 0.4:
+                chars.insert(pos, rng.choice("ABCXYZ "))
+            elif chars and op < 0.8:
+                del chars[min(pos, len(chars) - 1)]
+            elif chars:
+                chars[min(pos, len(chars) - 1)] = rng.choice("ABCXYZ")
+        return "".join(chars)
+
+    names = [random_name() for _ in range(300)] + ["", "X", "AB"]
+    queries = [perturb(rng.choice(names)) for _ in range(300)] + [random_name() for _ in range(100)]
+    queries += ["", "A", "XY"]
+
+    for threshold in (60.0, 85.0, 95.0):
+        index = VendorIndex(threshold)
+        for i, name in enumerate(names):
+            index.add(i, name)
+
+        for query in queries:
+            assert index.find(query) == _brute_force(names, query, threshold), (threshold, query)
+
+
+def test_vendor_index_prunes_candidates():
+    """Test dissimilar vendors are not scored."""
+    index = VendorIndex(85.0)
+    for i in range(1000):
+        index.add(i, f"VENDOR {i:04d} HOLDINGS")
+    index.add("target", "LOCKHEED MARTIN CORP")
+
+    candidates = index.candidates("LOCKHEED MARTIN CORPORATION")
+
+    assert candidates == [1000]
+    assert index.find("LOCKHEED MARTIN CORP.") == "target"
+
+
+def _seed_database(monkeypatch, path, awards):
+    from civicspend.db import connection
+    from civicspend.ingest.writer import RawAwardWriter
+    from civicspend.normalize.vendor_matcher import VendorMatcher
+
+    monkeypatch.setattr(connection, "DB_PATH", path)
+    connection.init_database()
+    matcher = VendorMatcher()
+    matcher.conn.executemany("""
+        INSERT INTO vendor_entities (vendor_id, canonical_name) VALUES (?, ?)
+    """, [("seed_3m", "3M COMPANY"), ("seed_acme", "ACME SUPPLY INC")])
+    matcher.conn.execute("""
+        INSERT INTO vendor_aliases (alias_type, alias_value, vendor_id) VALUES ('duns', 'D1', 'seed_acme')
+    """)
+
+    writer = RawAwardWriter(matcher.conn, "run", "MN")
+    writer.add(awards)
+    writer.flush()
+    return matcher
+
+
+def test_batch_normalization_matches_per_award(tmp_path, monkeypatch):
+    """Test batch resolution assigns awards exactly like award-by-award matching."""
+    names = ["3M COMPANY", "3M CO.", "ACME SUPPLY, INC.", "NORTHSTAR BUILDERS",
+             "NORTHSTAR BUILDERS LLC", "NORTH STAR BUILDERS", "DATA GROUP", "DATA GROUPS"]
+    awards = [
+        {"Award ID": f"A{i:02d}", "Recipient Name": names[i % len(names)],
+         "recipient_duns": f"D{i % 5}" if i % 3 else ("" if i % 2 else None),
+         "Start Date": "2024-01-15", "Award Amount": 1000 + i}
+        for i in range(60)
+    ]
+
+    results = []
+    for mode in ("per_award", "batch", "tfidf"):
+        matcher = _seed_database(monkeypatch, tmp_path / f"{mode}.duckdb", awards)
+        if mode == "tfidf":
+            matcher.backend = "tfidf"
+            count = matcher.normalize_run_batch("run")
+        elif mode == "batch":
+            count = matcher.normalize_run_batch("run", workers=1)
+        else:
+            count = matcher.normalize_run("run")
+        rows = matcher.conn.execute("""
+            SELECT m.award_id, v.canonical_name
+            FROM award_vendor_map m JOIN vendor_entities v USING (vendor_id)
+            ORDER BY m.award_id
+        """).fetchall()
+        vendors = matcher.conn.execute("SELECT COUNT(*) FROM vendor_entities").fetchone()[0]
+        aliases = matcher.conn.execute("""
+            SELECT a.alias_type, a.alias_value, v.canonical_name
+            FROM vendor_aliases a JOIN vendor_entities v USING (vendor_id)
+            ORDER BY ALL
+        """).fetchall()
+        matcher.conn.close()
+        results.append((count, rows, vendors, aliases))
+
+    assert results[0] == results[1]
+    # Few distinct names, so every true match is within the TF-IDF top k
+    assert results[0] == results[2]
+    assert len(results[0][1]) == len(awards)
+
+
+def test_aliases_skip_fuzzy_matching(tmp_path, monkeypatch):
+    """Test names and DUNS resolved in one run resolve by alias in the next."""
+    from civicspend.ingest.writer import RawAwardWriter
+    from civicspend.normalize.vendor_matcher import VendorMatcher
+
+    awards = [
+        {"Award ID": "A1", "Recipient Name": "3M COMPANY.", "recipient_duns": "006173082",
+         "Start Date": "2024-01-15", "Award Amount": 1000},
+        {"Award ID": "A2", "Recipient Name": "NORTHSTAR BUILDERS", "recipient_duns": "ABCDEF123456",
+         "Start Date": "2024-01-15", "Award Amount": 2000},
+        {"Award ID": "A3", "Recipient Name": "DATA GROUP",
+         "Start Date": "2024-01-15", "Award Amount": 3000},
+    ]
+    matcher = _seed_database(monkeypatch, tmp_path / "aliases.duckdb", awards)
+    matcher.normalize_run_batch("run", workers=1)
+
+    aliases = dict(
+        ((kind, value), vid) for kind, value, vid in
+        matcher.conn.execute("SELECT alias_type, alias_value, vendor_id FROM vendor_aliases").fetchall()
+    )
+    assert aliases[('name', '3M COMPANY')] == "seed_3m"
+    assert aliases[('duns', '006173082')] == "seed_3m"
+    assert ('uei', 'ABCDEF123456') in aliases
+
+    # A renamed recipient with a known UEI, and a repeated name
+    later = [
+        {"Award ID": "B1", "Recipient Name": "NORTHSTAR CONSTRUCTION", "recipient_duns": "ABCDEF123456",
+         "Start Date": "2024-02-15", "Award Amount": 1000},
+        {"Award ID": "B2", "Recipient Name": "Data Group",
+         "Start Date": "2024-02-15", "Award Amount": 1000},
+    ]
+    writer = RawAwardWriter(matcher.conn, "run2", "MN")
+    writer.add(later)
+    writer.flush()
+    matcher.conn.close()
+
+    def no_fuzzy_matching():
+        raise AssertionError("alias hits should not reach fuzzy matching")
+
+    for mode in ("per_award", "batch"):
+        fresh = VendorMatcher()
+        monkeypatch.setattr(fresh, "get_index", no_fuzzy_matching)
+        fresh.conn.execute("DELETE FROM award_vendor_map WHERE run_id = 'run2'")
+        if mode == "batch":
+            fresh.normalize_run_batch("run2", workers=1)
+        else:
+            fresh.normalize_run("run2")
+
+        mapped = dict(fresh.conn.execute("""
+            SELECT award_id, vendor_id FROM award_vendor_map WHERE run_id = 'run2'
+        """).fetchall())
+        assert mapped["B1"] == aliases[('uei', 'ABCDEF123456')]
+        assert mapped["B2"] == aliases[('name', 'DATA GROUP')]
+        fresh.conn.close()
+
+
+def test_fuzzy_aliases_are_keyed_by_threshold(tmp_path, monkeypatch):
+    """Test a stricter matcher does not reuse names matched at a lower threshold."""
+    from civicspend.ingest.writer import RawAwardWriter
+    from civicspend.normalize.vendor_matcher import VendorMatcher
+
+    awards = [
+        {"Award ID": "A1", "Recipient Name": "ACME SUPPLIES INC",
+         "Start Date": "2024-01-15", "Award Amount": 1000},
+        {"Award ID": "A2", "Recipient Name": "ACME SUPPLY INC.",
+         "Start Date": "2024-01-15", "Award Amount": 1000},
+    ]
+    matcher = _seed_database(monkeypatch, tmp_path / "threshold.duckdb", awards)
+    matcher.normalize_run("run")
+    aliases = set(matcher.conn.execute("""
+        SELECT alias_type, alias_value, vendor_id FROM vendor_aliases WHERE alias_type LIKE 'name%'
+    """).fetchall())
+
+    writer = RawAwardWriter(matcher.conn, "run2", "MN")
+    writer.add([dict(award, **{"Award ID": "B" + award["Award ID"]}) for award in awards])
+    writer.flush()
+    matcher.conn.close()
+
+    assert aliases == {
+        ('name@85', 'ACME SUPPLIES INC', 'seed_acme'),
+        ('name', 'ACME SUPPLY INC', 'seed_acme'),
+    }
+
+    for mode in ("per_award", "batch"):
+        strict = VendorMatcher(threshold=95)
+        strict.conn.execute("DELETE FROM award_vendor_map WHERE run_id = 'run2'")
+        if mode == "batch":
+            strict.normalize_run_batch("run2", workers=1)
+        else:
+            strict.normalize_run("run2")
+        mapped = dict(strict.conn.execute("""
+            SELECT award_id, vendor_id FROM award_vendor_map WHERE run_id = 'run2'
+        """).fetchall())
+        strict.conn.close()
+
+        assert mapped["BA2"] == "seed_acme"
+        assert mapped["BA1"] != "seed_acme"
+
+def _cluster_inputs():
+    return [
+        ("3M COMPANY", [("duns", "006173082")]),
+        ("3M COMPANYS", []),
+        ("MINNESOTA MINING AND MANUFACTURING", [("duns", "006173082")]),
+        ("ACME SUPPLY INC", []),
+        ("ACME SUPPLY", []),
+        ("ACME SUPPLY CO", []),
+        ("NORTHSTAR BUILDERS", [("uei", "ABCDEF123456")]),
+        ("NORTH STAR BUILDERS LLC", []),
+        ("DATA GROUP", []),
+    ]
+
+
+def test_vendor_clusters_are_order_independent():
+    """Test clusters and representatives do not depend on arrival order."""
+    from civicspend.normalize.clustering import VendorClusterer
+
+    results = []
+    rng = random.Random(3)
+    for _ in range(5):
+        inputs = _cluster_inputs()
+        rng.shuffle(inputs)
+        clusterer = VendorClusterer(85.0)
+        for name, identifiers in inputs:
+            clusterer.add_name(name, identifiers)
+        results.append(clusterer.clusters())
+
+    assert all(r == results[0] for r in results)
+    clusters = results[0]
+    # DUNS hard link joins names that never fuzzy-match
+    assert clusters["name:3M COMPANY"] == [
+        "duns:006173082", "name:3M COMPANY", "name:3M COMPANYS", "name:MINNESOTA MINING AND MANUFACTURING"
+    ]
+    # ACME SUPPLY and ACME SUPPLY INC only connect through ACME SUPPLY CO
+    assert clusters["name:ACME SUPPLY"] == ["name:ACME SUPPLY", "name:ACME SUPPLY CO", "name:ACME SUPPLY INC"]
+
+
+def test_vendor_clusters_extend_incrementally():
+    """Test a saved clustering extends to the same result as clustering from scratch."""
+    import duckdb
+    from pathlib import Path
+    from civicspend.db import connection
+    from civicspend.normalize.clustering import VendorClusterer
+
+    conn = duckdb.connect()
+    conn.execute((Path(connection.__file__).parent / "schema.sql").read_text())
+
+    inputs = _cluster_inputs()
+    first = VendorClusterer(85.0)
+    for name, identifiers in inputs[:6]:
+        first.add_name(name, identifiers)
+    assert first.save(conn) > 0
+
+    resumed = VendorClusterer.load(conn, 85.0)
+    for name, identifiers in inputs[6:]:
+        resumed.add_name(name, identifiers)
+    # Only the new names and identifiers change
+    assert resumed.save(conn) == 4
+
+    scratch = VendorClusterer(85.0)
+    for name, identifiers in inputs:
+        scratch.add_name(name, identifiers)
+
+    assert VendorClusterer.load(conn, 85.0).clusters() == scratch.clusters()
+    members = dict(conn.execute("SELECT node, representative FROM vendor_cluster_members").fetchall())
+    assert members["duns:006173082"] == "name:3M COMPANY"
+    conn.close()
+
+
+def test_tfidf_matcher_finds_variants():
+    """Test TF-IDF candidates recover close variants and rescoring keeps the threshold."""
+    from civicspend.normalize.tfidf import TfidfMatcher
+
+    registry = ["3M COMPANY", "ACME SUPPLY INC", "NORTHSTAR BUILDERS LLC", "LOCKHEED MARTIN CORP",
+                "DATA GROUP", "BEST BUY STORES LP"]
+    matcher = TfidfMatcher(85.0, top_k=3).fit(registry)
+
+    matches = matcher.match(["3M COMPANYS", "LOCKHEED MARTIN CORPS", "ACME SUPPLY INC", "UNRELATED VENDOR", ""])
+
+    assert matches == [0, 3, 1, None, None]
+    assert all(len(c) <= 3 for c in matcher.candidates(["3M COMPANYS", "DATA GROUPS"]))
+    assert TfidfMatcher(85.0).fit([]).match(["ANY"]) == [None]
+
+
+def test_matcher_benchmark_reports_backends():
+    """Test the benchmark scores exact backends at full recall."""
+    from civicspend.normalize.benchmark import run_benchmark
+
+    results = run_benchmark(n_registry=500, n_queries=100)
+
+    assert set(results) == {'cdist', 'blocking', 'tfidf'}
+    assert results['blocking']['agreement'] == 1.0
+    assert results['tfidf']['recall'] > 0.8